@@ -0,0 +1,67 @@
+# baccarat_bot/benchmarks/ml_features.py
+
+"""
+Benchmark de construcción de la matriz de características del predictor ML:
+bucle original por ventana, sliding_window_view (vista y copia contigua)
+y FeatureMatrix al agregar una ronda.
+
+Uso:
+    python -m baccarat_bot.benchmarks.ml_features [rondas ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from baccarat_bot.ml_predictor import FeatureMatrix, ventanas_features
+
+_MAPEO = {'P': 0, 'B': 1, 'E': 2}
+
+
+def _features_bucle(history, window=12):
+    """Implementación anterior de prepare_features (referencia)."""
+    codes = [_MAPEO.get(h, 2) for h in history]
+    X, y = [], []
+    for i in range(window, len(codes)):
+        X.append(codes[i - window:i])
+        y.append(codes[i])
+    return np.array(X), np.array(y)
+
+
+def _medir(func, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes=(1_000, 100_000, 1_000_000), seed=7):
+    rng = np.random.default_rng(seed)
+    print(f"{'Rondas':>10} {'bucle':>12} {'vista':>12} {'copia':>12} {'+1 ronda':>12}")
+    for rounds in sizes:
+        encoded = rng.choice(3, size=rounds, p=[0.4462, 0.4586, 0.0952]).astype(np.int8)
+        history = ['PBE'[c] for c in encoded.tolist()]
+
+        loop = _medir(lambda: _features_bucle(history), repeats=1 if rounds > 100_000 else 3)
+        vectorized = _medir(lambda: ventanas_features(encoded, 12))
+        # Lo que paga sklearn al copiar la vista a un array contiguo
+        copied = _medir(lambda: np.ascontiguousarray(ventanas_features(encoded, 12)[0]))
+
+        matrix = FeatureMatrix(12)
+        matrix.extend(encoded)
+        nuevo = encoded[:1]
+
+        def agregar():
+            matrix.extend(nuevo)
+            matrix.matrix()
+        incremental = _medir(agregar)
+
+        print(f"{rounds:>10,} {loop * 1000:>10.2f}ms {vectorized * 1000:>10.4f}ms "
+              f"{copied * 1000:>10.2f}ms {incremental * 1e6:>10.2f}us")
+
+
+if __name__ == '__main__':
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (1_000, 100_000, 1_000_000))
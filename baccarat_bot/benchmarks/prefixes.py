@@ -0,0 +1,51 @@
+# baccarat_bot/benchmarks/prefixes.py
+
+"""
+Benchmark de analyze_prefixes: señal y confianza de cada estrategia en
+cada posición de un historial largo.
+
+Uso:
+    python -m baccarat_bot.benchmarks.prefixes [rondas]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from baccarat_bot.strategies.advanced_strategies import (
+    StreakStrategy,
+    ZigZagStrategy,
+    TrendAnalysisStrategy,
+    TieDetectionStrategy
+)
+from baccarat_bot.strategies.safe_strategies import (
+    StatisticalEdgeStrategy,
+    DominanceStrategy
+)
+
+
+def run(rounds: int = 1_000_000, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    encoded = rng.choice(3, size=rounds, p=[0.4462, 0.4586, 0.0952]).astype(np.int8)
+    strategies = [
+        StreakStrategy(3),
+        ZigZagStrategy(4),
+        TieDetectionStrategy(5),
+        TrendAnalysisStrategy(5, 15),
+        DominanceStrategy(20, 0.70),
+        StatisticalEdgeStrategy(30, 0.15),
+    ]
+    print(f"Historial de {rounds:,} rondas")
+    total = 0.0
+    for strategy in strategies:
+        start = time.perf_counter()
+        signals, _ = strategy.analyze_prefixes(encoded)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        print(f"  {strategy.name:<25} {elapsed * 1000:8.1f} ms  ({(signals >= 0).mean():.1%} con señal)")
+    print(f"  {'Total':<25} {total * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,73 @@
+# baccarat_bot/benchmarks/safe_signal.py
+
+"""
+Micro-benchmark de get_safest_signal.
+
+Compara la implementación anterior (instancia las estrategias en cada
+llamada y ejecuta analyze + get_confidence_level por separado) con la
+evaluación fusionada evaluate() sobre un contexto de características
+compartido.
+
+Uso:
+    python -m baccarat_bot.benchmarks.safe_signal
+"""
+
+import random
+import time
+from typing import Callable, List, Optional, Tuple
+
+from baccarat_bot.strategies.safe_strategies import (
+    ConservativeStreakStrategy,
+    ConfirmedPatternStrategy,
+    StatisticalEdgeStrategy,
+    ConsensusStrategy,
+    DominanceStrategy,
+    get_safest_signal
+)
+
+
+def legacy_safest_signal(history: List[str]) -> Optional[Tuple[str, str, int]]:
+    """Réplica de get_safest_signal antes de la evaluación fusionada"""
+    strategies = [
+        ConservativeStreakStrategy(min_streak_length=5),
+        ConfirmedPatternStrategy(pattern_length=3),
+        StatisticalEdgeStrategy(min_sample_size=30),
+        ConsensusStrategy(),
+        DominanceStrategy(window_size=20, dominance_threshold=0.70)
+    ]
+    best_signal = None
+    best_confidence = 0
+    for strategy in strategies:
+        result = strategy.analyze(history)
+        if result:
+            confidence = strategy.get_confidence_level(history)
+            if confidence > best_confidence and confidence >= 80:
+                best_signal = (result, strategy.name, confidence)
+                best_confidence = confidence
+    return best_signal
+
+
+def calls_per_second(func: Callable, history: List[str], min_time: float = 1.0) -> float:
+    """Ejecuta func(history) durante al menos min_time segundos"""
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        func(history)
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+
+def run(lengths=(50, 500, 5000), seed: int = 7):
+    rng = random.Random(seed)
+    print(f"{'historial':>10} {'antes (llamadas/s)':>20} {'después (llamadas/s)':>22} {'mejora':>8}")
+    for length in lengths:
+        history = rng.choices(['B', 'P', 'E'], weights=[0.4586, 0.4462, 0.0952], k=length)
+        before = calls_per_second(legacy_safest_signal, history)
+        after = calls_per_second(get_safest_signal, history)
+        print(f"{length:>10} {before:>20.0f} {after:>22.0f} {after / before:>7.1f}x")
+
+
+if __name__ == '__main__':
+    run()
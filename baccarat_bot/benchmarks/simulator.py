@@ -0,0 +1,52 @@
+# baccarat_bot/benchmarks/simulator.py
+
+"""
+Benchmark del simulador: rondas por segundo del modo ronda a ronda
+(run_simulation), del vectorizado en una llamada (simulate_codes), del
+vectorizado por bloques (simulate_chunks, memoria constante) y de los
+zapatos repartidos carta a carta (simulate_shoes).
+
+Uso:
+    python -m baccarat_bot.benchmarks.simulator [rondas]
+"""
+
+import sys
+import time
+
+from baccarat_bot.simulations.simulator import BaccaratSimulator
+
+
+def _medir(func, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rounds=100_000_000, seed=7):
+    loop_rounds = min(rounds, 1_000_000)
+    loop = _medir(lambda: BaccaratSimulator(seed=seed).run_simulation(loop_rounds), repeats=1)
+    vectorized = _medir(lambda: BaccaratSimulator(seed=seed).simulate_codes(min(rounds, 10_000_000)))
+
+    def por_bloques():
+        for _ in BaccaratSimulator(seed=seed).simulate_chunks(rounds):
+            pass
+    chunked = _medir(por_bloques, repeats=1)
+
+    shoes = 10_000
+    shoe_results = []
+    zapatos = _medir(lambda: shoe_results.append(len(BaccaratSimulator(seed=seed).simulate_shoes(shoes))))
+    shoe_rounds = shoe_results[-1]
+
+    print(f"{'modo':<14} {'rondas':>14} {'rondas/s':>14}")
+    print(f"{'bucle':<14} {loop_rounds:>14,} {loop_rounds / loop:>14,.0f}")
+    print(f"{'vectorizado':<14} {min(rounds, 10_000_000):>14,} {min(rounds, 10_000_000) / vectorized:>14,.0f}")
+    print(f"{'por bloques':<14} {rounds:>14,} {rounds / chunked:>14,.0f}")
+    print(f"{'zapatos':<14} {shoe_rounds:>14,} {shoe_rounds / zapatos:>14,.0f}"
+          f"   ({shoes / zapatos:,.0f} zapatos/s)")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000_000)
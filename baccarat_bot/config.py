@@ -38,6 +38,12 @@ LOG_FILE = os.getenv('LOG_FILE', 'baccarat_bot.log')
 # Configuración de Simulación
 USAR_DATOS_REALES = os.getenv('USAR_DATOS_REALES', 'false').lower() == 'true'
 
+# Señal ML de los bots (main, main_advanced): opcional, apagada por defecto.
+# Solo se usa si la probabilidad de la apuesta llega a ML_CONFIANZA_MINIMA;
+# el umbral del predictor (40%) lo supera casi cualquier ronda
+ML_SENALES = os.getenv('ML_SENALES', 'false').lower() == 'true'
+ML_CONFIANZA_MINIMA = float(os.getenv('ML_CONFIANZA_MINIMA', '0.8'))
+
 # Configuración de Anti-Spam
 # 10 minutos entre señales de la misma mesa para mayor control
 MINIMO_TIEMPO_ENTRE_SENALES = int(
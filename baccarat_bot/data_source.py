@@ -49,7 +49,15 @@ async def _init_playwright_scraper():
         return None
 
 async def obtener_nuevo_resultado_async(mesa_data: Dict, game_id: Optional[str] = None) -> str:
+    """
+    Último resultado de la mesa.
+
+    Deja en ``mesa_data['ronda_id']`` la identidad de la ronda cuando la fuente
+    la conoce (scraper de Playwright); si no, None y cada llamada cuenta como
+    una ronda nueva (la simulación genera una ronda por llamada).
+    """
     global _playwright_scraper
+    mesa_data['ronda_id'] = None
     if _usar_datos_reales():
         try:
             if not _scraper_initialized:
@@ -63,6 +71,7 @@ async def obtener_nuevo_resultado_async(mesa_data: Dict, game_id: Optional[str]
                 resultado = await _playwright_scraper.get_table_result(table_name, game_id, game_slug)
                 if resultado:
                     logger.info(f"✅ Resultado REAL obtenido para {table_name}: {resultado}")
+                    mesa_data['ronda_id'] = _playwright_scraper.round_ids.get(game_id)
                     return resultado
                 else:
                     logger.warning(f"⚠️ No se pudo obtener resultado real para {table_name}, intentando con Puppeteer")
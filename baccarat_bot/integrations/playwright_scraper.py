@@ -46,6 +46,9 @@ class Playwright1xBetScraper:
         
         self.initialized = False
         self.last_results = {}
+        # Identidad de la última ronda vista por mesa: el camino de resultados
+        # extraído cambia solo cuando termina una ronda
+        self.round_ids = {}
         self.cache_duration = 30  # segundos
     
     async def init(self, headless: bool = True):
@@ -522,6 +525,7 @@ class Playwright1xBetScraper:
                 
                 # Guardar en caché
                 self.last_results[cache_key] = (latest_result, datetime.now())
+                self.round_ids[game_id] = ''.join(results)
                 
                 logger.info(f"✅ Resultado obtenido para {table_name}: {latest_result}")
                 return latest_result
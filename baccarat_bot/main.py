@@ -10,11 +10,15 @@ from telegram.error import TelegramError
 from baccarat_bot.config import (
     TELEGRAM_TOKEN,
     TELEGRAM_CHAT_ID,
-    INTERVALO_MONITOREO
+    INTERVALO_MONITOREO,
+    ML_SENALES,
+    ML_CONFIANZA_MINIMA
 )
 from baccarat_bot.tables import inicializar_mesas, MESA_NOMBRES
+from baccarat_bot.utils.history_buffer import HistoryBuffer
+from baccarat_bot.utils.result_cache import result_cache, version_historial
 from baccarat_bot.signal_logic import analizar_y_generar_senales
-from baccarat_bot.ml_integration import entrenar_ml_si_posible, obtener_prediccion_ml
+from baccarat_bot.ml_integration import entrenador_ml, entrenar_y_predecir_ml_lote
 from baccarat_bot.data_source import obtener_nuevo_resultado_async, _init_playwright_scraper
 from baccarat_bot.game_timing_detector import GameTimingDetector, RealTimeGameMonitor
 
@@ -27,7 +31,7 @@ async def _inicializar_historiales(mesas):
             resultado_simulado = await obtener_nuevo_resultado_async(
                 mesa_data, game_id
             )
-            mesa_data['historial_resultados'].append(resultado_simulado)
+            _actualizar_historial(mesa_data, resultado_simulado)
 
 
 def _procesar_prediccion_pendiente(mesa_nombre, nuevo_resultado):
@@ -46,33 +50,88 @@ def _procesar_prediccion_pendiente(mesa_nombre, nuevo_resultado):
 
 
 def _actualizar_historial(mesa_data, nuevo_resultado):
-    mesa_data['historial_resultados'].append(nuevo_resultado)
-    if len(mesa_data['historial_resultados']) > 50:
-        mesa_data['historial_resultados'] = (
-            mesa_data['historial_resultados'][-50:]
-        )
+    """Agrega el resultado solo si es de una ronda nueva; retorna si se agregó."""
+    # El HistoryBuffer descarta solo la ronda más antigua al llenarse. Sondear
+    # la misma ronda no agrega nada, así la versión (y la caché) no cambia.
+    return mesa_data['historial_resultados'].append_round(
+        nuevo_resultado, mesa_data.get('ronda_id')
+    )
+
 
+def _historial_hasta(historial, fin):
+    """Primeras ``fin`` rondas: vista de códigos sin copia si es un HistoryBuffer."""
+    if isinstance(historial, HistoryBuffer):
+        return historial.as_numpy()[:fin]
+    return historial[:fin]
 
-async def _analizar_y_enviar_senal(mesa_nombre, mesa_data):
+
+def _historial_prediccion(mesa_data):
+    """(historial, fin, historial hasta fin, rondas absolutas hasta fin) de una mesa."""
     historial = mesa_data.get('historial_resultados', [])
     # Usar solo historial hasta la ronda anterior (no incluir resultado actual si la ronda está en curso)
-    historial_para_prediccion = historial[:-1] if mesa_data.get('ronda_en_curso', False) and len(historial) > 1 else historial[:]
+    fin = len(historial) - 1 if mesa_data.get('ronda_en_curso', False) and len(historial) > 1 else len(historial)
+    total = historial.version - (len(historial) - fin) if isinstance(historial, HistoryBuffer) else fin
+    return historial, fin, _historial_hasta(historial, fin), total
+
 
-    # Entrenar modelo ML solo con historial válido
-    entrenar_ml_si_posible(historial_para_prediccion)
+def _senal_ml_confiable(prediccion):
+    """Apuesta de una predicción (apuesta, probabilidad) si llega a ML_CONFIANZA_MINIMA."""
+    if prediccion and prediccion[1] >= ML_CONFIANZA_MINIMA:
+        return prediccion[0]
+    return None
 
-    # Señal ML prioritaria si está disponible
-    senal_ml = obtener_prediccion_ml(historial_para_prediccion)
+
+def _predecir_ml_ciclo(mesas_pendientes):
+    """
+    Señales ML de las mesas a analizar en el ciclo: cada mesa con rondas
+    nuevas actualiza su modelo y después todas se predicen en un solo lote.
+    Las mesas sin rondas nuevas se resuelven luego desde la caché. Sin
+    ML_SENALES no se entrena ni se predice nada.
+    """
+    if not ML_SENALES:
+        return {}
+    historiales, totales = {}, {}
+    for mesa_nombre, mesa_data in mesas_pendientes:
+        historial, fin, historial_para_prediccion, total = _historial_prediccion(mesa_data)
+        clave = (version_historial(historial), fin)
+        if result_cache.get(mesa_nombre, 'ml', clave, _SIN_CALCULAR) is not _SIN_CALCULAR:
+            continue
+        # El modelo ML se actualiza solo con historial válido (rondas absolutas hasta fin)
+        historiales[mesa_nombre] = historial_para_prediccion
+        totales[mesa_nombre] = total
+    return {
+        mesa_nombre: _senal_ml_confiable(prediccion)
+        for mesa_nombre, prediccion in entrenar_y_predecir_ml_lote(historiales, totales).items()
+    }
+
+
+async def _analizar_y_enviar_senal(mesa_nombre, mesa_data, senales_ml=None):
+    """
+    Analiza una mesa y envía su señal. senales_ml son las predicciones del
+    ciclo (_predecir_ml_ciclo); sin ellas la predicción ML se hace aquí.
+    """
+    historial, fin, historial_para_prediccion, total = _historial_prediccion(mesa_data)
+    version = version_historial(historial)
+
+    def _entrenar_y_predecir():
+        if senales_ml is not None:
+            return senales_ml.get(mesa_nombre)
+        lote = entrenar_y_predecir_ml_lote(
+            {mesa_nombre: historial_para_prediccion}, {mesa_nombre: total}
+        )
+        return _senal_ml_confiable(lote.get(mesa_nombre))
+
+    # Señal ML prioritaria si está activada y es confiable (se recalcula solo con rondas nuevas)
+    senal_ml = result_cache.get_or_compute(
+        mesa_nombre, 'ml', (version, fin), _entrenar_y_predecir
+    ) if ML_SENALES else None
     if senal_ml:
         senal_info = {
             'mesa': mesa_nombre,
             'apuesta': senal_ml,
             'estrategia': 'ML Predictor',
             'url': mesa_data.get('url', ''),
-            'historial_reciente': (
-                historial_para_prediccion[-10:]
-                if len(historial_para_prediccion) > 10 else historial_para_prediccion
-            )
+            'historial_reciente': historial[max(fin - 10, 0):fin]
         }
         logger.info(
             "🤖 SEÑAL ML DETECTADA para %s [MOMENTO ÓPTIMO]",
@@ -91,17 +150,17 @@ async def _analizar_y_enviar_senal(mesa_nombre, mesa_data):
         return
 
     # Señales tradicionales
-    senales = analizar_y_generar_senales(historial)
+    senales = result_cache.get_or_compute(
+        mesa_nombre, 'senales', version,
+        lambda: analizar_y_generar_senales(historial)
+    )
     for senal, estrategia in senales:
         senal_info = {
             'mesa': mesa_nombre,
             'apuesta': senal,
             'estrategia': estrategia,
             'url': mesa_data.get('url', ''),
-            'historial_reciente': (
-                historial[-10:]
-                if len(historial) > 10 else historial
-            )
+            'historial_reciente': historial[-10:]
         }
         logger.info(
             "🎯 SEÑAL DETECTADA para %s (%s) [MOMENTO ÓPTIMO]",
@@ -209,11 +268,15 @@ game_monitor = RealTimeGameMonitor()
 # Control de frecuencia de señales (evitar flood)
 last_signal_time: Dict[str, float] = {}
 MIN_SIGNAL_INTERVAL = 30.0  # Mínimo 30 segundos entre señales de la misma mesa
+HISTORIAL_MENSAJE = 50  # Rondas del historial incluidas en cada mensaje
 
 # Rastreo de predicciones para mostrar resultados
 predicciones_pendientes: Dict[str, Dict] = {}
 # mesa_nombre -> {apuesta, resultado_anterior}
 
+# Marca de "sin valor en caché" para la predicción ML del ciclo
+_SIN_CALCULAR = object()
+
 
 async def enviar_resultado_apuesta(mesa_nombre: str, apuesta_predicha: str,
                                    resultado_actual: str) -> None:
@@ -305,7 +368,7 @@ async def enviar_senal_telegram(senal_info: Dict, mesa_data: Dict) -> bool:
         mesa_data['historial_resultados']
         if 'historial_resultados' in mesa_data
         else senal_info.get('historial_completo', [])
-    )
+    )[-HISTORIAL_MENSAJE:]
     historial_reciente = senal_info.get('historial_reciente', [])
     historial_completo_emojis = _generar_historial_emojis(historial_completo)
     historial_reciente_emojis = _generar_historial_emojis(historial_reciente)
@@ -391,6 +454,8 @@ async def bucle_monitoreo(intervalo_segundos: int | None = None):
     iteration_count = 0
     while True:
         iteration_count += 1
+        # Mesas a analizar en este ciclo: su predicción ML se hace en lote
+        mesas_pendientes = []
         for mesa_nombre, mesa_data in mesas.items():
             try:
                 game_id = mesa_data.get('game_id')
@@ -413,14 +478,35 @@ async def bucle_monitoreo(intervalo_segundos: int | None = None):
 
                 timing_check = game_monitor.check_signal_timing()
                 if timing_check['should_signal']:
-                    await _analizar_y_enviar_senal(mesa_nombre, mesa_data)
+                    mesas_pendientes.append((mesa_nombre, mesa_data))
 
             except BaseException as exc:
                 logger.error("❌ Error procesando %s: %s", mesa_nombre, exc)
                 raise
 
+        if mesas_pendientes:
+            senales_ml = _predecir_ml_ciclo(mesas_pendientes)
+            for mesa_nombre, mesa_data in mesas_pendientes:
+                try:
+                    await _analizar_y_enviar_senal(mesa_nombre, mesa_data, senales_ml)
+                except BaseException as exc:
+                    logger.error("❌ Error procesando %s: %s", mesa_nombre, exc)
+                    raise
+
         if iteration_count % 10 == 0:
             logger.info(game_monitor.get_status_report())
+            stats_cache = result_cache.get_stats()
+            logger.info(
+                "🗃️ Caché de análisis: %d aciertos, %d fallos (%.1f%%)",
+                stats_cache['hits'], stats_cache['misses'], stats_cache['hit_rate']
+            )
+            stats_ml = entrenador_ml.get_stats()
+            if stats_ml['submitted']:
+                logger.info(
+                    "🧠 Entrenamientos ML: %d completados, %d reemplazados en cola, "
+                    "última duración %.2fs",
+                    stats_ml['completed'], stats_ml['replaced'], stats_ml['last_duration']
+                )
 
         await asyncio.sleep(intervalo_segundos)
 
@@ -433,3 +519,5 @@ if __name__ == "__main__":
     except BaseException as exc:
         logger.error("❌ Error crítico: %s", exc)
         raise
+    finally:
+        entrenador_ml.shutdown(wait=False)
@@ -12,17 +12,19 @@ from telegram import Bot
 # Importar todos los módulos nuevos
 from baccarat_bot.config import (
     TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, INTERVALO_MONITOREO, 
-    LOG_LEVEL
+    LOG_LEVEL, ML_SENALES, ML_CONFIANZA_MINIMA
 )
 from database.models import db_manager
 from stats_module.analyzer import analyzer
 from baccarat_bot.tables import inicializar_mesas, MESA_NOMBRES
 from data_source import obtener_nuevo_resultado, simular_historial_inicial
 from baccarat_bot.signal_logic import actualizar_historial, analizar_y_generar_senales
+from baccarat_bot.ml_integration import APUESTAS_ML, entrenar_y_predecir_ml_lote
 from telegram_bot.interactive_bot import interactive_bot
 from api.server import iniciar_servidor
 from utils.bot_state import bot_state
 from utils.metrics import record_signal_metric, record_error_metric
+from utils.result_cache import result_cache, version_historial
 from integrations.web_scraper import data_source_manager
 
 # Configurar logging
@@ -121,21 +123,48 @@ class AdvancedBaccaratBot:
             logger.error(f"❌ ERROR al enviar mensaje a Telegram: {e}")
             return False
     
-    async def procesar_mesa(self, nombre_mesa: str, mesa_data: Dict):
-        """Procesa una mesa individual usando el gestor de estado centralizado"""
+    async def actualizar_mesa(self, nombre_mesa: str, mesa_data: Dict):
+        """Obtiene el nuevo resultado de una mesa y actualiza su historial"""
         try:
-            # 1. Obtener el nuevo resultado y actualizar historial
             nuevo_resultado = obtener_nuevo_resultado(mesa_data)
             if nuevo_resultado:
                 db_manager.registrar_resultado(nombre_mesa, nuevo_resultado)
                 actualizar_historial(mesa_data, nuevo_resultado)
+        except Exception as e:
+            self._registrar_error(nombre_mesa, e)
+
+    def predecir_ml(self) -> Dict:
+        """Predicciones ML de todas las mesas del ciclo en un solo lote (si están activadas)"""
+        if not ML_SENALES:
+            return {}
+        try:
+            historiales = {
+                nombre_mesa: mesa_data['historial_resultados']
+                for nombre_mesa, mesa_data in self.mesas.items()
+            }
+            return entrenar_y_predecir_ml_lote(historiales, cache=result_cache)
+        except Exception as e:
+            logger.warning(f"Error en predicción ML del ciclo: {e}")
+            return {}
 
-            # 2. Analizar y generar todas las señales posibles
+    async def procesar_mesa(self, nombre_mesa: str, mesa_data: Dict, senal_ml=None):
+        """
+        Analiza una mesa ya actualizada usando el gestor de estado centralizado.
+        senal_ml es la predicción (apuesta, probabilidad) del lote del ciclo.
+        """
+        try:
+            # 1. Analizar y generar todas las señales posibles
             historial = mesa_data['historial_resultados']
-            senales = analizar_y_generar_senales(historial)
+            senales = result_cache.get_or_compute(
+                nombre_mesa, 'senales', version_historial(historial),
+                lambda: analizar_y_generar_senales(historial)
+            )
+            if senal_ml and senal_ml[1] >= ML_CONFIANZA_MINIMA:
+                # La señal ML tiene prioridad, como en el bot básico
+                senales = [(APUESTAS_ML[senal_ml[0]], 'ML Predictor')] + list(senales)
 
             if senales:
-                # 3. Verificar si se puede enviar la señal usando BotState
+                # 2. Verificar si se puede enviar la señal usando BotState
                 can_send, reason = self.state.can_send_signal(nombre_mesa)
                 if can_send:
                     logger.info(f"Señal permitida para {nombre_mesa} por: {reason}")
@@ -157,7 +186,7 @@ class AdvancedBaccaratBot:
                         "mensaje_senales": mensaje_senales
                     }
 
-                    # 4. Enviar la señal y registrarla
+                    # 3. Enviar la señal y registrarla
                     start_time = time.time()
                     exito = await self.enviar_senal_telegram(senal_info, mensaje_personalizado=mensaje_senales)
                     response_time = time.time() - start_time
@@ -178,14 +207,17 @@ class AdvancedBaccaratBot:
                 else:
                     logger.debug(f"Señal bloqueada para {nombre_mesa}: {reason}")
 
-            # 5. Generar alertas (si corresponde)
+            # 4. Generar alertas (si corresponde)
             await self.verificar_alertas(nombre_mesa, mesa_data)
 
         except Exception as e:
-            error_type = type(e).__name__
-            logger.error(f"Error procesando mesa {nombre_mesa}: {e}")
-            self.state.record_error(e)
-            record_error_metric(error_type=error_type, error_message=str(e))
+            self._registrar_error(nombre_mesa, e)
+
+    def _registrar_error(self, nombre_mesa: str, e: Exception):
+        error_type = type(e).__name__
+        logger.error(f"Error procesando mesa {nombre_mesa}: {e}")
+        self.state.record_error(e)
+        record_error_metric(error_type=error_type, error_message=str(e))
     
     async def verificar_alertas(self, nombre_mesa: str, mesa_data: Dict):
         """Verifica y genera alertas para una mesa"""
@@ -227,7 +259,7 @@ class AdvancedBaccaratBot:
         
         # 3. Simular historial inicial para cada mesa
         for nombre, data in self.mesas.items():
-            data['historial_resultados'] = simular_historial_inicial(longitud=5)
+            data['historial_resultados'].extend(simular_historial_inicial(longitud=5))
             logger.debug(f"Mesa {nombre} inicializada con historial: {data['historial_resultados']}")
         
         # 4. Bucle de monitoreo continuo
@@ -236,10 +268,20 @@ class AdvancedBaccaratBot:
                 timestamp = datetime.now().strftime('%H:%M:%S')
                 logger.info(f"--- Chequeo de Mesas: {timestamp} ---")
                 
+                # Actualizar todas las mesas en paralelo
+                await asyncio.gather(
+                    *(self.actualizar_mesa(nombre_mesa, mesa_data)
+                      for nombre_mesa, mesa_data in self.mesas.items()),
+                    return_exceptions=True
+                )
+
+                # Predicción ML de todas las mesas en un lote
+                senales_ml = self.predecir_ml()
+
                 # Procesar cada mesa
                 tasks = []
                 for nombre_mesa, mesa_data in self.mesas.items():
-                    task = self.procesar_mesa(nombre_mesa, mesa_data)
+                    task = self.procesar_mesa(nombre_mesa, mesa_data, senales_ml.get(nombre_mesa))
                     tasks.append(task)
                 
                 # Ejecutar todas las tareas en paralelo
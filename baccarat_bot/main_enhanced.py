@@ -30,6 +30,7 @@ from baccarat_bot.utils.bot_state import bot_state
 from baccarat_bot.utils.logging_config import setup_logging, get_structured_logger
 from baccarat_bot.utils.validators import validar_senal
 from baccarat_bot.utils.error_handler import ErrorContext
+from baccarat_bot.utils.result_cache import result_cache, version_historial
 
 # Configurar logging estructurado
 setup_logging(
@@ -212,7 +213,10 @@ class EnhancedBaccaratBot:
                 db_manager.registrar_resultado(mesa_nombre, ultimo_resultado)
             
             # Analizar con estrategias seguras
-            senal = get_safest_signal(historial)
+            senal = result_cache.get_or_compute(
+                mesa_nombre, 'senal_segura', version_historial(historial),
+                lambda: get_safest_signal(historial)
+            )
             
             if not senal:
                 logger.debug(f"No hay señal segura para {mesa_nombre}")
@@ -0,0 +1,195 @@
+# baccarat_bot/ml_compact.py
+"""
+RandomForest exportado a arrays de NumPy para inferir sin sklearn.
+
+``CompactForest.from_sklearn`` aplana los árboles de un
+RandomForestClassifier entrenado en arrays de nodos concatenados (feature,
+threshold, hijo izquierdo y probabilidades de clase por nodo). Los nodos
+se renumeran para que los hermanos queden contiguos (derecho = izquierdo
++ 1) y las hojas apuntan a sí mismas con umbral infinito, así que cada
+paso del recorrido es ``left[n] + (x > threshold[n])`` sin distinguir
+hojas, repetido ``depth`` veces para muchos árboles y filas a la vez.
+
+``predict_proba`` reproduce exactamente el de sklearn: misma comparación
+float32 <= float64, mismas probabilidades por hoja y misma suma
+secuencial árbol por árbol antes de dividir por el número de árboles.
+
+El modelo se guarda como .npz sin comprimir y se carga con memory-mapping
+(los arrays quedan en la caché de páginas, compartida entre procesos). Este
+módulo no importa sklearn.
+"""
+import hashlib
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+# Elementos (árboles x filas) recorridos por bloque
+_BLOQUE = 1 << 16
+
+# Cambiar si se modifica el formato del archivo
+_FORMATO = 1
+
+_CAMPOS = ('feature', 'threshold', 'left', 'value', 'roots', 'classes_')
+
+
+class CompactForest:
+    """Bosque de decisión como arrays planos; interfaz predict_proba/predict de sklearn."""
+
+    def __init__(self, feature, threshold, left, value, roots, classes, depth, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.depth = int(depth)
+        self.n_features_in_ = int(n_features)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Exporta un RandomForestClassifier entrenado (una sola salida)."""
+        n_classes = len(model.classes_)
+        features, thresholds, lefts, values, roots = [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            order = _orden_hermanos(tree.children_left, tree.children_right)
+            new_id = np.empty_like(order)
+            new_id[order] = np.arange(len(order))
+            left = tree.children_left[order]
+            leaf = left < 0
+            # Las hojas apuntan a sí mismas: umbral infinito y columna válida
+            features.append(np.where(leaf, 0, tree.feature[order]).astype(np.int32))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold[order]))
+            lefts.append((np.where(leaf, np.arange(len(order)), new_id[left]) + offset).astype(np.int32))
+            value = tree.value[order, 0, :n_classes].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            if not np.allclose(normalizer, 1.0):
+                # sklearn < 1.4 guarda conteos y normaliza en predict_proba
+                normalizer[normalizer == 0.0] = 1.0
+                value = value / normalizer
+            values.append(value)
+            roots.append(offset)
+            offset += len(order)
+            depth = max(depth, tree.max_depth)
+        return cls(
+            np.concatenate(features), np.concatenate(thresholds), np.concatenate(lefts),
+            np.concatenate(values), np.array(roots, dtype=np.int32),
+            np.asarray(model.classes_), depth, model.n_features_in_,
+        )
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in _CAMPOS[:-1])
+
+    def apply(self, X, trees=None):
+        """Nodo hoja alcanzado por cada fila en cada árbol: array (árboles, filas)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        roots = self.roots if trees is None else self.roots[trees]
+        nodes = np.repeat(roots[:, np.newaxis].astype(np.intp), len(X), axis=1)
+        flat = X.ravel()
+        row_start = (np.arange(len(X)) * X.shape[1])[np.newaxis, :]
+        for _ in range(self.depth):
+            go_right = flat[row_start + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.left[nodes] + go_right
+        return nodes
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        proba = np.zeros((len(X), len(self.classes_)), dtype=np.float64)
+        if len(X) == 0:
+            return proba
+        per_block = max(_BLOQUE // len(X), 1)
+        for start in range(0, self.n_estimators, per_block):
+            leaves = self.apply(X, slice(start, start + per_block))
+            if len(leaves) == 1:
+                proba += self.value[leaves[0]]
+            else:
+                # cumsum suma árbol por árbol en orden, igual que sklearn
+                proba = np.cumsum(np.concatenate([proba[np.newaxis], self.value[leaves]]), axis=0)[-1]
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def digest(self):
+        """Huella de los arrays (clave de las tablas compiladas desde este modelo)."""
+        sha = hashlib.sha1()
+        for name in _CAMPOS:
+            sha.update(np.ascontiguousarray(getattr(self, name)).tobytes())
+        return sha.hexdigest()
+
+    def save(self, path):
+        """Guarda el bosque de forma atómica (.npz sin comprimir para poder mapearlo)."""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, format=_FORMATO, depth=self.depth, n_features=self.n_features_in_,
+                 **{name: getattr(self, name) for name in _CAMPOS})
+        os.replace(tmp_path, path)
+
+    def __getstate__(self):
+        # Los arrays mapeados se serializan como arrays normales
+        state = dict(self.__dict__)
+        for name in _CAMPOS:
+            state[name] = np.asarray(state[name])
+        return state
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Carga un bosque; con mmap=True los arrays se mapean desde el archivo."""
+        arrays = _cargar_npz_mmap(path) if mmap else dict(np.load(path))
+        if int(arrays['format']) != _FORMATO:
+            raise ValueError(f"Formato de modelo compacto no soportado: {path}")
+        return cls(*(arrays[name] for name in _CAMPOS),
+                   int(arrays['depth']), int(arrays['n_features']))
+
+
+def _orden_hermanos(children_left, children_right):
+    """Nodos de un árbol en orden de recorrido por niveles (hermanos contiguos)."""
+    order = [0]
+    for node in order:
+        if children_left[node] >= 0:
+            order.append(children_left[node])
+            order.append(children_right[node])
+    return np.array(order, dtype=np.intp)
+
+
+def _cargar_npz_mmap(path):
+    """
+    Arrays de un .npz sin comprimir mapeados en memoria.
+
+    np.load ignora mmap_mode en los .npz; como los miembros se guardan sin
+    comprimir, los datos de cada .npy son contiguos dentro del zip y se
+    pueden mapear leyendo su cabecera local.
+    """
+    arrays = {}
+    with open(path, 'rb') as f, zipfile.ZipFile(f) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(archive.open(info))
+                continue
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_len, extra_len = struct.unpack('<HH', header[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject or 0 in shape or not shape:
+                # Escalares y arrays vacíos: se leen normalmente
+                f.seek(info.header_offset)
+                arrays[name] = np.load(archive.open(info))
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(),
+                                     shape=shape, order='F' if fortran else 'C')
+    return arrays
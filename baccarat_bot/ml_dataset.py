@@ -0,0 +1,102 @@
+# baccarat_bot/ml_dataset.py
+"""
+Dataset de entrenamiento ML leído de la tabla ``resultados``.
+
+El historial en memoria de cada mesa es corto; la base de datos guarda todas
+las rondas registradas. ``DatasetBuilder`` las lee por mesa en bloques
+(``fetchmany``) con un cursor por id, convierte cada bloque a códigos int8
+con ``np.fromiter`` (el resultado ya llega codificado desde SQL) y lo copia
+en el buffer preasignado de un ``FeatureMatrix``, que expone las ventanas
+de características como vistas sin copiar. Cada refresh() solo lee las
+filas con id mayor que el último visto.
+"""
+import itertools
+import logging
+import sqlite3
+from typing import Optional, Tuple
+
+import numpy as np
+
+from baccarat_bot.ml_predictor import FeatureMatrix
+
+logger = logging.getLogger(__name__)
+
+# Código del resultado calculado en SQL (P=0, B=1, E=2; 3 = inválido)
+_CODIGO_SQL = """CASE r.resultado
+                     WHEN 'P' THEN 0 WHEN 'Player' THEN 0
+                     WHEN 'B' THEN 1 WHEN 'Banker' THEN 1
+                     WHEN 'E' THEN 2 WHEN 'Tie' THEN 2
+                     ELSE 3 END"""
+
+
+class DatasetBuilder:
+    """Características ML de una mesa, actualizadas de forma incremental desde SQLite."""
+
+    def __init__(self, db_path: str, mesa_nombre: str, window: int = 12,
+                 chunk_size: int = 10000, max_rows: Optional[int] = None):
+        """
+        Args:
+            db_path: Ruta de la base de datos SQLite
+            mesa_nombre: Mesa cuyos resultados se leen
+            window: Jugadas previas por fila de características
+            chunk_size: Filas leídas por bloque
+            max_rows: Filas de entrenamiento conservadas (None = todas)
+        """
+        self.db_path = db_path
+        self.mesa_nombre = mesa_nombre
+        self.chunk_size = chunk_size
+        self.features = FeatureMatrix(window, max_rows)
+        self.last_id = 0
+        self.skipped = 0  # Filas con resultados no reconocidos
+
+    def refresh(self) -> int:
+        """Lee las filas nuevas (id > last_id); retorna cuántas rondas se agregaron."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            pending = conn.execute(
+                """SELECT COUNT(*)
+                   FROM resultados r
+                   JOIN mesas m ON r.mesa_id = m.id
+                   WHERE m.nombre = ? AND r.id > ?""",
+                (self.mesa_nombre, self.last_id)
+            ).fetchone()[0]
+            if not pending:
+                return 0
+            self.features.reserve(pending)
+
+            cursor = conn.execute(
+                f"""SELECT r.id, {_CODIGO_SQL}
+                    FROM resultados r
+                    JOIN mesas m ON r.mesa_id = m.id
+                    WHERE m.nombre = ? AND r.id > ?
+                    ORDER BY r.id""",
+                (self.mesa_nombre, self.last_id)
+            )
+            added = 0
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                block = np.fromiter(
+                    itertools.chain.from_iterable(rows), dtype=np.int64, count=2 * len(rows)
+                ).reshape(-1, 2)
+                codes = block[:, 1]
+                valid = codes < 3
+                self.skipped += len(codes) - int(valid.sum())
+                self.features.extend(codes[valid])
+                added += int(valid.sum())
+                self.last_id = int(block[-1, 0])
+            return added
+        finally:
+            conn.close()
+
+    def codes(self) -> np.ndarray:
+        """Códigos de las rondas conservadas (vista)."""
+        return self.features.codes()
+
+    def dataset(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(X, y) con todas las filas conservadas."""
+        return self.features.matrix()
+
+    def __len__(self) -> int:
+        return len(self.features)
@@ -1,30 +1,186 @@
 # baccarat_bot/ml_integration.py
 """
 Módulo para integrar el predictor ML en la lógica de señales.
+
+Cada mesa tiene su propio predictor, guardado en un pool con presupuesto
+de memoria (ML_MEMORIA_MODELOS_MB) que desaloja a disco los menos usados.
+Por defecto (ML_ONLINE=true) es un predictor online de n-gramas: cada
+ronda nueva cuesta O(1) y el reentrenamiento completo solo ocurre cada
+ML_REENTRENAR_CADA rondas o al detectar deriva. Con
+ML_MODELO_ONLINE=markov se usa en su lugar un MarkovPredictor (tensor de
+conteos con backoff a órdenes menores y decaimiento ML_DECAIMIENTO). Con
+ML_ONLINE=false se reentrena el RandomForest en cada llamada, en un proceso
+aparte (ML_ENTRENAR_EN_SEGUNDO_PLANO) mientras se sigue usando el modelo
+anterior. Los bosques se guardan exportados a arrays (CompactForest), y
+con ML_MODELO_COMPACTO se carga al arrancar un modelo .npz (mapeado en
+memoria) que usan las mesas que aún no tienen modelo propio; predecir
+no requiere sklearn.
+
+predecir_ml_lote() predice todas las mesas de un ciclo juntas: agrupa las
+ventanas por modelo y resuelve las de cada bosque con una sola consulta a
+su tabla de probabilidades y un solo predict_proba para las que faltan.
 """
-from baccarat_bot.ml_predictor import BaccaratMLPredictor
+import os
 import logging
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from baccarat_bot.ml_dataset import DatasetBuilder
+from baccarat_bot.ml_predictor import (
+    BaccaratMLPredictor, FeatureMatrix, codificar_historial, senal_desde_probabilidades
+)
+from baccarat_bot.ml_pool import ModelPool
+from baccarat_bot.ml_trainer import BackgroundTrainer
+from baccarat_bot.utils.result_cache import version_historial
+
+ML_ONLINE = os.getenv('ML_ONLINE', 'true').lower() == 'true'
+ML_ORDEN = int(os.getenv('ML_ORDEN', '3'))
+# Modelo del modo online: 'ngram' (BaccaratMLPredictor) o 'markov' (MarkovPredictor)
+ML_MODELO_ONLINE = os.getenv('ML_MODELO_ONLINE', 'ngram').lower()
+ML_BACKOFF = os.getenv('ML_BACKOFF', 'true').lower() == 'true'
+ML_DECAIMIENTO = float(os.getenv('ML_DECAIMIENTO', '1.0'))
+ML_REENTRENAR_CADA = int(os.getenv('ML_REENTRENAR_CADA', '500'))
+ML_VENTANA_DERIVA = int(os.getenv('ML_VENTANA_DERIVA', '100'))
+ML_UMBRAL_DERIVA = float(os.getenv('ML_UMBRAL_DERIVA', '0.2'))
+ML_ENTRENAR_EN_SEGUNDO_PLANO = os.getenv('ML_ENTRENAR_EN_SEGUNDO_PLANO', 'true').lower() == 'true'
+ML_FILAS_MAXIMAS = int(os.getenv('ML_FILAS_MAXIMAS', '5000'))
+ML_MEMORIA_MODELOS_MB = float(os.getenv('ML_MEMORIA_MODELOS_MB', '256'))
+# Base de datos con la tabla resultados para entrenar el modo batch (vacío = no usar)
+ML_DB_PATH = os.getenv('ML_DB_PATH', '')
+# Modelo compacto (.npz de save_compact) precargado para el modo batch (vacío = ninguno)
+ML_MODELO_COMPACTO = os.getenv('ML_MODELO_COMPACTO', '')
 
 ml_predictor = BaccaratMLPredictor()
+if ML_MODELO_COMPACTO and os.path.exists(ML_MODELO_COMPACTO):
+    ml_predictor.load_compact(ML_MODELO_COMPACTO)
+
+# Un predictor por mesa y configuración, acotado en memoria (LRU a disco)
+pool_modelos = ModelPool(ML_MEMORIA_MODELOS_MB)
+
+# Matrices de características por mesa (modo batch): solo se agregan filas nuevas
+features_por_mesa: Dict[str, FeatureMatrix] = {}
+
+# Datasets leídos incrementalmente de la base de datos, por mesa
+datasets_por_mesa: Dict[str, DatasetBuilder] = {}
 
 logger = logging.getLogger(__name__)
 
-def entrenar_ml_si_posible(historial):
-    
-    
+_MESA_GLOBAL = '_global'
+
+_SIN_PREDICCION = object()
+
+# Apuesta ML con el nombre que usan las estrategias
+APUESTAS_ML = {'Player': 'JUGADOR', 'Banker': 'BANCA', 'Tie': 'EMPATE'}
+
+
+def _config_modelo() -> Dict[str, Any]:
+    """Configuración del predictor según el modo (parte de la clave del pool)."""
+    if not ML_ONLINE:
+        return {}
+    if ML_MODELO_ONLINE == 'markov':
+        return {
+            'backend': 'markov',
+            'order': ML_ORDEN,
+            'backoff': ML_BACKOFF,
+            'decay': ML_DECAIMIENTO,
+        }
+    return {
+        'online': True,
+        'order': ML_ORDEN,
+        'retrain_every': ML_REENTRENAR_CADA,
+        'drift_window': ML_VENTANA_DERIVA,
+        'drift_threshold': ML_UMBRAL_DERIVA,
+    }
+
+
+def _instalar_modelo(clave, predictor):
+    """Reemplaza el modelo de una mesa de una vez (las predicciones en curso usan el anterior)."""
+    global ml_predictor
+    pool_modelos.put(clave, predictor, _config_modelo())
+    if clave == _MESA_GLOBAL:
+        ml_predictor = predictor
+    logger.info("Modelo ML entrenado en segundo plano instalado (%s)", clave)
+
+
+entrenador_ml = BackgroundTrainer(_instalar_modelo)
+
+
+def _predictor_mesa(mesa_nombre: Optional[str], crear: bool = True) -> Optional[BaccaratMLPredictor]:
+    return pool_modelos.get(mesa_nombre or _MESA_GLOBAL, _config_modelo(), create=crear)
+
+
+def _dataset_mesa(mesa_nombre: Optional[str]) -> Optional[DatasetBuilder]:
+    """Dataset de la base de datos actualizado con las filas nuevas (si está configurada)."""
+    if not ML_DB_PATH or not mesa_nombre:
+        return None
+    builder = datasets_por_mesa.get(mesa_nombre)
+    if builder is None:
+        builder = DatasetBuilder(ML_DB_PATH, mesa_nombre, ml_predictor.window, max_rows=ML_FILAS_MAXIMAS)
+        datasets_por_mesa[mesa_nombre] = builder
+    builder.refresh()
+    return builder if len(builder) else None
+
+
+def entrenar_ml_si_posible(historial, mesa_nombre=None, total=None):
+    """
+    Actualiza el modelo ML de una mesa con su historial.
+
+    En modo online solo se incorporan las rondas nuevas (total es el número
+    absoluto de rondas que representa historial, p. ej. la versión de un
+    HistoryBuffer) y se reentrena por calendario o deriva.
+    """
+    mesa = mesa_nombre or _MESA_GLOBAL
     try:
-        ml_predictor.train(historial)
-        if ml_predictor.is_trained:
+        if ML_ONLINE:
+            predictor = _predictor_mesa(mesa)
+            if predictor.sync(historial, total):
+                logger.info(
+                    "Modelo ML online reentrenado para %s con %d jugadas",
+                    mesa, len(historial)
+                )
+            return
+        # Con base de datos se entrena con todas las rondas registradas de la mesa
+        dataset = _dataset_mesa(mesa_nombre)
+        if ML_ENTRENAR_EN_SEGUNDO_PLANO:
+            # No bloquea el bucle: se sigue usando el modelo anterior
+            entrenador_ml.submit(mesa, dataset.codes() if dataset else historial)
+            return
+        if dataset is None:
+            dataset = features_por_mesa.get(mesa)
+            if dataset is None:
+                dataset = FeatureMatrix(ml_predictor.window, ML_FILAS_MAXIMAS)
+                features_por_mesa[mesa] = dataset
+            dataset.sync(historial, total)
+            X, y = dataset.matrix()
+        else:
+            X, y = dataset.dataset()
+        predictor = BaccaratMLPredictor()
+        predictor.fit(X, y)
+        if predictor.is_trained:
+            predictor.compact()
+            _instalar_modelo(mesa, predictor)
             logger.info("Modelo ML entrenado con %d jugadas", len(historial))
     except Exception as e:
         logger.warning(f"Error entrenando modelo ML: {e}")
 
-    
-def obtener_prediccion_ml(historial):
-    
+
+def _predictor_prediccion(mesa_nombre: Optional[str]) -> Optional[BaccaratMLPredictor]:
+    # En modo batch una mesa sin modelo entrenado todavía no predice
+    predictor = _predictor_mesa(mesa_nombre, crear=ML_ONLINE)
+    if predictor is None and ML_MODELO_COMPACTO and ml_predictor.is_trained:
+        # Modelo precargado para las mesas sin modelo propio
+        predictor = ml_predictor
+    if predictor is None or not predictor.is_trained:
+        return None
+    return predictor
+
+
+def obtener_prediccion_ml(historial, mesa_nombre=None):
     try:
-        if ml_predictor.is_trained:
-            pred = ml_predictor.predict_next(historial)
+        predictor = _predictor_prediccion(mesa_nombre)
+        if predictor is not None:
+            pred = predictor.predict_next(historial)
             if pred:
                 return pred
     except Exception as e:
@@ -32,6 +188,76 @@ def obtener_prediccion_ml(historial):
     return None
 
 
+def predecir_ml_lote(historiales: Dict[str, Any]) -> Dict[str, Optional[Tuple[str, float]]]:
+    """
+    Predicciones ML de varias mesas en una sola pasada.
+
+    Args:
+        historiales: {mesa: historial hasta la ronda a predecir}
+
+    Returns:
+        {mesa: (apuesta 'Player'/'Banker'/'Tie', probabilidad) o None}
+    """
+    predicciones: Dict[str, Optional[Tuple[str, float]]] = dict.fromkeys(historiales)
+    # Mesas con bosque agrupadas por modelo: {id: (predictor, [mesas], [ventanas])}
+    grupos: Dict[int, Tuple[BaccaratMLPredictor, list, list]] = {}
+    for mesa, historial in historiales.items():
+        try:
+            predictor = _predictor_prediccion(mesa)
+            if predictor is None:
+                continue
+            if predictor.online:
+                # Una consulta O(1) a los conteos: no hay nada que agrupar
+                predicciones[mesa] = senal_desde_probabilidades(predictor.predict_proba_next(historial))
+            elif len(historial) >= predictor.window:
+                grupo = grupos.setdefault(id(predictor), (predictor, [], []))
+                grupo[1].append(mesa)
+                grupo[2].append(codificar_historial(historial, predictor.window))
+        except Exception as e:
+            logger.warning(f"Error en predicción ML de {mesa}: {e}")
+
+    for predictor, mesas, ventanas in grupos.values():
+        try:
+            probas = predictor.predict_proba_windows(np.stack(ventanas))
+        except Exception as e:
+            logger.warning(f"Error en predicción ML por lote: {e}")
+            continue
+        for mesa, proba in zip(mesas, probas):
+            predicciones[mesa] = senal_desde_probabilidades(proba)
+    return predicciones
+
+
+def entrenar_y_predecir_ml_lote(historiales: Dict[str, Any], totales: Optional[Dict[str, int]] = None,
+                                cache=None) -> Dict[str, Optional[Tuple[str, float]]]:
+    """
+    Actualiza el modelo de cada mesa con su historial y las predice en un lote.
+
+    Args:
+        historiales: {mesa: historial}
+        totales: {mesa: rondas absolutas del historial} (por defecto la
+            versión de un HistoryBuffer o su longitud)
+        cache: ResultCache opcional; las mesas cuyo historial no cambió
+            reutilizan la predicción guardada sin reentrenar
+    """
+    predicciones: Dict[str, Optional[Tuple[str, float]]] = {}
+    pendientes: Dict[str, Any] = {}
+    for mesa, historial in historiales.items():
+        if cache is not None:
+            guardada = cache.get(mesa, 'ml', version_historial(historial), _SIN_PREDICCION)
+            if guardada is not _SIN_PREDICCION:
+                predicciones[mesa] = guardada
+                continue
+        total = (totales or {}).get(mesa, getattr(historial, 'version', None))
+        entrenar_ml_si_posible(historial, mesa, total)
+        pendientes[mesa] = historial
+
+    for mesa, prediccion in predecir_ml_lote(pendientes).items():
+        if cache is not None:
+            cache.put(mesa, 'ml', version_historial(pendientes[mesa]), prediccion)
+        predicciones[mesa] = prediccion
+    return predicciones
+
+
 def evaluar_ml(historial):
     """
     Evalúa el modelo ML con el historial dado y muestra métricas de precisión.
@@ -0,0 +1,239 @@
+# baccarat_bot/ml_markov.py
+"""
+Predictor de Markov de orden k por conteo: un modelo base casi gratuito.
+
+Los conteos de transiciones se guardan en un tensor NumPy: para el orden k
+son 3^k filas (una por contexto de k jugadas, codificado en base 3 con la
+jugada más reciente en la cifra menos significativa) por 3 columnas (la
+jugada siguiente). Con backoff también se guardan los órdenes 0..k-1 en el
+mismo array plano, de modo que cada ronda actualiza k+1 filas (O(1) para k
+fijo) y un contexto con pocas observaciones se resuelve con el orden
+inferior.
+
+El decaimiento exponencial (decay < 1) da más peso a las rondas recientes
+sin recorrer el tensor: cada ronda suma un peso que crece como
+1/decay^t y las probabilidades solo dependen de los cocientes. El tensor se
+reescala cuando el peso se acerca al límite del float.
+
+El array completo de conteos es el modelo: se combina entre mesas
+sumándolo (merge) y se guarda en un .npz junto con las rondas vistas y los
+parámetros. Los conteos importados de otras mesas se guardan en una capa
+aparte que el reentrenamiento local no borra, y no cuentan como rondas de
+la mesa al sincronizar.
+"""
+import numpy as np
+
+from baccarat_bot.ml_predictor import _CODIGOS_ML, codificar_historial, senal_desde_probabilidades
+
+# Reescalar los conteos cuando el peso de la ronda supera este valor
+_ESCALA_MAXIMA = 1e100
+
+
+def _desplazamiento(order):
+    """Primera fila del orden dado en el array plano (órdenes 0..k consecutivos)."""
+    return (3 ** order - 1) // 2
+
+
+def _orden_de_filas(rows):
+    """Orden máximo de un array plano con el número de filas dado."""
+    order = 0
+    while _desplazamiento(order + 1) < rows:
+        order += 1
+    if _desplazamiento(order + 1) != rows:
+        raise ValueError(f"{rows} filas no corresponden a ningún orden")
+    return order
+
+
+class MarkovPredictor:
+    """
+    Predictor de Markov de orden k actualizable ronda a ronda.
+
+    Misma interfaz que el modo online de BaccaratMLPredictor (train,
+    update, sync, predict_proba_next, predict_next), así que ml_integration
+    y ModelPool lo usan sin distinguirlos.
+    """
+
+    online = True
+
+    def __init__(self, order=3, backoff=True, decay=1.0, min_observations=5, min_rounds=30):
+        """
+        Args:
+            order: Jugadas de contexto (k)
+            backoff: Si un contexto tiene menos de min_observations, usar
+                el orden inferior
+            decay: Factor por ronda del peso de las observaciones (1 = sin
+                decaimiento)
+            min_observations: Observaciones (efectivas) para predecir con un contexto
+            min_rounds: Rondas vistas para considerar el modelo entrenado
+        """
+        if not 0 < decay <= 1:
+            raise ValueError("decay debe estar en (0, 1]")
+        self.order = order
+        self.backoff = backoff
+        self.decay = decay
+        self.min_observations = min_observations
+        self.min_rounds = min_rounds
+        self.retrains = 0
+        # Conteos de otras mesas (merge), en la misma escala que counts
+        self._imported = np.zeros((_desplazamiento(order + 1), 3), dtype=np.float64)
+        self.rounds_imported = 0
+        self._reset()
+
+    def _reset(self):
+        # Los conteos importados se conservan con su peso efectivo actual
+        self._imported = self._imported / getattr(self, '_scale', 1.0)
+        self.counts = np.zeros((_desplazamiento(self.order + 1), 3), dtype=np.float64)
+        self._scale = 1.0
+        self._context = 0
+        self._context_len = 0
+        self.rounds_seen = 0    # Rondas de esta mesa (las que sync compara)
+
+    @property
+    def tensor(self):
+        """Conteos del orden k: vista de forma (3^k, 3)."""
+        return self.counts[_desplazamiento(self.order):]
+
+    @property
+    def is_trained(self):
+        return self.rounds_seen + self.rounds_imported >= self.min_rounds
+
+    def _orders(self):
+        return range(self.order + 1) if self.backoff else (self.order,)
+
+    def train(self, history):
+        """Reconstruye los conteos desde cero con el historial dado."""
+        self._reset()
+        codes = np.asarray(codificar_historial(history), dtype=np.int64)
+        n = len(codes)
+        if n:
+            # Peso de la ronda i: decay^(n-1-i) relativo a la última (escala 1)
+            weights = self.decay ** np.arange(n - 1, -1, -1, dtype=np.float64)
+            for j in self._orders():
+                if n <= j:
+                    continue
+                contexts = np.zeros(n - j, dtype=np.int64)
+                for i in range(j):
+                    contexts = contexts * 3 + codes[i:n - j + i]
+                np.add.at(self.counts, (_desplazamiento(j) + contexts, codes[j:]), weights[j:])
+            for code in codes[-self.order:].tolist() if self.order else ():
+                self._context = (self._context * 3 + code) % (3 ** self.order)
+            self._context_len = min(n, self.order)
+        self.rounds_seen = n
+        self.retrains += 1
+
+    def update(self, new_result):
+        """Incorpora una ronda en O(k)."""
+        code = new_result if isinstance(new_result, (int, np.integer)) else _CODIGOS_ML.get(new_result, 2)
+        code = int(code)
+        if self.decay < 1:
+            self._scale /= self.decay
+            if self._scale > _ESCALA_MAXIMA:
+                self.counts /= self._scale
+                self._imported /= self._scale
+                self._scale = 1.0
+        # El contexto de orden j son las j cifras bajas del contexto actual
+        for j in self._orders():
+            if j <= self._context_len:
+                self.counts[_desplazamiento(j) + self._context % 3 ** j, code] += self._scale
+        self._push(code)
+        self.rounds_seen += 1
+
+    def _push(self, code):
+        if self.order:
+            self._context = (self._context * 3 + code) % (3 ** self.order)
+        self._context_len = min(self._context_len + 1, self.order)
+
+    def sync(self, history, total=None):
+        """
+        Alimenta el modelo con las rondas de history que aún no vio (total
+        es el número absoluto de rondas que representa history). Si el
+        historial no encaja con lo visto, reconstruye los conteos. Retorna
+        True si los reconstruyó.
+        """
+        codes = codificar_historial(history)
+        total = len(codes) if total is None else total
+        new = total - self.rounds_seen
+        if 0 <= new <= len(codes) and self.rounds_seen:
+            for code in codes[len(codes) - new:].tolist():
+                self.update(code)
+            return False
+        self.train(codes)
+        self.rounds_seen = total
+        return True
+
+    def _counts_for(self, context, order):
+        """Conteos efectivos (sin la escala del decaimiento) de un contexto de orden dado."""
+        row = _desplazamiento(order) + context % (3 ** order)
+        return (self.counts[row] + self._imported[row]) / self._scale
+
+    def predict_proba_next(self, history):
+        """Probabilidades (Player, Banker, Tie) con suavizado de Laplace, o None."""
+        if not self.is_trained or len(history) < self.order:
+            return None
+        context = 0
+        for code in codificar_historial(history, self.order).tolist():
+            context = context * 3 + code
+        for j in (range(self.order, -1, -1) if self.backoff else (self.order,)):
+            counts = self._counts_for(context, j)
+            total = counts.sum()
+            if total >= self.min_observations:
+                return (counts + 1) / (total + 3)
+        return None
+
+    def predict_next(self, history):
+        senal = senal_desde_probabilidades(self.predict_proba_next(history))
+        return senal[0] if senal else None
+
+    def merge(self, other):
+        """
+        Suma los conteos de otro predictor del mismo orden (p. ej. de otra mesa).
+
+        Van a la capa de conteos importados: la mesa sigue sincronizando
+        solo sus propias rondas y un reentrenamiento local no los descarta.
+        """
+        if other.order != self.order or other.backoff != self.backoff:
+            raise ValueError("Solo se combinan predictores con el mismo orden y backoff")
+        self._imported += other.to_array() * self._scale
+        self.rounds_imported += other.rounds_seen + other.rounds_imported
+        return self
+
+    def to_array(self):
+        """Conteos efectivos como un solo array (filas de los órdenes 0..k)."""
+        return (self.counts + self._imported) / self._scale
+
+    @classmethod
+    def from_array(cls, counts, rounds_seen, **kwargs):
+        """Predictor con los conteos de to_array(); el orden sale del número de filas."""
+        counts = np.asarray(counts, dtype=np.float64)
+        predictor = cls(order=_orden_de_filas(len(counts)), **kwargs)
+        predictor.counts = counts.copy()
+        predictor.rounds_seen = int(rounds_seen)
+        return predictor
+
+    def save(self, path):
+        """Guarda conteos, rondas, contexto y parámetros en un .npz."""
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                counts=self.counts / self._scale,
+                imported=self._imported / self._scale,
+                state=np.array([self.rounds_seen, self.rounds_imported,
+                                self._context, self._context_len], dtype=np.int64),
+                params=np.array([self.order, self.decay, self.backoff], dtype=np.float64)
+            )
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Predictor guardado con save(); kwargs fija los demás parámetros (min_rounds...)."""
+        with np.load(path) as data:
+            order, decay, backoff = data['params'].tolist()
+            rounds_seen, rounds_imported, context, context_len = data['state'].tolist()
+            predictor = cls.from_array(data['counts'], rounds_seen, decay=decay,
+                                       backoff=bool(backoff), **kwargs)
+            if predictor.order != int(order):
+                raise ValueError(f"Archivo inconsistente: orden {int(order)} con {len(data['counts'])} filas")
+            predictor._imported = data['imported'].copy()
+        predictor.rounds_imported = rounds_imported
+        predictor._context = context
+        predictor._context_len = context_len
+        return predictor
@@ -0,0 +1,165 @@
+# baccarat_bot/ml_pool.py
+"""
+Pool de predictores ML por mesa con presupuesto de memoria.
+
+Cada mesa (y configuración de modelo) tiene su propio predictor
+(BaccaratMLPredictor, o MarkovPredictor si la configuración lo pide con
+``backend='markov'``), así que las mesas ya no se pisan el modelo entre sí. El tamaño de cada
+predictor se mide con su serialización (pickle) al instalarlo; cuando la
+suma supera el presupuesto, los menos usados recientemente se guardan en
+disco y se liberan de memoria. Se vuelven a cargar al pedirlos; solo se leen
+del disco los modelos que esta misma instancia desalojó, nunca archivos de
+una ejecución anterior.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from baccarat_bot.ml_markov import MarkovPredictor
+from baccarat_bot.ml_predictor import BaccaratMLPredictor
+from baccarat_bot.utils.cache_dir import directorio_cache
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO_MODELOS = os.getenv('ML_DIRECTORIO_MODELOS') or directorio_cache('ml_models')
+
+
+def clave_config(config: Optional[Dict[str, Any]]) -> str:
+    """Representación estable de una configuración de modelo."""
+    return json.dumps(config or {}, sort_keys=True, default=repr)
+
+
+def crear_predictor(config: Optional[Dict[str, Any]] = None):
+    """Predictor nuevo para una configuración (la clave 'backend' elige la clase)."""
+    config = dict(config or {})
+    if config.pop('backend', None) == 'markov':
+        return MarkovPredictor(**config)
+    return BaccaratMLPredictor(**config)
+
+
+class ModelPool:
+    """LRU de predictores por (mesa, configuración) acotado en MB."""
+
+    def __init__(self, budget_mb: float = 256, directory: str = DIRECTORIO_MODELOS):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.directory = directory
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[BaccaratMLPredictor, int]]' = OrderedDict()
+        self._bytes = 0
+        # Claves desalojadas a disco por esta instancia (las únicas que se recargan)
+        self._evicted = set()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.disk_loads = 0
+        self.created = 0
+        self.evictions = 0
+
+    def _path(self, key: Tuple[str, str]) -> str:
+        digest = hashlib.sha1('\0'.join(key).encode('utf-8')).hexdigest()[:16]
+        safe_name = ''.join(c if c.isalnum() else '_' for c in key[0])[:40]
+        return os.path.join(self.directory, f"{safe_name}-{digest}.pkl")
+
+    def get(self, mesa: str, config: Optional[Dict[str, Any]] = None,
+            create: bool = True) -> Optional[BaccaratMLPredictor]:
+        """
+        Predictor de una mesa: en memoria, recargado de disco o nuevo.
+
+        Con create=False retorna None si la mesa aún no tiene predictor.
+        """
+        key = (mesa, clave_config(config))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            predictor = self._load(key) if key in self._evicted else None
+            if predictor is not None:
+                self.disk_loads += 1
+            elif create:
+                predictor = crear_predictor(config)
+                self.created += 1
+            else:
+                return None
+            self._insert(key, predictor)
+            return predictor
+
+    def put(self, mesa: str, predictor: BaccaratMLPredictor,
+            config: Optional[Dict[str, Any]] = None) -> None:
+        """Instala (o reemplaza) el predictor de una mesa y remide su tamaño."""
+        key = (mesa, clave_config(config))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            # El predictor nuevo reemplaza también a la copia desalojada
+            self._discard(key)
+            self._insert(key, predictor)
+
+    def _insert(self, key, predictor) -> None:
+        size = len(pickle.dumps(predictor, protocol=pickle.HIGHEST_PROTOCOL))
+        self._entries[key] = (predictor, size)
+        self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        # Siempre se conserva al menos el predictor recién usado
+        while self._bytes > self.budget_bytes and len(self._entries) > 1:
+            key, (predictor, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                self._save(key, predictor)
+                self._evicted.add(key)
+            except OSError as e:
+                logger.warning(f"No se pudo guardar el modelo de {key[0]} al desalojarlo: {e}")
+
+    def _save(self, key, predictor) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(predictor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def _load(self, key) -> Optional[BaccaratMLPredictor]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Modelo en disco ilegible para {key[0]}, se descarta: {e}")
+            return None
+        finally:
+            # Una vez en memoria la copia en disco queda obsoleta
+            self._discard(key)
+
+    def _discard(self, key) -> None:
+        if key in self._evicted:
+            self._evicted.discard(key)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def __contains__(self, mesa: str) -> bool:
+        with self._lock:
+            return any(key[0] == mesa for key in self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'models': len(self._entries),
+                'memory_mb': self._bytes / (1024 * 1024),
+                'budget_mb': self.budget_bytes / (1024 * 1024),
+                'hits': self.hits,
+                'disk_loads': self.disk_loads,
+                'created': self.created,
+                'evictions': self.evictions,
+            }
@@ -1,15 +1,278 @@
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+import hashlib
+import os
+from collections import deque
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from numpy.lib.stride_tricks import sliding_window_view
 import pickle
 
+# sklearn solo se importa al entrenar o evaluar: la inferencia con un
+# modelo compacto (ml_compact) no lo necesita
+from baccarat_bot.ml_compact import CompactForest
+
+UMBRAL_SENAL = 0.4
+
+_CODIGOS_ML = {
+    'Player': 0, 'Banker': 1, 'Tie': 2,
+    'P': 0, 'B': 1, 'E': 2
+}
+
+
+def codificar_historial(history, n=None):
+    """
+    Códigos (P=0, B=1, E=2) de las últimas n jugadas del historial.
+
+    Acepta un HistoryBuffer (vista sin copia), un array de códigos o una
+    lista de strings ('P'/'B'/'E' o 'Player'/'Banker'/'Tie').
+    """
+    if hasattr(history, 'as_numpy'):
+        return history.as_numpy(n)
+    if isinstance(history, np.ndarray):
+        return history if n is None else history[max(len(history) - n, 0):]
+    if n is not None:
+        history = history[max(len(history) - n, 0):]
+    return np.array([_CODIGOS_ML.get(h, 2) for h in history], dtype=np.int8)
+
+
+def ventanas_features(codes, window):
+    """
+    (X, y) sin bucles: cada fila de X es una vista de las ``window`` jugadas
+    previas a y (sliding_window_view, sin copiar los códigos).
+    """
+    codes = np.asarray(codes, dtype=np.int8)
+    if len(codes) <= window:
+        return np.empty((0, window), dtype=np.int8), np.empty(0, dtype=np.int8)
+    return sliding_window_view(codes, window)[:-1], codes[window:]
+
+
+class FeatureMatrix:
+    """
+    Matriz de características de una mesa que crece ronda a ronda.
+
+    Los códigos se guardan en un array int8 con capacidad que se duplica y
+    X es una vista por ventanas sobre él: agregar rondas solo agrega filas.
+    Con max_rows se conservan las últimas max_rows filas (el array se
+    compacta de vez en cuando, en O(1) amortizado). Las matrices devueltas
+    son vistas válidas hasta la siguiente llamada a extend().
+    """
+
+    def __init__(self, window=12, max_rows=None):
+        self.window = window
+        self.max_rows = max_rows
+        self._codes = np.empty(1024, dtype=np.int8)
+        self._size = 0
+        self.total = 0  # Rondas absolutas incorporadas
+
+    def __len__(self):
+        return max(min(self._kept(), self._size) - self.window, 0)
+
+    def _kept(self):
+        return self._size if self.max_rows is None else self.max_rows + self.window
+
+    def extend(self, codes):
+        codes = np.asarray(codes, dtype=np.int8)
+        if self.max_rows is not None:
+            keep = self._kept()
+            if len(codes) >= keep:
+                self._size = 0
+                codes = codes[-keep:]
+            elif self._size + len(codes) > 2 * keep:
+                # Compactar: mover al inicio solo lo que se sigue usando
+                start = self._size - (keep - len(codes))
+                self._codes[:self._size - start] = self._codes[start:self._size]
+                self._size -= start
+        needed = self._size + len(codes)
+        if needed > len(self._codes):
+            self._grow(max(needed, 2 * len(self._codes)))
+        self._codes[self._size:needed] = codes
+        self._size = needed
+        self.total += len(codes)
+
+    def _grow(self, capacity):
+        grown = np.empty(capacity, dtype=np.int8)
+        grown[:self._size] = self._codes[:self._size]
+        self._codes = grown
+
+    def reserve(self, n):
+        """Preasigna espacio para n rondas más (p. ej. antes de leerlas de la base)."""
+        if self.max_rows is not None:
+            n = min(n, 2 * self._kept())
+        if self._size + n > len(self._codes):
+            self._grow(self._size + n)
+
+    def append(self, result):
+        self.extend(codificar_historial([result]))
+
+    def sync(self, history, total=None):
+        """Incorpora las rondas de history aún no vistas (ver BaccaratMLPredictor.sync)."""
+        codes = codificar_historial(history)
+        total = len(codes) if total is None else total
+        new = total - self.total
+        if 0 <= new <= len(codes):
+            self.extend(codes[len(codes) - new:])
+        else:
+            self._size = 0
+            self.extend(codes)
+        self.total = total
+
+    def codes(self):
+        """Códigos de las rondas conservadas (vista)."""
+        codes = self._codes[:self._size]
+        if self.max_rows is not None:
+            codes = codes[-self._kept():]
+        return codes
+
+    def matrix(self):
+        """(X, y) de las filas conservadas."""
+        return ventanas_features(self.codes(), self.window)
+
+
+def _probabilidades(model, X):
+    """predict_proba con una columna por código (P, B, E) aunque falten clases."""
+    probs = np.zeros((len(X), 3), dtype=np.float32)
+    probs[:, model.classes_.astype(np.int64)] = model.predict_proba(X)
+    return probs
+
+
+class ProbabilityTable:
+    """
+    Probabilidades de un modelo para cada ventana de ``window`` jugadas.
+
+    La ventana se empaqueta en un código base 3 (la jugada más reciente en
+    la cifra menos significativa) que indexa un array denso de 3^window
+    filas. Las filas se llenan de forma perezosa (en lote con fill() o de a
+    una en lookup()) y quedan memorizadas; con fill_all() la tabla queda
+    completa y el modelo ya no hace falta para predecir.
+    """
+
+    def __init__(self, window, probs=None, filled=None):
+        self.window = window
+        size = 3 ** window
+        self.probs = np.zeros((size, 3), dtype=np.float32) if probs is None else probs
+        self.filled = np.zeros(size, dtype=bool) if filled is None else filled
+        self._powers = 3 ** np.arange(window - 1, -1, -1, dtype=np.int64)
+        self.hits = 0
+        self.misses = 0
+
+    def codes(self, X):
+        """Código de cada fila de X (ventanas de códigos P/B/E)."""
+        return np.asarray(X, dtype=np.int64) @ self._powers
+
+    def fill(self, model, X):
+        """Calcula en un solo predict_proba las filas aún vacías de las ventanas de X."""
+        codes, first = np.unique(self.codes(X), return_index=True)
+        missing = ~self.filled[codes]
+        if missing.any():
+            self.probs[codes[missing]] = _probabilidades(model, np.asarray(X)[first[missing]])
+            self.filled[codes[missing]] = True
+
+    def fill_all(self, model, chunk_size=65536):
+        """Llena la tabla completa (compilación exhaustiva)."""
+        for start in range(0, len(self.filled), chunk_size):
+            codes = np.arange(start, min(start + chunk_size, len(self.filled)), dtype=np.int64)
+            codes = codes[~self.filled[codes]]
+            if len(codes):
+                X = (codes[:, None] // self._powers) % 3
+                self.probs[codes] = _probabilidades(model, X)
+                self.filled[codes] = True
+
+    def lookup_many(self, X, model=None):
+        """
+        Probabilidades de varias ventanas (filas de X). Las que faltan se
+        calculan con un solo predict_proba; sin modelo quedan en cero.
+        """
+        codes = self.codes(X)
+        missing = ~self.filled[codes]
+        n_missing = int(missing.sum())
+        self.hits += len(codes) - n_missing
+        if n_missing and model is not None:
+            self.misses += n_missing
+            self.fill(model, np.asarray(X)[missing])
+        return self.probs[codes]
+
+    @property
+    def complete(self):
+        return bool(self.filled.all())
+
+    def lookup(self, window_codes, model=None):
+        """Probabilidades (P, B, E) de una ventana; sin llenar y sin modelo -> None."""
+        code = 0
+        for c in window_codes.tolist():
+            code = code * 3 + c
+        if self.filled[code]:
+            self.hits += 1
+            return self.probs[code]
+        if model is None:
+            return None
+        self.misses += 1
+        self.probs[code] = _probabilidades(model, np.asarray(window_codes).reshape(1, -1))[0]
+        self.filled[code] = True
+        return self.probs[code]
+
+    def save(self, path, key=''):
+        """Guarda la tabla de forma atómica (comprimida: suele estar casi vacía)."""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, window=self.window, probs=self.probs,
+                            filled=self.filled, key=key)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, key=None):
+        """Carga una tabla; None si no existe o fue compilada para otro modelo."""
+        try:
+            with np.load(path) as data:
+                if key is not None and str(data['key']) != key:
+                    return None
+                return cls(int(data['window']), data['probs'], data['filled'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def senal_desde_probabilidades(proba):
+    """(apuesta, probabilidad) si la más probable supera el 40%, si no None."""
+    if proba is None:
+        return None
+    pred = max(range(3), key=proba.__getitem__)
+    # Solo predecir si la probabilidad es razonable (>40%)
+    if proba[pred] < UMBRAL_SENAL:
+        return None
+    return ('Player', 'Banker', 'Tie')[pred], float(proba[pred])
 
 
 class BaccaratMLPredictor:
-    def __init__(self):
+    def __init__(self, online=False, order=3, retrain_every=500,
+                 drift_window=100, drift_threshold=0.2, min_observations=5):
+        """
+        online: si es True se usa un modelo de n-gramas por conteo que se
+        actualiza en O(1) con update(); train() reconstruye los conteos y
+        solo se llama por calendario (retrain_every rondas) o por deriva
+        (distancia de variación total entre la frecuencia de resultados de
+        las últimas drift_window rondas y la que tenían al reentrenar).
+        """
         self.model = None
         self.is_trained = False
         self.window = 12  # Aumenta la ventana de historial para más contexto
+        # Tabla de probabilidades por ventana compilada desde el modelo
+        self.lut = None
+
+        self.online = online
+        self.order = order
+        self.retrain_every = retrain_every
+        self.drift_window = drift_window
+        self.drift_threshold = drift_threshold
+        self.min_observations = min_observations
+        self.retrains = 0
+        self._reset_online()
+
+    def _reset_online(self):
+        self._contexts = 3 ** self.order
+        self._counts = [[0, 0, 0] for _ in range(self._contexts)]
+        self._context = 0
+        self._context_len = 0
+        self.rounds_seen = 0
+        self.rounds_since_retrain = 0
+        self._recent = deque(maxlen=self.drift_window)
+        self._recent_counts = [0, 0, 0]
+        self._baseline = None
 
     def evaluate(self, history):
         """
@@ -21,6 +284,7 @@ class BaccaratMLPredictor:
                 "[ML] El modelo no está entrenado o no hay suficientes datos para evaluar."
             )
             return None
+        from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
         y_pred = self.model.predict(X)
         acc = accuracy_score(y, y_pred)
         print("[ML] Precisión global: {:.2f}%".format(acc * 100))
@@ -38,27 +302,25 @@ class BaccaratMLPredictor:
         """
         Convierte el historial de resultados en una matriz de características para ML.
         Cada fila representa una secuencia de 'window' jugadas previas.
-        history: lista de strings ['Player', 'Banker', 'Tie', ...]
+        history: lista de strings ['Player', 'Banker', 'Tie', ...], array de
+        códigos o HistoryBuffer
         """
         if window is None:
             window = self.window
-        mapping = {
-            'Player': 0, 'Banker': 1, 'Tie': 2,
-            'P': 0, 'B': 1, 'E': 2
-        }
-        X, y = [], []
-        for i in range(window, len(history)):
-            seq = [mapping.get(h, 2) for h in history[i - window:i]]
-            target = mapping.get(history[i], 2)
-            X.append(seq)
-            y.append(target)
-        return np.array(X), np.array(y)
+        return ventanas_features(codificar_historial(history), window)
 
     def train(self, history):
-        X, y = self.prepare_features(history)
+        if self.online:
+            self._train_online(codificar_historial(history))
+            return
+        self.fit(*self.prepare_features(history))
+
+    def fit(self, X, y):
+        """Ajusta el RandomForest con una matriz ya construida (p. ej. FeatureMatrix.matrix())."""
         if len(X) < 30:
             self.is_trained = False
             return
+        from sklearn.ensemble import RandomForestClassifier
         # Ajuste de hiperparámetros para mayor precisión y balanceo de clases
         self.model = RandomForestClassifier(
             n_estimators=200,
@@ -71,36 +333,200 @@ class BaccaratMLPredictor:
         )
         self.model.fit(X, y)
         self.is_trained = True
+        # Las ventanas ya vistas quedan precompiladas; el resto se llena al consultarlas
+        self.lut = ProbabilityTable(self.window)
+        self.lut.fill(self.model, X)
 
-    def predict_next(self, history):
+    def compile_lut(self, full=False):
+        """Compila la tabla de probabilidades (completa si full=True)."""
+        if self.model is None:
+            return None
+        if self.lut is None:
+            self.lut = ProbabilityTable(self.window)
+        if full:
+            self.lut.fill_all(self.model)
+        return self.lut
+
+    def compact(self):
+        """Reemplaza el RandomForest por su exportación a arrays (CompactForest)."""
+        if self.model is not None and not isinstance(self.model, CompactForest):
+            self.model = CompactForest.from_sklearn(self.model)
+        return self.model
+
+    # --- Modo online (n-gramas por conteo) ---
+
+    def _train_online(self, codes):
+        """Reconstruye los conteos de n-gramas desde cero con el historial dado."""
+        self._reset_online()
+        k = self.order
+        codes = np.asarray(codes, dtype=np.int64)
+        if len(codes) > k:
+            # Código base 3 del contexto de k jugadas previas a cada posición
+            contexts = np.zeros(len(codes) - k, dtype=np.int64)
+            for j in range(k):
+                contexts = contexts * 3 + codes[j:len(codes) - k + j]
+            counts = np.zeros((self._contexts, 3), dtype=np.int64)
+            np.add.at(counts, (contexts, codes[k:]), 1)
+            self._counts = counts.tolist()
+        for code in codes[-k:].tolist():
+            self._context = (self._context * 3 + code) % self._contexts
+        self._context_len = min(len(codes), k)
+        for code in codes[-self.drift_window:].tolist():
+            self._recent.append(code)
+            self._recent_counts[code] += 1
+        self.rounds_seen = len(codes)
+
+        if len(codes) - k < 30:
+            self.is_trained = False
+            return
+        # La deriva se mide contra la distribución reciente al reentrenar
+        n = len(self._recent)
+        self._baseline = [count / n for count in self._recent_counts]
+        self.is_trained = True
+        self.retrains += 1
+
+    def update(self, new_result):
+        """Incorpora una ronda al modelo online en O(1)."""
+        code = new_result if isinstance(new_result, (int, np.integer)) else _CODIGOS_ML.get(new_result, 2)
+        code = int(code)
+        if self._context_len >= self.order:
+            self._counts[self._context][code] += 1
+        else:
+            self._context_len += 1
+        self._context = (self._context * 3 + code) % self._contexts
+
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_counts[self._recent[0]] -= 1
+        self._recent.append(code)
+        self._recent_counts[code] += 1
+
+        self.rounds_seen += 1
+        self.rounds_since_retrain += 1
+
+    def drift_score(self):
+        """Distancia de variación total entre las rondas recientes y las del reentrenamiento."""
+        n = len(self._recent)
+        if self._baseline is None or n < self.drift_window:
+            return 0.0
+        return 0.5 * sum(
+            abs(self._recent_counts[c] / n - self._baseline[c]) for c in range(3)
+        )
+
+    def needs_retrain(self):
+        return (
+            not self.is_trained
+            or self.rounds_since_retrain >= self.retrain_every
+            or self.drift_score() > self.drift_threshold
+        )
+
+    def sync(self, history, total=None):
+        """
+        Alimenta el modelo online con las rondas de history que aún no vio
+        y reentrena si toca. total es el número absoluto de rondas que
+        representa history (la versión de un HistoryBuffer); por defecto
+        len(history). Retorna True si se reentrenó.
+        """
+        codes = codificar_historial(history)
+        total = len(codes) if total is None else total
+        new = total - self.rounds_seen
+        if 0 <= new <= len(codes):
+            for code in codes[len(codes) - new:].tolist():
+                self.update(code)
+            if not self.needs_retrain():
+                return False
+        # Calendario, deriva o historial que no encaja con lo ya visto
+        self._train_online(codes)
+        self.rounds_seen = total
+        return self.is_trained
+
+    def predict_proba_next(self, history):
+        """Probabilidades (Player, Banker, Tie) de la próxima jugada, o None."""
+        if self.online:
+            return self._proba_online(history)
         if not self.is_trained or len(history) < self.window:
             return None
-        mapping = {0: 'Player', 1: 'Banker', 2: 'Tie'}
-        mapping_inv = {
-            'Player': 0, 'Banker': 1, 'Tie': 2,
-            'P': 0, 'B': 1, 'E': 2
-        }
-        seq = [mapping_inv.get(h, 2) for h in history[-self.window:]]
-        X = np.array(seq).reshape(1, -1)
+        window_codes = codificar_historial(history, self.window)
+        # Una consulta a la tabla compilada
+        if self.lut is not None:
+            return self.lut.lookup(window_codes, self.model)
+        return _probabilidades(self.model, window_codes.reshape(1, -1))[0]
+
+    def predict_proba_windows(self, windows):
+        """
+        Probabilidades (Player, Banker, Tie) de varias ventanas de ``window``
+        jugadas (p. ej. una por mesa): las que no están en la tabla se
+        calculan con un solo predict_proba.
+        """
+        windows = np.asarray(windows, dtype=np.int8).reshape(-1, self.window)
+        if self.lut is None:
+            return _probabilidades(self.model, windows)
+        return self.lut.lookup_many(windows, self.model)
+
+    def predict_next(self, history):
         # Usar probabilidades para mayor confianza
-        proba = self.model.predict_proba(X)[0]
-        pred = np.argmax(proba)
-        # Solo predecir si la probabilidad es razonable (>40%)
-        if proba[pred] < 0.4:
+        senal = senal_desde_probabilidades(self.predict_proba_next(history))
+        return senal[0] if senal else None
+
+    def _proba_online(self, history):
+        if not self.is_trained or len(history) < self.order:
             return None
-        # Asegurar que la clave es int para evitar errores de tipado
-        pred_int = int(pred)
-        return mapping.get(pred_int, 'Tie')
+        context = 0
+        for code in codificar_historial(history, self.order).tolist():
+            context = context * 3 + code
+        counts = self._counts[context]
+        total = counts[0] + counts[1] + counts[2]
+        if total < self.min_observations:
+            return None
+        # Suavizado de Laplace
+        return [(count + 1) / (total + 3) for count in counts]
+
+    @staticmethod
+    def lut_path(path):
+        """Ruta de la tabla de probabilidades guardada junto al modelo."""
+        return f"{path}.lut.npz"
 
     def save(self, path):
         if self.model:
+            payload = pickle.dumps(self.model)
             with open(path, 'wb') as f:
-                pickle.dump(self.model, f)
+                f.write(payload)
+            if self.lut is not None:
+                self.lut.save(self.lut_path(path), hashlib.sha1(payload).hexdigest())
+
+    def save_compact(self, path):
+        """
+        Guarda el modelo compacto (.npz sin sklearn) y su tabla de probabilidades.
+
+        Un modelo guardado con save() se convierte con load() + save_compact().
+        """
+        if self.model is not None:
+            forest = self.compact()
+            forest.save(path)
+            if self.lut is not None:
+                self.lut.save(self.lut_path(path), forest.digest())
+
+    def load_compact(self, path, mmap=True):
+        """Carga un modelo compacto, mapeado en memoria por defecto."""
+        try:
+            self.model = CompactForest.load(path, mmap)
+            self.is_trained = True
+        except Exception:
+            self.is_trained = False
+            return
+        self.lut = ProbabilityTable.load(self.lut_path(path), self.model.digest())
+        if self.lut is None:
+            self.lut = ProbabilityTable(self.window)
 
     def load(self, path):
         try:
             with open(path, 'rb') as f:
-                self.model = pickle.load(f)
-                self.is_trained = True
+                payload = f.read()
+            self.model = pickle.loads(payload)
+            self.is_trained = True
         except Exception:
             self.is_trained = False
+            return
+        # Arranque en caliente: la tabla solo sirve si es del mismo modelo
+        self.lut = ProbabilityTable.load(self.lut_path(path), hashlib.sha1(payload).hexdigest())
+        if self.lut is None:
+            self.lut = ProbabilityTable(self.window)
@@ -0,0 +1,177 @@
+# baccarat_bot/ml_trainer.py
+"""
+Entrenamiento del predictor ML fuera del bucle de monitoreo.
+
+Los entrenamientos se envían a un ProcessPoolExecutor con una copia de los
+códigos del historial. El proceso hijo ajusta un BaccaratMLPredictor nuevo
+y lo devuelve serializado (bytes), con el bosque ya exportado a arrays
+(CompactForest) para que el proceso principal no necesite importar
+sklearn al deserializarlo. Al terminar, el predictor se entrega al
+callback ``on_ready``, que lo intercambia de forma atómica (una asignación),
+de modo que las predicciones siguen usando el modelo anterior mientras tanto.
+
+Por cada clave hay como máximo un trabajo en curso y uno en cola: una
+solicitud nueva reemplaza a la que esperaba en cola (deduplicación).
+"""
+import logging
+import pickle
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from baccarat_bot.ml_predictor import BaccaratMLPredictor, codificar_historial
+
+logger = logging.getLogger(__name__)
+
+
+def _entrenar_en_proceso(codes: np.ndarray, config: Dict[str, Any]) -> Tuple[Optional[bytes], float]:
+    """Entrena en el proceso hijo; retorna (predictor serializado o None, segundos)."""
+    start = time.perf_counter()
+    predictor = BaccaratMLPredictor(**config)
+    predictor.train(codes)
+    if not predictor.online:
+        predictor.compact()
+    payload = pickle.dumps(predictor, protocol=pickle.HIGHEST_PROTOCOL) if predictor.is_trained else None
+    return payload, time.perf_counter() - start
+
+
+class BackgroundTrainer:
+    """Cola de entrenamientos en procesos con un trabajo activo por clave."""
+
+    def __init__(self, on_ready: Callable[[str, BaccaratMLPredictor], None],
+                 max_workers: int = 1):
+        """
+        Args:
+            on_ready: Recibe (clave, predictor entrenado) al terminar un trabajo.
+            max_workers: Procesos de entrenamiento.
+        """
+        self.on_ready = on_ready
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Reentrante: el callback puede ejecutarse dentro de submit si el
+        # trabajo ya terminó al registrarlo
+        self._lock = threading.RLock()
+        self._running: Dict[str, Future] = {}
+        self._queued: Dict[str, Tuple[np.ndarray, Dict[str, Any], float]] = {}
+
+        # Métricas
+        self.submitted = 0
+        self.replaced = 0
+        self.completed = 0
+        self.failed = 0
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self._model_requested_at: Dict[str, float] = {}
+        self._latest_requested_at: Dict[str, float] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, key: str, history, config: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Solicita un entrenamiento con el historial dado.
+
+        Retorna True si empezó de inmediato y False si quedó en cola
+        (reemplazando a la solicitud que esperaba, si la había).
+        """
+        # Copia: el historial (p. ej. un HistoryBuffer) sigue cambiando
+        codes = np.array(codificar_historial(history), dtype=np.int8)
+        job = (codes, dict(config or {}), time.time())
+        with self._lock:
+            self.submitted += 1
+            self._latest_requested_at[key] = job[2]
+            if key in self._running:
+                if key in self._queued:
+                    self.replaced += 1
+                self._queued[key] = job
+                return False
+            self._start(key, job)
+            return True
+
+    def _start(self, key: str, job) -> None:
+        codes, config, requested_at = job
+        future = self._get_executor().submit(_entrenar_en_proceso, codes, config)
+        self._running[key] = future
+        future.add_done_callback(lambda f: self._finished(key, requested_at, f))
+
+    def _finished(self, key: str, requested_at: float, future: Future) -> None:
+        predictor = None
+        try:
+            payload, duration = future.result()
+            if payload is not None:
+                predictor = pickle.loads(payload)
+        except Exception as e:
+            logger.warning(f"Error entrenando modelo ML en segundo plano ({key}): {e}")
+            with self._lock:
+                self.failed += 1
+        else:
+            with self._lock:
+                self.completed += 1
+                self.last_duration = duration
+                self.total_duration += duration
+                if predictor is not None:
+                    self._model_requested_at[key] = requested_at
+
+        if predictor is not None:
+            try:
+                self.on_ready(key, predictor)
+            except Exception as e:
+                logger.warning(f"Error instalando modelo ML ({key}): {e}")
+
+        with self._lock:
+            del self._running[key]
+            job = self._queued.pop(key, None)
+            if job is not None:
+                try:
+                    self._start(key, job)
+                except Exception as e:
+                    logger.warning(f"No se pudo iniciar el entrenamiento en cola ({key}): {e}")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que no queden trabajos en curso ni en cola (para pruebas y cierre)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if not self._running and not self._queued:
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            self._queued.clear()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Métricas de entrenamiento: duración y antigüedad de los modelos
+        (segundos desde que se pidió el entrenamiento del modelo en uso, y
+        desde la última solicitud atendida hasta la más reciente).
+        """
+        now = time.time()
+        with self._lock:
+            return {
+                'submitted': self.submitted,
+                'replaced': self.replaced,
+                'completed': self.completed,
+                'failed': self.failed,
+                'running': len(self._running),
+                'queued': len(self._queued),
+                'last_duration': self.last_duration,
+                'mean_duration': self.total_duration / self.completed if self.completed else 0.0,
+                'staleness': {
+                    key: {
+                        'model_age': now - model_at,
+                        'behind': max(self._latest_requested_at.get(key, model_at) - model_at, 0.0)
+                    }
+                    for key, model_at in self._model_requested_at.items()
+                },
+            }
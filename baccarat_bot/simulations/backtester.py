@@ -0,0 +1,198 @@
+# baccarat_bot/simulations/backtester.py
+
+"""
+Backtest en streaming de las estrategias seguras.
+
+StrategyTester recorta ``history[:i]`` en cada ronda y vuelve a analizar
+todo el historial: O(n²) en tiempo y en memoria temporal. El
+StreamingBacktester alimenta las rondas una a una a un TableState
+persistente (conteos por ventana, racha, índice de patrones) y evalúa las
+estrategias sobre él, así que cada ronda cuesta lo mismo sin importar
+cuántas se hayan jugado. Los contadores por estrategia se actualizan al
+vuelo y solo se conservan los últimos ``max_details`` resultados
+detallados: la memoria no crece con el número de rondas.
+
+El reporte tiene el mismo formato que generate_simulation_report.
+
+Uso:
+    python -m baccarat_bot.simulations.backtester --rounds 1000000
+"""
+
+import argparse
+import json
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from baccarat_bot.simulations.simulator import (
+    RESULTADO_APUESTA,
+    TAMANO_BLOQUE,
+    BaccaratSimulator,
+    decodificar_codigos
+)
+from baccarat_bot.strategies.safe_strategies import get_safe_strategies, safest_signal_from_state
+from baccarat_bot.strategies.state import TableState
+
+# Resultados detallados que se conservan por defecto (los más recientes)
+DETALLES_MAXIMOS = 1000
+
+# Rondas del historial previo que se guardan en cada resultado detallado
+_HISTORIAL_DETALLE = 10
+
+
+def _estrategias_y_subestrategias(strategies):
+    """Estrategias más las que combinan (consenso), sin repetir."""
+    vistas = {}
+    pendientes = list(strategies)
+    while pendientes:
+        strategy = pendientes.pop()
+        if id(strategy) not in vistas:
+            vistas[id(strategy)] = strategy
+            pendientes.extend(getattr(strategy, 'strategies', ()))
+    return list(vistas.values())
+
+
+class StreamingBacktester:
+    """
+    Backtester O(n) con estado persistente.
+
+    Tras cada ronda calcula la señal más segura (como get_safest_signal) y
+    la compara con la ronda siguiente.
+    """
+
+    def __init__(self, table_name: str = '', strategies: Optional[List] = None,
+                 max_details: Optional[int] = DETALLES_MAXIMOS, max_history: int = 50):
+        """
+        Args:
+            table_name: Nombre de la mesa para el reporte
+            strategies: Estrategias a evaluar (por defecto get_safe_strategies())
+            max_details: Resultados detallados conservados (None = todos)
+            max_history: Resultados recientes que conserva el estado para las
+                estrategias sin evaluación incremental
+        """
+        self.table_name = table_name
+        self.strategies = strategies if strategies is not None else get_safe_strategies()
+        todas = _estrategias_y_subestrategias(self.strategies)
+        windows = {w for strategy in todas for w in strategy.required_windows()}
+        lengths = {k for strategy in todas for k in strategy.required_pattern_lengths()}
+        self.state = TableState(windows, max_history, lengths)
+
+        self.total_rounds = 0
+        self.total_signals = 0
+        self.correct_signals = 0
+        self.breakdown: Dict[str, Dict[str, int]] = {}
+        self.details: Deque[Dict] = deque(maxlen=max_details)
+        self._pending = None
+
+    def push(self, result: str) -> None:
+        """Incorpora una ronda: puntúa la señal pendiente y calcula la siguiente."""
+        pending = self._pending
+        if pending is not None:
+            apuesta, estrategia, confianza = pending
+            is_correct = RESULTADO_APUESTA.get(apuesta) == result
+            self.total_signals += 1
+            self.correct_signals += is_correct
+            stats = self.breakdown.get(estrategia)
+            if stats is None:
+                stats = self.breakdown[estrategia] = {'total': 0, 'correct': 0}
+            stats['total'] += 1
+            stats['correct'] += is_correct
+            if self.details.maxlen != 0:
+                self.details.append({
+                    'round': self.total_rounds + 1,
+                    'history_before': self.state.last(_HISTORIAL_DETALLE),
+                    'actual_result': result,
+                    'signal': apuesta,
+                    'strategy': estrategia,
+                    'confidence': confianza,
+                    'is_correct': is_correct
+                })
+
+        self.state.push(result)
+        self.total_rounds += 1
+        self._pending = safest_signal_from_state(self.state, self.strategies)
+
+    def feed(self, results: Iterable[str]) -> None:
+        """Incorpora varias rondas ('B', 'P', 'E')."""
+        push = self.push
+        for result in results:
+            push(result)
+
+    def feed_codes(self, codes: np.ndarray) -> None:
+        """Incorpora rondas codificadas (int8, P=0, B=1, E=2)."""
+        self.feed(decodificar_codigos(codes))
+
+    def get_report(self) -> Dict:
+        """Reporte con el formato de StrategyTester.get_report()."""
+        breakdown = {}
+        for strategy, data in self.breakdown.items():
+            breakdown[strategy] = dict(data, accuracy=(data['correct'] / data['total']) * 100)
+        return {
+            'total_rounds': self.total_rounds,
+            'total_signals': self.total_signals,
+            'correct_signals': self.correct_signals,
+            'incorrect_signals': self.total_signals - self.correct_signals,
+            'accuracy': (self.correct_signals / self.total_signals) * 100 if self.total_signals else 0.0,
+            'table_name': self.table_name,
+            'strategy_breakdown': breakdown
+        }
+
+    def get_detailed_results(self) -> List[Dict]:
+        """Últimos resultados detallados (como máximo max_details)."""
+        return list(self.details)
+
+
+def generate_streaming_report(num_rounds: int, table_name: str, seed=None,
+                              max_details: Optional[int] = DETALLES_MAXIMOS,
+                              chunk_size: int = TAMANO_BLOQUE) -> Dict:
+    """
+    Igual que generate_simulation_report para cualquier número de rondas:
+    las rondas se generan por bloques y se prueban en streaming.
+    """
+    simulator = BaccaratSimulator(seed=seed)
+    backtester = StreamingBacktester(table_name, max_details=max_details)
+    for codes in simulator.simulate_chunks(num_rounds, chunk_size):
+        backtester.feed_codes(codes)
+
+    return {
+        'simulation_details': {
+            'table_name': table_name,
+            'num_rounds': num_rounds,
+            'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        },
+        'baccarat_stats': simulator.get_stats(),
+        'strategy_report': backtester.get_report(),
+        'detailed_results': backtester.get_detailed_results()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest en streaming de las estrategias seguras")
+    parser.add_argument('--rounds', type=int, default=1_000_000, help="Rondas a simular")
+    parser.add_argument('--table', default='Simulación', help="Nombre de la mesa")
+    parser.add_argument('--seed', type=int, default=None, help="Semilla del simulador")
+    parser.add_argument('--details', type=int, default=DETALLES_MAXIMOS,
+                        help="Resultados detallados a conservar")
+    parser.add_argument('--out', default=None, help="Archivo JSON del reporte")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    report = generate_streaming_report(args.rounds, args.table, args.seed, args.details)
+    elapsed = time.perf_counter() - start
+
+    summary = report['strategy_report']
+    print(f"Rondas: {args.rounds:,} en {elapsed:.1f} s ({args.rounds / elapsed:,.0f} rondas/s)")
+    print(f"Señales: {summary['total_signals']:,}  Precisión: {summary['accuracy']:.2f}%")
+    for strategy, data in summary['strategy_breakdown'].items():
+        print(f"  {strategy}: Total={data['total']}, Correctas={data['correct']}, "
+              f"Precisión={data['accuracy']:.2f}%")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
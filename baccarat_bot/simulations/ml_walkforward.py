@@ -0,0 +1,291 @@
+# baccarat_bot/simulations/ml_walkforward.py
+
+"""
+Evaluación walk-forward (origen móvil) de los modelos ML.
+
+Para cada modelo configurado y cada fold se entrena con las ``train_size``
+rondas previas al origen y se evalúa fuera de muestra sobre las
+``test_size`` siguientes. Los modelos online (n-gramas) siguen
+actualizándose ronda a ronda durante la prueba, como en producción; el
+RandomForest queda fijo.
+
+Por fold se mide:
+
+- acierto (argmax sobre todas las rondas) y acierto de las señales
+  (probabilidad máxima >= 0.4, el umbral de predict_next) con su cobertura,
+- log-loss, Brier y error de calibración esperado (10 bins de confianza),
+- tiempo de entrenamiento, latencia de inferencia p50/p99 (predict_next
+  sobre una muestra de rondas), tamaño serializado del modelo y RSS pico
+  del proceso.
+
+Los folds se ejecutan en paralelo (un proceso nuevo por fold para que el
+RSS pico sea del fold) y el resultado se guarda como JSON.
+
+Uso:
+    python -m baccarat_bot.simulations.ml_walkforward --rounds 200000 --folds 8
+    python -m baccarat_bot.simulations.ml_walkforward --db baccarat_data.db --mesa "Mesa 1"
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import resource
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from baccarat_bot.ml_pool import crear_predictor
+from baccarat_bot.ml_predictor import UMBRAL_SENAL, BaccaratMLPredictor, _probabilidades
+from baccarat_bot.simulations.sweep import corpus_desde_db, generar_corpus
+
+logger = logging.getLogger(__name__)
+
+MODELOS_POR_DEFECTO: Dict[str, Dict[str, Any]] = {
+    'forest': {},
+    'ngram3': {'online': True, 'order': 3},
+    'ngram5': {'online': True, 'order': 5},
+    'markov3': {'backend': 'markov', 'order': 3},
+}
+
+_BINS_CALIBRACION = 10
+_MUESTRA_LATENCIA = 300
+
+# Corpus del proceso trabajador (se recibe una vez por proceso)
+_corpus: Optional[np.ndarray] = None
+
+
+def origenes_folds(length: int, folds: int, train_size: int, test_size: int) -> List[int]:
+    """Orígenes de los folds repartidos uniformemente sobre el historial."""
+    last = length - test_size
+    if last < train_size:
+        raise ValueError(
+            f"Historial insuficiente: {length} rondas para train={train_size} y test={test_size}"
+        )
+    if folds <= 1:
+        return [last]
+    step = (last - train_size) / (folds - 1)
+    return sorted({train_size + int(round(i * step)) for i in range(folds)})
+
+
+def _rss_mb() -> float:
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _init_worker(corpus: np.ndarray) -> None:
+    global _corpus
+    _corpus = corpus
+
+
+def _probabilidades_test(predictor: BaccaratMLPredictor, codes: np.ndarray,
+                         origin: int, test_size: int, prior: np.ndarray) -> np.ndarray:
+    """Probabilidades fuera de muestra de cada ronda de prueba."""
+    probs = np.tile(prior, (test_size, 1))
+    if predictor.online:
+        for i in range(test_size):
+            proba = predictor.predict_proba_next(codes[:origin + i])
+            if proba is not None:
+                probs[i] = proba
+            predictor.update(int(codes[origin + i]))
+    elif predictor.is_trained:
+        w = predictor.window
+        X = np.lib.stride_tricks.sliding_window_view(codes[origin - w:origin + test_size - 1], w)
+        probs[:] = _probabilidades(predictor.model, X)
+    return probs
+
+
+def _evaluar_fold(model_name: str, config: Dict[str, Any], origin: int,
+                  train_size: int, test_size: int) -> Dict[str, Any]:
+    codes = _corpus
+    rss_base = _rss_mb()
+    train = codes[origin - train_size:origin]
+    actual = codes[origin:origin + test_size].astype(np.int64)
+    prior = np.bincount(train, minlength=3)[:3] / len(train)
+
+    predictor = crear_predictor(config)
+    start = time.perf_counter()
+    predictor.train(train)
+    train_time = time.perf_counter() - start
+    model_size = len(pickle.dumps(predictor, protocol=pickle.HIGHEST_PROTOCOL))
+
+    # Latencia del camino de inferencia real, antes de que el modelo online avance
+    latencies = []
+    for i in np.linspace(0, test_size - 1, min(_MUESTRA_LATENCIA, test_size)).astype(int):
+        history = codes[:origin + i]
+        start = time.perf_counter()
+        predictor.predict_next(history)
+        latencies.append(time.perf_counter() - start)
+
+    probs = _probabilidades_test(predictor, codes, origin, test_size, prior)
+    predicted = probs.argmax(axis=1)
+    top = probs.max(axis=1)
+    correct = predicted == actual
+    signals = top >= UMBRAL_SENAL
+    true_prob = np.clip(probs[np.arange(test_size), actual], 1e-12, 1.0)
+    one_hot = np.eye(3)[actual]
+
+    bins = np.minimum((top * _BINS_CALIBRACION).astype(int), _BINS_CALIBRACION - 1)
+    return {
+        'model': model_name,
+        'origin': origin,
+        'rounds': test_size,
+        'correct': int(correct.sum()),
+        'signals': int(signals.sum()),
+        'signals_correct': int((correct & signals).sum()),
+        'log_loss_sum': float(-np.log(true_prob).sum()),
+        'brier_sum': float(((probs - one_hot) ** 2).sum()),
+        'bin_count': np.bincount(bins, minlength=_BINS_CALIBRACION).tolist(),
+        'bin_correct': np.bincount(bins, weights=correct, minlength=_BINS_CALIBRACION).tolist(),
+        'bin_confidence': np.bincount(bins, weights=top, minlength=_BINS_CALIBRACION).tolist(),
+        'trained': bool(predictor.is_trained),
+        'train_time': train_time,
+        'latencies': latencies,
+        'model_size': model_size,
+        'rss_base_mb': rss_base,
+        'rss_peak_mb': _rss_mb(),
+    }
+
+
+def _resumir(folds: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Métricas agregadas de los folds de un modelo (sumando rondas, no promediando folds)."""
+    rounds = sum(f['rounds'] for f in folds)
+    signals = sum(f['signals'] for f in folds)
+    bin_count = np.sum([f['bin_count'] for f in folds], axis=0)
+    bin_correct = np.sum([f['bin_correct'] for f in folds], axis=0)
+    bin_confidence = np.sum([f['bin_confidence'] for f in folds], axis=0)
+    filled = bin_count > 0
+    ece = float(np.sum(
+        bin_count[filled] / rounds
+        * np.abs(bin_confidence[filled] / bin_count[filled] - bin_correct[filled] / bin_count[filled])
+    ))
+    latencies = np.concatenate([f['latencies'] for f in folds]) * 1e6
+    return {
+        'folds': len(folds),
+        'rounds': rounds,
+        'accuracy': sum(f['correct'] for f in folds) / rounds,
+        'signal_accuracy': sum(f['signals_correct'] for f in folds) / signals if signals else None,
+        'signal_coverage': signals / rounds,
+        'log_loss': sum(f['log_loss_sum'] for f in folds) / rounds,
+        'brier': sum(f['brier_sum'] for f in folds) / rounds,
+        'calibration_error': ece,
+        'train_time_mean_s': float(np.mean([f['train_time'] for f in folds])),
+        'latency_p50_us': float(np.percentile(latencies, 50)),
+        'latency_p99_us': float(np.percentile(latencies, 99)),
+        'model_size_bytes': int(max(f['model_size'] for f in folds)),
+        'peak_rss_mb': float(max(f['rss_peak_mb'] for f in folds)),
+        'untrained_folds': sum(1 for f in folds if not f['trained']),
+    }
+
+
+def run_walkforward(corpus: np.ndarray, models: Optional[Dict[str, Dict[str, Any]]] = None,
+                    folds: int = 5, train_size: int = 5000, test_size: int = 2000,
+                    workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Evalúa cada modelo en cada fold; retorna el informe completo.
+
+    Args:
+        corpus: Historial codificado (int8, P=0, B=1, E=2)
+        models: {nombre: configuración del predictor (ver crear_predictor)}
+        folds: Número de orígenes
+        train_size: Rondas de entrenamiento previas a cada origen
+        test_size: Rondas de prueba posteriores a cada origen
+        workers: Procesos (None = núcleos disponibles; 1 = en este proceso)
+    """
+    models = models or MODELOS_POR_DEFECTO
+    corpus = np.ascontiguousarray(corpus, dtype=np.int8)
+    origins = origenes_folds(len(corpus), folds, train_size, test_size)
+    tasks = [
+        (name, config, origin, train_size, test_size)
+        for name, config in models.items() for origin in origins
+    ]
+
+    if workers == 1:
+        _init_worker(corpus)
+        results = [_evaluar_fold(*task) for task in tasks]
+    else:
+        # Un proceso por fold: así el RSS pico medido es el de ese fold
+        # (multiprocessing.Pool: max_tasks_per_child de ProcessPoolExecutor
+        # requiere Python 3.11)
+        with multiprocessing.Pool(processes=workers or os.cpu_count(),
+                                  initializer=_init_worker, initargs=(corpus,),
+                                  maxtasksperchild=1) as pool:
+            results = pool.starmap(_evaluar_fold, tasks, chunksize=1)
+
+    by_model: Dict[str, List[Dict[str, Any]]] = {name: [] for name in models}
+    for result in results:
+        by_model[result['model']].append(result)
+
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'corpus_rounds': len(corpus),
+        'settings': {'folds': len(origins), 'train_size': train_size, 'test_size': test_size},
+        'models': {
+            name: {
+                'config': models[name],
+                'summary': _resumir(fold_results),
+                'folds': [
+                    {key: value for key, value in fold.items() if key not in ('model', 'latencies')}
+                    for fold in fold_results
+                ],
+            }
+            for name, fold_results in by_model.items()
+        },
+    }
+
+
+def guardar_informe(report: Dict[str, Any], path: str) -> str:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Evaluación walk-forward de los modelos ML")
+    parser.add_argument('--models', help="Archivo JSON {nombre: configuración} (por defecto forest, ngram3, ngram5, markov3)")
+    parser.add_argument('--rounds', type=int, default=200_000, help="Rondas simuladas")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', help="Usar los resultados de esta base de datos en lugar de simular")
+    parser.add_argument('--mesa', help="Mesa de la base de datos (la de historial más largo por defecto)")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--train-size', type=int, default=5000)
+    parser.add_argument('--test-size', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', default='ml_walkforward.json', help="Archivo JSON de salida")
+    args = parser.parse_args(argv)
+
+    models = None
+    if args.models:
+        with open(args.models, 'r', encoding='utf-8') as f:
+            models = json.load(f)
+
+    if args.db:
+        segments = corpus_desde_db(args.db, args.mesa)
+        if not segments:
+            parser.error("La base de datos no tiene resultados")
+        corpus = max(segments, key=len)
+    else:
+        corpus = generar_corpus(args.rounds, args.seed)
+
+    report = run_walkforward(corpus, models, args.folds, args.train_size, args.test_size, args.workers)
+    path = guardar_informe(report, args.out)
+
+    print(f"Walk-forward sobre {len(corpus):,} rondas -> {path}")
+    for name, result in report['models'].items():
+        summary = result['summary']
+        signal_accuracy = summary['signal_accuracy']
+        print(f"  {name:<10} acierto={summary['accuracy']:.2%}  "
+              f"señales={'-' if signal_accuracy is None else f'{signal_accuracy:.2%}'} "
+              f"({summary['signal_coverage']:.1%})  ECE={summary['calibration_error']:.3f}  "
+              f"entrenamiento={summary['train_time_mean_s']:.2f}s  "
+              f"p50={summary['latency_p50_us']:.0f}us p99={summary['latency_p99_us']:.0f}us  "
+              f"tamaño={summary['model_size_bytes'] / 1024:.0f}KB  RSS={summary['peak_rss_mb']:.0f}MB")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
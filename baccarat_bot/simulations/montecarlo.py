@@ -0,0 +1,363 @@
+# baccarat_bot/simulations/montecarlo.py
+
+"""
+Backtest Monte Carlo en paralelo con intervalos de confianza.
+
+El trabajo se divide en tareas independientes (miles de zapatos
+repartidos carta a carta, o sesiones de rondas i.i.d.). Cada tarea usa su
+propio simulador con una semilla derivada de la semilla global y del
+índice de la tarea (SeedSequence.spawn), así que el resultado de una tarea
+no depende de qué proceso la ejecute ni en qué orden. Cada proceso del
+pool construye su juego de estrategias una vez y las evalúa con
+analyze_prefixes sobre el historial de la tarea.
+
+Los agregados parciales se emiten a medida que terminan las tareas
+(on_progress) y se guardan en un checkpoint JSON; al relanzar con el mismo
+checkpoint se saltan las tareas ya hechas y el resultado final es el mismo
+que sin interrupción.
+
+Por estrategia se reporta la tasa de acierto con su intervalo de Wilson y
+un intervalo bootstrap por tareas; y el rendimiento en rondas/s de cada
+proceso.
+
+Uso:
+    python -m baccarat_bot.simulations.montecarlo --tasks 2000 --shoes 5 --workers 4
+    python -m baccarat_bot.simulations.montecarlo --mode rounds --checkpoint mc.json
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from baccarat_bot.simulations.simulator import BaccaratSimulator
+from baccarat_bot.simulations.sweep import ESTRATEGIAS_BARRIBLES
+from baccarat_bot.strategies.vectorized import E
+
+logger = logging.getLogger(__name__)
+
+# Estrategias con los parámetros que usa el bot
+ESTRATEGIAS_POR_DEFECTO = {
+    'StreakStrategy': {'streak_length': 4},
+    'ZigZagStrategy': {'pattern_length': 4},
+    'TrendAnalysisStrategy': {'short_window': 5, 'long_window': 15},
+    'TieDetectionStrategy': {'observation_window': 5},
+    'ConservativeStreakStrategy': {'min_streak_length': 5},
+    'ConfirmedPatternStrategy': {'pattern_length': 3},
+    'StatisticalEdgeStrategy': {'min_sample_size': 30},
+    'ConsensusStrategy': {},
+    'DominanceStrategy': {'window_size': 20, 'dominance_threshold': 0.70},
+}
+
+MODOS = ('shoes', 'rounds')
+
+# Remuestreos del intervalo bootstrap y cuántos se calculan a la vez
+REMUESTREOS_BOOTSTRAP = 1000
+_LOTE_BOOTSTRAP = 100
+
+_FORMATO_CHECKPOINT = 1
+
+
+def semilla_tarea(seed: int, index: int) -> np.random.SeedSequence:
+    """
+    Semilla de la tarea index: la misma que SeedSequence(seed).spawn(n)[index]
+    para cualquier n, sin generar las n.
+    """
+    return np.random.SeedSequence(seed, spawn_key=(index,))
+
+
+def intervalo_wilson(correct: int, total: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """Intervalo de Wilson de una proporción correct/total."""
+    if total == 0:
+        return 0.0, 0.0
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    p = correct / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    half = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def intervalo_bootstrap(correct: np.ndarray, total: np.ndarray, confidence: float = 0.95,
+                        resamples: int = REMUESTREOS_BOOTSTRAP, seed: int = 0) -> Tuple[float, float]:
+    """
+    Intervalo bootstrap percentil de sum(correct)/sum(total), remuestreando
+    tareas completas (respeta la correlación dentro de cada zapato o sesión).
+    """
+    correct = np.asarray(correct, dtype=np.float64)
+    total = np.asarray(total, dtype=np.float64)
+    n = len(total)
+    if n < 2 or total.sum() == 0:
+        rate = correct.sum() / total.sum() if n and total.sum() else 0.0
+        return rate, rate
+    rng = np.random.default_rng(seed)
+    rates = []
+    for start in range(0, resamples, _LOTE_BOOTSTRAP):
+        weights = rng.multinomial(n, np.full(n, 1 / n), size=min(_LOTE_BOOTSTRAP, resamples - start))
+        totals = weights @ total
+        rates.append(np.divide(weights @ correct, totals, out=np.zeros_like(totals), where=totals > 0))
+    alpha = (1 - confidence) / 2 * 100
+    low, high = np.percentile(np.concatenate(rates), [alpha, 100 - alpha])
+    return float(low), float(high)
+
+
+def _contar_aciertos(strategy, encoded: np.ndarray) -> Tuple[int, int, int]:
+    """(señales, aciertos, devoluciones) de una estrategia sobre un historial (ver sweep)."""
+    if len(encoded) < 2:
+        return 0, 0, 0
+    signals, _ = strategy.analyze_prefixes(encoded)
+    signals, outcome = signals[:-1], encoded[1:]
+    has_signal = signals >= 0
+    correct = has_signal & (signals == outcome)
+    push = has_signal & (signals != E) & (outcome == E)
+    return int(has_signal.sum()), int(correct.sum()), int(push.sum())
+
+
+# --- Estado de cada proceso del pool ---
+
+_estrategias: Dict[str, Any] = {}
+
+
+def _init_worker(strategies: Dict[str, Dict[str, Any]]) -> None:
+    """Construye una vez por proceso el juego de estrategias."""
+    global _estrategias
+    _estrategias = {name: ESTRATEGIAS_BARRIBLES[name](**params) for name, params in strategies.items()}
+
+
+def _ejecutar_tarea(index: int, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Simula y evalúa una tarea. En modo 'shoes' los zapatos de la tarea se
+    juegan seguidos en la misma mesa (el historial no se reinicia entre
+    zapatos, como en el bot).
+    """
+    start = time.perf_counter()
+    simulator = BaccaratSimulator(spec['num_decks'], semilla_tarea(spec['seed'], index))
+    if spec['mode'] == 'shoes':
+        encoded = simulator.simulate_shoes(spec['shoes_per_task']).codes
+    else:
+        encoded = simulator.simulate_codes(spec['rounds_per_task'])
+
+    tallies = {name: _contar_aciertos(strategy, encoded) for name, strategy in _estrategias.items()}
+    return {
+        'task': index,
+        'rounds': len(encoded),
+        'elapsed': time.perf_counter() - start,
+        'worker': os.getpid(),
+        'strategies': tallies,
+    }
+
+
+class MonteCarloAggregate:
+    """Agregados por estrategia y por proceso de las tareas terminadas."""
+
+    def __init__(self, spec: Dict[str, Any], confidence: float = 0.95,
+                 resamples: int = REMUESTREOS_BOOTSTRAP):
+        self.spec = spec
+        self.confidence = confidence
+        self.resamples = resamples
+        self.results: Dict[int, Dict[str, Any]] = {}
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.results[result['task']] = result
+
+    @property
+    def tasks_done(self) -> int:
+        return len(self.results)
+
+    def summary(self, bootstrap: bool = True) -> Dict[str, Any]:
+        """
+        Reporte de las tareas terminadas hasta ahora (el bootstrap se puede
+        omitir en los reportes parciales).
+        """
+        results = [self.results[task] for task in sorted(self.results)]
+        rounds = sum(r['rounds'] for r in results)
+        # Las oportunidades de señal son rondas - 1 por tarea
+        opportunities = sum(max(r['rounds'] - 1, 0) for r in results)
+
+        rows = []
+        for name in self.spec['strategies']:
+            tallies = np.array([r['strategies'][name] for r in results], dtype=np.int64).reshape(-1, 3)
+            signals, correct, pushes = (int(v) for v in tallies.sum(axis=0))
+            low, high = intervalo_wilson(correct, signals, self.confidence)
+            row = {
+                'strategy': name,
+                'params': self.spec['strategies'][name],
+                'signals': signals,
+                'correct': correct,
+                'pushes': pushes,
+                'hit_rate': round(correct / signals * 100, 4) if signals else 0.0,
+                'ci_wilson': [round(low * 100, 4), round(high * 100, 4)],
+                'signal_frequency': round(signals / opportunities * 100, 4) if opportunities else 0.0,
+            }
+            if bootstrap:
+                low, high = intervalo_bootstrap(tallies[:, 1], tallies[:, 0], self.confidence,
+                                                self.resamples, self.spec['seed'])
+                row['ci_bootstrap'] = [round(low * 100, 4), round(high * 100, 4)]
+            rows.append(row)
+        rows.sort(key=lambda row: row['hit_rate'], reverse=True)
+
+        workers: Dict[int, List[float]] = {}
+        for r in results:
+            totals = workers.setdefault(r['worker'], [0, 0.0])
+            totals[0] += r['rounds']
+            totals[1] += r['elapsed']
+        return {
+            'config': self.spec,
+            'tasks_done': len(results),
+            'rounds': rounds,
+            'confidence': self.confidence,
+            'throughput': {
+                str(worker): round(total_rounds / elapsed) if elapsed else 0
+                for worker, (total_rounds, elapsed) in workers.items()
+            },
+            'strategies': rows,
+        }
+
+    def save(self, path: str) -> None:
+        """Guarda el checkpoint (config y resultado de cada tarea) de forma atómica."""
+        data = {'format': _FORMATO_CHECKPOINT, 'spec': self.spec,
+                'results': [self.results[task] for task in sorted(self.results)]}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> None:
+        """
+        Recupera las tareas de un checkpoint.
+
+        Raises:
+            ValueError: Si el checkpoint es de otra configuración.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != _FORMATO_CHECKPOINT or data.get('spec') != self.spec:
+            raise ValueError(f"El checkpoint {path} es de otra configuración")
+        for result in data['results']:
+            result['strategies'] = {name: tuple(t) for name, t in result['strategies'].items()}
+            self.add(result)
+
+
+def run_montecarlo(tasks: int = 1000, mode: str = 'shoes', shoes_per_task: int = 5,
+                   rounds_per_task: int = 10_000, seed: int = 42, num_decks: int = 8,
+                   strategies: Optional[Dict[str, Dict[str, Any]]] = None,
+                   workers: Optional[int] = None, checkpoint: Optional[str] = None,
+                   checkpoint_every: int = 50, confidence: float = 0.95,
+                   on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                   progress_every: int = 50) -> Dict[str, Any]:
+    """
+    Ejecuta las tareas en un pool de procesos y agrega los resultados.
+
+    Args:
+        tasks: Tareas independientes
+        mode: 'shoes' (zapatos carta a carta) o 'rounds' (rondas i.i.d.)
+        shoes_per_task: Zapatos por tarea en modo 'shoes'
+        rounds_per_task: Rondas por tarea en modo 'rounds'
+        seed: Semilla global (cada tarea deriva la suya)
+        num_decks: Mazos por zapato
+        strategies: {estrategia: parámetros} (ver sweep.ESTRATEGIAS_BARRIBLES)
+        workers: Procesos del pool (por defecto, uno por CPU; 1 = sin pool)
+        checkpoint: Archivo JSON para reanudar; si existe se saltan sus tareas
+        checkpoint_every: Tareas terminadas entre guardados del checkpoint
+        confidence: Nivel de los intervalos de confianza
+        on_progress: Función que recibe el agregado parcial (sin bootstrap)
+        progress_every: Tareas terminadas entre llamadas a on_progress
+
+    Returns:
+        Reporte final (ver MonteCarloAggregate.summary)
+
+    Raises:
+        ValueError: Si el modo o una estrategia no son válidos.
+    """
+    if mode not in MODOS:
+        raise ValueError(f"Modo desconocido: {mode} (usar {', '.join(MODOS)})")
+    strategies = dict(ESTRATEGIAS_POR_DEFECTO if strategies is None else strategies)
+    for name in strategies:
+        if name not in ESTRATEGIAS_BARRIBLES:
+            raise ValueError(f"Estrategia no soportada: {name}")
+    spec = {
+        'tasks': tasks, 'mode': mode, 'shoes_per_task': shoes_per_task,
+        'rounds_per_task': rounds_per_task, 'seed': seed, 'num_decks': num_decks,
+        'strategies': strategies,
+    }
+    aggregate = MonteCarloAggregate(spec, confidence)
+    if checkpoint and os.path.exists(checkpoint):
+        aggregate.load(checkpoint)
+        logger.info(f"Reanudando desde {checkpoint}: {aggregate.tasks_done} tareas hechas")
+    pending = [index for index in range(tasks) if index not in aggregate.results]
+    workers = workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+
+    def registrar(result: Dict[str, Any], done: int) -> None:
+        aggregate.add(result)
+        if checkpoint and (done % checkpoint_every == 0 or done == len(pending)):
+            aggregate.save(checkpoint)
+        if on_progress and (done % progress_every == 0 or done == len(pending)):
+            on_progress(aggregate.summary(bootstrap=False))
+
+    if workers == 1 or len(pending) <= 1:
+        _init_worker(strategies)
+        for done, index in enumerate(pending, start=1):
+            registrar(_ejecutar_tarea(index, spec), done)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(strategies,)) as executor:
+            futures = [executor.submit(_ejecutar_tarea, index, spec) for index in pending]
+            for done, future in enumerate(as_completed(futures), start=1):
+                registrar(future.result(), done)
+
+    report = aggregate.summary()
+    report['elapsed'] = time.perf_counter() - start_time
+    logger.info(
+        f"Monte Carlo: {len(pending)} tareas, {report['rounds']:,} rondas en total "
+        f"en {report['elapsed']:.1f}s ({workers} procesos)"
+    )
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Backtest Monte Carlo en paralelo")
+    parser.add_argument('--tasks', type=int, default=1000, help="Tareas independientes")
+    parser.add_argument('--mode', choices=MODOS, default='shoes')
+    parser.add_argument('--shoes', type=int, default=5, help="Zapatos por tarea (modo shoes)")
+    parser.add_argument('--rounds', type=int, default=10_000, help="Rondas por tarea (modo rounds)")
+    parser.add_argument('--decks', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--checkpoint', help="Checkpoint JSON para reanudar")
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--out', help="Archivo JSON del reporte final")
+    args = parser.parse_args(argv)
+
+    def mostrar(partial: Dict[str, Any]) -> None:
+        best = partial['strategies'][0]
+        print(f"  {partial['tasks_done']}/{args.tasks} tareas, {partial['rounds']:,} rondas; "
+              f"mejor: {best['strategy']} {best['hit_rate']:.2f}% {best['ci_wilson']}")
+
+    report = run_montecarlo(args.tasks, args.mode, args.shoes, args.rounds, args.seed, args.decks,
+                            workers=args.workers, checkpoint=args.checkpoint,
+                            confidence=args.confidence, on_progress=mostrar,
+                            progress_every=max(1, args.tasks // 20))
+
+    print(f"{report['rounds']:,} rondas en {report['elapsed']:.1f}s")
+    for worker, rate in report['throughput'].items():
+        print(f"  proceso {worker}: {rate:,} rondas/s")
+    for row in report['strategies']:
+        print(f"  {row['strategy']:<28} acierto={row['hit_rate']:.2f}% "
+              f"wilson={row['ci_wilson']} bootstrap={row['ci_bootstrap']} "
+              f"frecuencia={row['signal_frequency']:.2f}%")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,278 @@
+# baccarat_bot/simulations/replay.py
+
+"""
+Backtest sobre los resultados reales guardados en baccarat_data.db.
+
+SQLiteReplaySource recorre la tabla ``resultados`` una sola vez en orden de
+id (el orden del rowid: SQLite no tiene que ordenar nada) con un cursor que
+se consume por bloques de ``fetchmany``. El resultado llega codificado desde
+SQL (como en ml_dataset), cada bloque pasa a int8 con ``np.fromiter`` y se
+reparte por mesa con un argsort estable, así que no hay trabajo Python por
+fila: la velocidad la pone la lectura de SQLite.
+
+run_replay alimenta con esos bloques, mesa por mesa y en el orden en que
+se jugaron:
+
+- el StreamingBacktester (señal más segura, mismo reporte que
+  generate_simulation_report),
+- cada estrategia por separado (analyze_prefixes, con intervalo de Wilson),
+- y la evaluación walk-forward de los modelos ML.
+
+Uso:
+    python -m baccarat_bot.simulations.replay --db baccarat_data.db
+    python -m baccarat_bot.simulations.replay --mesa "XXXTreme Lightning Baccarat" --no-ml
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from baccarat_bot.ml_dataset import _CODIGO_SQL
+from baccarat_bot.simulations.backtester import DETALLES_MAXIMOS, StreamingBacktester
+from baccarat_bot.simulations.montecarlo import ESTRATEGIAS_POR_DEFECTO, _contar_aciertos, intervalo_wilson
+from baccarat_bot.simulations.ml_walkforward import run_walkforward
+from baccarat_bot.simulations.sweep import ESTRATEGIAS_BARRIBLES
+from baccarat_bot.strategies.state import SIMBOLOS
+
+logger = logging.getLogger(__name__)
+
+# Filas por fetchmany
+TAMANO_BLOQUE_DB = 50_000
+
+# Walk-forward por defecto, a la escala de lo que se registra por mesa
+WALKFORWARD_POR_DEFECTO = {'folds': 3, 'train_size': 500, 'test_size': 200}
+
+
+class SQLiteReplaySource:
+    """Rondas de la base de datos por bloques, en orden de id, separadas por mesa."""
+
+    def __init__(self, db_path: str = "baccarat_data.db", mesa_nombre: Optional[str] = None,
+                 chunk_size: int = TAMANO_BLOQUE_DB):
+        """
+        Args:
+            db_path: Ruta de la base de datos SQLite
+            mesa_nombre: Mesa a leer (todas si es None)
+            chunk_size: Filas leídas por bloque
+        """
+        self.db_path = db_path
+        self.mesa_nombre = mesa_nombre
+        self.chunk_size = chunk_size
+        self.rows_read = 0
+        self.skipped = 0  # Filas con resultados no reconocidos
+
+    def mesas(self) -> Dict[int, str]:
+        """{id: nombre} de las mesas de la base de datos."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return dict(conn.execute("SELECT id, nombre FROM mesas ORDER BY id"))
+        finally:
+            conn.close()
+
+    def chunks(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Bloques (mesa_id, códigos int8) en orden de id. Dentro de cada
+        bloque leído, las rondas de cada mesa conservan su orden.
+
+        Raises:
+            ValueError: Si la mesa indicada no existe.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            query = f"SELECT r.mesa_id, {_CODIGO_SQL} FROM resultados r WHERE r.mesa_id IS NOT NULL"
+            params: Tuple = ()
+            if self.mesa_nombre is not None:
+                row = conn.execute("SELECT id FROM mesas WHERE nombre = ?", (self.mesa_nombre,)).fetchone()
+                if row is None:
+                    raise ValueError(f"Mesa no encontrada: {self.mesa_nombre}")
+                query += " AND r.mesa_id = ?"
+                params = (row[0],)
+            cursor = conn.execute(query + " ORDER BY r.id", params)
+
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                block = np.fromiter(
+                    itertools.chain.from_iterable(rows), dtype=np.int64, count=2 * len(rows)
+                ).reshape(-1, 2)
+                self.rows_read += len(block)
+                valid = block[:, 1] < 3
+                self.skipped += len(block) - int(valid.sum())
+                block = block[valid]
+                if not len(block):
+                    continue
+                mesa_ids = block[:, 0]
+                codes = block[:, 1].astype(np.int8)
+                if mesa_ids[0] == mesa_ids[-1] and (mesa_ids == mesa_ids[0]).all():
+                    yield int(mesa_ids[0]), codes
+                    continue
+                order = np.argsort(mesa_ids, kind='stable')
+                mesa_ids, codes = mesa_ids[order], codes[order]
+                starts = np.flatnonzero(np.diff(mesa_ids)) + 1
+                for start, end in zip(np.r_[0, starts], np.r_[starts, len(codes)]):
+                    yield int(mesa_ids[start]), codes[start:end]
+        finally:
+            conn.close()
+
+    def codes_by_table(self) -> Dict[int, np.ndarray]:
+        """Historial completo de cada mesa ({mesa_id: códigos}), por id de mesa."""
+        parts: Dict[int, List[np.ndarray]] = {}
+        for mesa_id, codes in self.chunks():
+            parts.setdefault(mesa_id, []).append(codes)
+        return {mesa_id: np.concatenate(parts[mesa_id]) for mesa_id in sorted(parts)}
+
+
+def _tallies_estrategias(strategies: Dict[str, Any], codes: np.ndarray,
+                         confidence: float = 0.95) -> List[Dict[str, Any]]:
+    """Acierto de cada estrategia sobre el historial de una mesa."""
+    rows = []
+    for name, strategy in strategies.items():
+        signals, correct, pushes = _contar_aciertos(strategy, codes)
+        low, high = intervalo_wilson(correct, signals, confidence)
+        rows.append({
+            'strategy': name,
+            'signals': signals,
+            'correct': correct,
+            'pushes': pushes,
+            'hit_rate': round(correct / signals * 100, 4) if signals else 0.0,
+            'ci_wilson': [round(low * 100, 4), round(high * 100, 4)],
+            'signal_frequency': round(signals / (len(codes) - 1) * 100, 4) if len(codes) > 1 else 0.0,
+        })
+    rows.sort(key=lambda row: row['hit_rate'], reverse=True)
+    return rows
+
+
+def run_replay(db_path: str = "baccarat_data.db", mesa_nombre: Optional[str] = None,
+               chunk_size: int = TAMANO_BLOQUE_DB, backtest: bool = True,
+               strategies: Optional[Dict[str, Dict[str, Any]]] = None,
+               ml_models: Optional[Dict[str, Dict[str, Any]]] = None, ml: bool = True,
+               walkforward: Optional[Dict[str, int]] = None,
+               max_details: Optional[int] = DETALLES_MAXIMOS,
+               workers: Optional[int] = 1) -> Dict[str, Any]:
+    """
+    Backtest de las rondas registradas de cada mesa.
+
+    Args:
+        db_path: Ruta de la base de datos SQLite
+        mesa_nombre: Mesa a evaluar (todas si es None)
+        chunk_size: Filas leídas por bloque
+        backtest: Pasar las rondas por el StreamingBacktester (señal más
+            segura, una evaluación por ronda)
+        strategies: {estrategia: parámetros} evaluadas por separado (por
+            defecto montecarlo.ESTRATEGIAS_POR_DEFECTO)
+        ml_models: Modelos del walk-forward (ver ml_walkforward)
+        ml: Ejecutar el walk-forward ML
+        walkforward: folds, train_size y test_size del walk-forward
+        max_details: Resultados detallados del backtester por mesa
+        workers: Procesos del walk-forward
+
+    Returns:
+        {'source': ..., 'tables': {nombre: reporte}}; el reporte de cada mesa
+        tiene las claves de generate_simulation_report más 'strategies' y 'ml'
+    """
+    source = SQLiteReplaySource(db_path, mesa_nombre, chunk_size)
+    names = source.mesas()
+    strategies = ESTRATEGIAS_POR_DEFECTO if strategies is None else strategies
+    instances = {name: ESTRATEGIAS_BARRIBLES[name](**params) for name, params in strategies.items()}
+    walkforward = dict(WALKFORWARD_POR_DEFECTO, **(walkforward or {}))
+
+    start_time = time.perf_counter()
+    backtesters: Dict[int, StreamingBacktester] = {}
+    parts: Dict[int, List[np.ndarray]] = {}
+    for mesa_id, codes in source.chunks():
+        parts.setdefault(mesa_id, []).append(codes)
+        if backtest:
+            backtester = backtesters.get(mesa_id)
+            if backtester is None:
+                backtester = backtesters[mesa_id] = StreamingBacktester(
+                    names.get(mesa_id, str(mesa_id)), max_details=max_details)
+            backtester.feed_codes(codes)
+    read_time = time.perf_counter() - start_time
+
+    tables = {}
+    for mesa_id in sorted(parts):
+        name = names.get(mesa_id, str(mesa_id))
+        codes = np.concatenate(parts[mesa_id])
+        counts = np.bincount(codes, minlength=3)
+        report: Dict[str, Any] = {
+            'simulation_details': {
+                'table_name': name,
+                'num_rounds': len(codes),
+                'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            },
+            'baccarat_stats': {symbol: int(counts[code]) for code, symbol in enumerate(SIMBOLOS)},
+        }
+        if backtest:
+            report['strategy_report'] = backtesters[mesa_id].get_report()
+            report['detailed_results'] = backtesters[mesa_id].get_detailed_results()
+        report['strategies'] = _tallies_estrategias(instances, codes)
+        if ml:
+            try:
+                report['ml'] = run_walkforward(codes, ml_models, workers=workers, **walkforward)
+            except ValueError as e:
+                logger.info(f"Walk-forward omitido para {name}: {e}")
+                report['ml'] = None
+        tables[name] = report
+
+    return {
+        'source': {
+            'db_path': db_path,
+            'rows_read': source.rows_read,
+            'skipped': source.skipped,
+            'read_time_s': read_time,
+            'elapsed_s': time.perf_counter() - start_time,
+        },
+        'tables': tables,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Backtest sobre los resultados de la base de datos")
+    parser.add_argument('--db', default='baccarat_data.db', help="Base de datos SQLite")
+    parser.add_argument('--mesa', help="Mesa a evaluar (todas por defecto)")
+    parser.add_argument('--chunk-size', type=int, default=TAMANO_BLOQUE_DB)
+    parser.add_argument('--no-backtest', action='store_true', help="Omitir la señal más segura ronda a ronda")
+    parser.add_argument('--no-ml', action='store_true', help="Omitir el walk-forward ML")
+    parser.add_argument('--folds', type=int, default=WALKFORWARD_POR_DEFECTO['folds'])
+    parser.add_argument('--train-size', type=int, default=WALKFORWARD_POR_DEFECTO['train_size'])
+    parser.add_argument('--test-size', type=int, default=WALKFORWARD_POR_DEFECTO['test_size'])
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--out', help="Archivo JSON del reporte")
+    args = parser.parse_args(argv)
+
+    report = run_replay(
+        args.db, args.mesa, args.chunk_size, backtest=not args.no_backtest, ml=not args.no_ml,
+        walkforward={'folds': args.folds, 'train_size': args.train_size, 'test_size': args.test_size},
+        workers=args.workers
+    )
+    source = report['source']
+    print(f"{source['rows_read']:,} filas leídas en {source['read_time_s']:.2f}s "
+          f"({source['skipped']} no reconocidas); total {source['elapsed_s']:.1f}s")
+    for name, table in report['tables'].items():
+        print(f"\n{name}: {table['simulation_details']['num_rounds']:,} rondas {table['baccarat_stats']}")
+        if 'strategy_report' in table:
+            summary = table['strategy_report']
+            print(f"  Señal más segura: {summary['total_signals']} señales, "
+                  f"precisión {summary['accuracy']:.2f}%")
+        for row in table['strategies']:
+            print(f"  {row['strategy']:<28} acierto={row['hit_rate']:.2f}% "
+                  f"wilson={row['ci_wilson']} frecuencia={row['signal_frequency']:.2f}%")
+        for model, result in (table.get('ml') or {}).get('models', {}).items():
+            print(f"  ML {model:<10} acierto={result['summary']['accuracy']:.2%}")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    # El consenso registra cada señal; en un replay serían miles de líneas
+    logging.getLogger('baccarat_bot.strategies').setLevel(logging.WARNING)
+    main()
@@ -0,0 +1,201 @@
+# baccarat_bot/simulations/shoe.py
+
+"""
+Simulación a nivel de cartas: zapatos completos de Punto Banco.
+
+A diferencia de los resultados i.i.d. del simulador, aquí cada zapato es
+un array barajado de num_decks mazos y las rondas se reparten con las
+reglas reales: naturales (8 o 9), el Jugador pide con 0-5 y la Banca sigue
+la tabla de tercera carta. Así aparecen los efectos de zapato (composición
+cambiante, carta de corte, rachas de empates) que las estrategias y la
+estimación de cartas restantes del GameTimingDetector necesitan ver.
+
+El reparto está vectorizado entre zapatos: cada paso del bucle reparte una
+ronda en todos los zapatos activos a la vez (unos 80 pasos por lote, sin
+importar cuántos zapatos tenga).
+
+Cartas como rango 1..13 (A..K) en int8; 0 significa "sin carta".
+"""
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+CARTAS_POR_MAZO = 52
+
+# Puntos de cada rango (índice = rango; 10, J, Q y K valen 0)
+PUNTOS = np.array([0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 0, 0, 0, 0], dtype=np.int8)
+
+# BANCA_ROBA[total de la banca, puntos de la tercera carta del jugador]:
+# si la Banca pide cuando el Jugador pidió tercera carta
+BANCA_ROBA = np.zeros((10, 10), dtype=bool)
+BANCA_ROBA[0:3, :] = True
+BANCA_ROBA[3, :] = True
+BANCA_ROBA[3, 8] = False
+BANCA_ROBA[4, 2:8] = True
+BANCA_ROBA[5, 4:8] = True
+BANCA_ROBA[6, 6:8] = True
+
+# Carta de corte: entre cuántas cartas del final se coloca (inclusive)
+CORTE_POR_DEFECTO = (14, 16)
+
+# Zapatos por lote en el modo por lotes
+ZAPATOS_POR_LOTE = 4096
+
+# Máximo de cartas de una ronda (2 + 1 por lado)
+_CARTAS_RONDA = 6
+
+
+@dataclass
+class ShoeResults:
+    """
+    Rondas de uno o más zapatos, en orden (zapato, ronda).
+
+    Las rondas del zapato i son offsets[i]:offsets[i + 1]. Las cartas
+    de cada mano van en el orden en que se reparten; la tercera es 0 si la
+    mano no pidió.
+    """
+    codes: np.ndarray            # int8, P=0, B=1, E=2
+    shoe: np.ndarray             # int32, índice del zapato de cada ronda
+    player_cards: np.ndarray     # int8 (n, 3), rangos 1..13
+    banker_cards: np.ndarray     # int8 (n, 3)
+    player_total: np.ndarray     # int8
+    banker_total: np.ndarray     # int8
+    cards_remaining: np.ndarray  # int16, cartas en el zapato tras la ronda
+    offsets: np.ndarray          # int64 (zapatos + 1)
+    num_decks: int = 8
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def num_shoes(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def cards_dealt(self) -> np.ndarray:
+        """Cartas repartidas en cada ronda (4 a 6)."""
+        return ((self.player_cards > 0).sum(axis=1) + (self.banker_cards > 0).sum(axis=1)).astype(np.int8)
+
+    @property
+    def naturals(self) -> np.ndarray:
+        """Rondas decididas con un natural (8 o 9 con dos cartas)."""
+        return (self.player_cards[:, 2] == 0) & (self.banker_cards[:, 2] == 0) & (
+            (self.player_total >= 8) | (self.banker_total >= 8))
+
+    @property
+    def round_index(self) -> np.ndarray:
+        """Número de ronda dentro de su zapato (desde 0)."""
+        return np.arange(len(self.codes)) - self.offsets[self.shoe]
+
+    def shoe_codes(self) -> List[np.ndarray]:
+        """Códigos de cada zapato por separado (vistas, sin copiar)."""
+        return np.split(self.codes, self.offsets[1:-1])
+
+
+def barajar_zapatos(rng: np.random.Generator, num_shoes: int, num_decks: int = 8) -> np.ndarray:
+    """num_shoes zapatos barajados de forma independiente: (zapatos, cartas) int8."""
+    mazo = np.tile(np.repeat(np.arange(1, 14, dtype=np.int8), 4), num_decks)
+    return rng.permuted(np.broadcast_to(mazo, (num_shoes, len(mazo))), axis=1)
+
+
+def repartir_zapatos(cartas: np.ndarray, corte: np.ndarray, burn: bool = True,
+                     extra_hand: bool = True, num_decks: int = 8) -> ShoeResults:
+    """
+    Reparte todas las rondas de cada zapato con las reglas de tercera carta.
+
+    Args:
+        cartas: Zapatos barajados (zapatos, cartas), rangos 1..13
+        corte: Posición de la carta de corte en cada zapato (índice de la
+            primera carta que queda detrás de ella)
+        burn: Quemar cartas al empezar: se descubre una y se descartan
+            tantas como su valor (10 si vale 0)
+        extra_hand: Al salir la carta de corte se termina la ronda y se
+            juega una más (si es False, esa ronda es la última)
+        num_decks: Mazos por zapato (se guarda en el resultado)
+    """
+    num_shoes, n = cartas.shape
+    corte = np.asarray(corte, dtype=np.int64)
+    planas = cartas.reshape(-1)
+    pasos = np.arange(_CARTAS_RONDA)
+
+    if burn:
+        quemadas = PUNTOS[cartas[:, 0]].astype(np.int64)
+        pos = 1 + np.where(quemadas == 0, 10, quemadas)
+    else:
+        pos = np.zeros(num_shoes, dtype=np.int64)
+    salio = np.zeros(num_shoes, dtype=bool)
+    activos = np.flatnonzero((pos <= corte) & (pos + _CARTAS_RONDA <= n))
+
+    partes = []
+    while len(activos):
+        p = pos[activos]
+        mano = planas[(activos * n + p)[:, None] + pasos]
+        puntos = PUNTOS[mano]
+        # Orden de reparto: J, B, J, B, luego terceras cartas
+        jugador = (puntos[:, 0] + puntos[:, 2]) % 10
+        banca = (puntos[:, 1] + puntos[:, 3]) % 10
+        natural = (jugador >= 8) | (banca >= 8)
+        pide_j = ~natural & (jugador <= 5)
+        tercera_j = np.where(pide_j, puntos[:, 4], 0)
+        pide_b = ~natural & np.where(pide_j, BANCA_ROBA[banca, tercera_j], banca <= 5)
+        # La tercera de la banca es la quinta carta si el jugador no pidió
+        carta_b = np.where(pide_j, mano[:, 5], mano[:, 4])
+
+        total_j = (jugador + tercera_j) % 10
+        total_b = (banca + np.where(pide_b, PUNTOS[carta_b], 0)) % 10
+        codigo = np.where(total_j == total_b, 2, (total_b > total_j).astype(np.int8)).astype(np.int8)
+
+        mano_j = np.zeros((len(activos), 3), dtype=np.int8)
+        mano_j[:, :2] = mano[:, [0, 2]]
+        mano_j[:, 2] = np.where(pide_j, mano[:, 4], 0)
+        mano_b = np.zeros((len(activos), 3), dtype=np.int8)
+        mano_b[:, :2] = mano[:, [1, 3]]
+        mano_b[:, 2] = np.where(pide_b, carta_b, 0)
+
+        p = p + 4 + pide_j + pide_b
+        pos[activos] = p
+        partes.append((codigo, activos.astype(np.int32), mano_j, mano_b,
+                       total_j.astype(np.int8), total_b.astype(np.int8), (n - p).astype(np.int16)))
+
+        # Al salir la carta de corte: una ronda más (extra_hand) y se acaba
+        sale = p > corte[activos]
+        sigue = ~sale | (extra_hand & ~salio[activos])
+        salio[activos] |= sale
+        activos = activos[sigue & (p + _CARTAS_RONDA <= n)]
+
+    campos = [np.concatenate(columna) for columna in zip(*(partes or [_vacios()]))]
+    # Los pasos van ronda por ronda: ordenar por zapato (estable) deja
+    # cada zapato contiguo y en orden de ronda
+    orden = np.argsort(campos[1], kind='stable')
+    campos = [campo[orden] for campo in campos]
+    offsets = np.zeros(num_shoes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(campos[1], minlength=num_shoes), out=offsets[1:])
+    return ShoeResults(*campos, offsets=offsets, num_decks=num_decks)
+
+
+def _vacios():
+    return (np.zeros(0, np.int8), np.zeros(0, np.int32), np.zeros((0, 3), np.int8),
+            np.zeros((0, 3), np.int8), np.zeros(0, np.int8), np.zeros(0, np.int8),
+            np.zeros(0, np.int16))
+
+
+def simular_zapatos(rng: np.random.Generator, num_shoes: int, num_decks: int = 8,
+                    cut_range: Tuple[int, int] = CORTE_POR_DEFECTO, burn: bool = True,
+                    extra_hand: bool = True) -> ShoeResults:
+    """
+    Baraja y reparte num_shoes zapatos completos.
+
+    Args:
+        rng: Generador de NumPy
+        num_shoes: Zapatos a simular
+        num_decks: Mazos por zapato
+        cut_range: La carta de corte se coloca entre cut_range[0] y
+            cut_range[1] cartas del final (uniforme, inclusive)
+        burn: Quemar cartas al empezar cada zapato
+        extra_hand: Jugar una ronda más después de la carta de corte
+    """
+    cartas = barajar_zapatos(rng, num_shoes, num_decks)
+    corte = cartas.shape[1] - rng.integers(cut_range[0], cut_range[1] + 1, size=num_shoes)
+    return repartir_zapatos(cartas, corte, burn=burn, extra_hand=extra_hand, num_decks=num_decks)
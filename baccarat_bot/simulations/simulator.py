@@ -1,10 +1,19 @@
 # baccarat_bot/simulations/simulator.py
 
 import random
-from typing import List, Tuple, Dict
+from typing import Iterator, List, Tuple, Dict
 from collections import deque
 from datetime import datetime
 
+import numpy as np
+
+from baccarat_bot.simulations.shoe import (
+    CORTE_POR_DEFECTO,
+    ZAPATOS_POR_LOTE,
+    ShoeResults,
+    simular_zapatos
+)
+
 # Constantes de Baccarat (probabilidades aproximadas)
 # Banker: 45.86%
 # Player: 44.62%
@@ -14,16 +23,67 @@ BANKER_PROB = 45.86
 PLAYER_PROB = 44.62
 TIE_PROB = 9.52
 
+# Modo vectorizado: resultados codificados como en strategies.state
+# (P=0, B=1, E=2). Cada ronda es un entero uniforme de 32 bits y su código
+# es (u >= umbral P) + (u >= umbral P+B): dos comparaciones por ronda.
+_TOTAL_PROB = PLAYER_PROB + BANKER_PROB + TIE_PROB
+_UMBRAL_P = np.uint32(round(PLAYER_PROB / _TOTAL_PROB * 2 ** 32))
+_UMBRAL_PB = np.uint32(round((PLAYER_PROB + BANKER_PROB) / _TOTAL_PROB * 2 ** 32))
+_LETRAS = np.array(['P', 'B', 'E'])
+
+# Resultado que gana cada apuesta de las estrategias
+RESULTADO_APUESTA = {'BANCA': 'B', 'JUGADOR': 'P', 'EMPATE': 'E'}
+
+# Rondas por bloque en el modo por bloques (1 MB de códigos)
+TAMANO_BLOQUE = 1 << 20
+
+
+def generar_codigos(rng: np.random.Generator, num_rounds: int) -> np.ndarray:
+    """N resultados i.i.d. codificados (int8, P=0, B=1, E=2) en una llamada."""
+    u = rng.integers(0, 2 ** 32, size=num_rounds, dtype=np.uint32)
+    return (u >= _UMBRAL_P).view(np.int8) + (u >= _UMBRAL_PB).view(np.int8)
+
+
+def generadores_independientes(seed, n: int) -> List[np.random.Generator]:
+    """
+    n generadores con flujos independientes y reproducibles (uno por
+    proceso o tarea), derivados de una semilla con SeedSequence.spawn.
+    """
+    return [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(n)]
+
+
+def decodificar_codigos(codes: np.ndarray) -> List[str]:
+    """Códigos int8 a la lista de letras ('P', 'B', 'E') que usan las estrategias."""
+    return _LETRAS[np.asarray(codes)].tolist()
+
+
 class BaccaratSimulator:
     """
     Simulador de rondas de Baccarat para probar estrategias.
     Genera resultados con una distribución estadística realista.
+
+    Además del modo ronda a ronda (run_simulation), simulate_codes() y
+    simulate_chunks() generan los resultados vectorizados con un
+    numpy.random.Generator propio; spawn() crea simuladores con flujos
+    independientes para procesos en paralelo. simulate_shoes() reparte
+    zapatos completos de num_decks mazos carta a carta (ver shoe.py).
     """
 
-    def __init__(self, num_decks: int = 8):
+    def __init__(self, num_decks: int = 8, seed=None):
+        """
+        Args:
+            num_decks: Mazos del zapato
+            seed: Semilla, SeedSequence o Generator del modo vectorizado
+        """
         self.num_decks = num_decks
         self.history: List[str] = []
         self.stats: Dict[str, int] = {'B': 0, 'P': 0, 'E': 0}
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def spawn(cls, n: int, seed=None, num_decks: int = 8) -> List['BaccaratSimulator']:
+        """n simuladores con flujos aleatorios independientes y reproducibles."""
+        return [cls(num_decks, rng) for rng in generadores_independientes(seed, n)]
 
     def _generate_result(self) -> str:
         """Genera un resultado de Baccarat basado en probabilidades."""
@@ -51,6 +111,55 @@ class BaccaratSimulator:
             self.run_round()
         return self.history
 
+    def _contar(self, codes: np.ndarray) -> None:
+        counts = np.bincount(codes.view(np.uint8), minlength=3)
+        self.stats['P'] += int(counts[0])
+        self.stats['B'] += int(counts[1])
+        self.stats['E'] += int(counts[2])
+
+    def simulate_codes(self, num_rounds: int) -> np.ndarray:
+        """
+        Genera N rondas en una llamada como array int8 (P=0, B=1, E=2).
+        Actualiza las estadísticas pero no el historial de strings.
+        """
+        codes = generar_codigos(self.rng, num_rounds)
+        self._contar(codes)
+        return codes
+
+    def simulate_chunks(self, num_rounds: int,
+                        chunk_size: int = TAMANO_BLOQUE) -> Iterator[np.ndarray]:
+        """
+        Genera N rondas en bloques de chunk_size (memoria constante para
+        cualquier N); concatenados son los mismos códigos que
+        simulate_codes(N) con la misma semilla.
+        """
+        remaining = num_rounds
+        while remaining > 0:
+            codes = self.simulate_codes(min(chunk_size, remaining))
+            remaining -= len(codes)
+            yield codes
+
+    def simulate_shoes(self, num_shoes: int, cut_range: Tuple[int, int] = CORTE_POR_DEFECTO,
+                       burn: bool = True, extra_hand: bool = True) -> ShoeResults:
+        """
+        Baraja y reparte num_shoes zapatos de num_decks mazos con las reglas
+        de tercera carta. Retorna los resultados y las cartas de cada ronda
+        (ShoeResults); actualiza las estadísticas.
+        """
+        results = simular_zapatos(self.rng, num_shoes, self.num_decks, cut_range,
+                                  burn=burn, extra_hand=extra_hand)
+        self._contar(results.codes)
+        return results
+
+    def simulate_shoe_batches(self, num_shoes: int, batch_size: int = ZAPATOS_POR_LOTE,
+                              **kwargs) -> Iterator[ShoeResults]:
+        """simulate_shoes() en lotes de batch_size zapatos (memoria constante)."""
+        remaining = num_shoes
+        while remaining > 0:
+            results = self.simulate_shoes(min(batch_size, remaining), **kwargs)
+            remaining -= results.num_shoes
+            yield results
+
     def get_history(self) -> List[str]:
         """Retorna el historial completo de la simulación."""
         return self.history
@@ -62,6 +171,10 @@ class BaccaratSimulator:
 class StrategyTester:
     """
     Clase para probar las estrategias seguras contra un historial simulado.
+
+    Re-analiza el historial completo en cada ronda (O(n²)); para historiales
+    largos usar StreamingBacktester (simulations.backtester), que produce
+    el mismo reporte.
     """
     
     def __init__(self, strategies_module):
@@ -106,7 +219,7 @@ class StrategyTester:
                 self.signal_stats['total_signals'] += 1
                 
                 # Verificar si la apuesta fue correcta
-                is_correct = (apuesta[0] == actual_result)
+                is_correct = (RESULTADO_APUESTA.get(apuesta) == actual_result)
                 
                 if is_correct:
                     self.signal_stats['correct_signals'] += 1
@@ -157,15 +270,15 @@ def generate_simulation_report(num_rounds: int, table_name: str) -> Dict:
     """
     Función principal para generar el reporte de simulación.
     """
-    from baccarat_bot.strategies import safe_strategies
+    from baccarat_bot.simulations.backtester import StreamingBacktester
     
     # 1. Ejecutar simulación de Baccarat
     simulator = BaccaratSimulator()
     history = simulator.run_simulation(num_rounds)
     
-    # 2. Probar estrategias
-    tester = StrategyTester(safe_strategies)
-    tester.test_strategies(history, table_name)
+    # 2. Probar estrategias (en streaming, con todos los resultados detallados)
+    tester = StreamingBacktester(table_name, max_details=None)
+    tester.feed(history)
     
     # 3. Consolidar reporte
     report = {
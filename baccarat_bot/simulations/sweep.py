@@ -0,0 +1,313 @@
+# baccarat_bot/simulations/sweep.py
+
+"""
+Barrido paralelo de parámetros de estrategias.
+
+Cada combinación de una grilla de parámetros se evalúa sobre un corpus
+grande (simulado o leído de la base de datos) con ``analyze_prefixes``:
+la estrategia produce en una pasada vectorizada la señal de cada ronda, y
+se compara con el resultado siguiente. Las combinaciones se reparten en un
+pool de procesos; el corpus se publica una sola vez en memoria compartida
+y los procesos lo leen sin copiarlo.
+
+El resultado es una tabla ordenada (tasa de acierto, frecuencia de señal y
+calibración de la confianza) exportable a CSV y JSON.
+
+Uso:
+    python -m baccarat_bot.simulations.sweep --rounds 1000000 --out leaderboard
+    python -m baccarat_bot.simulations.sweep --grid grilla.json --db baccarat_data.db
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from baccarat_bot.simulations.simulator import generar_codigos
+from baccarat_bot.strategies.advanced_strategies import (
+    StreakStrategy,
+    ZigZagStrategy,
+    TrendAnalysisStrategy,
+    TieDetectionStrategy
+)
+from baccarat_bot.strategies.safe_strategies import (
+    ConservativeStreakStrategy,
+    ConfirmedPatternStrategy,
+    StatisticalEdgeStrategy,
+    ConsensusStrategy,
+    DominanceStrategy
+)
+from baccarat_bot.strategies.vectorized import E
+
+logger = logging.getLogger(__name__)
+
+# Estrategias con analyze_prefixes que se pueden barrer
+ESTRATEGIAS_BARRIBLES = {
+    'StreakStrategy': StreakStrategy,
+    'ZigZagStrategy': ZigZagStrategy,
+    'TrendAnalysisStrategy': TrendAnalysisStrategy,
+    'TieDetectionStrategy': TieDetectionStrategy,
+    'ConservativeStreakStrategy': ConservativeStreakStrategy,
+    'ConfirmedPatternStrategy': ConfirmedPatternStrategy,
+    'StatisticalEdgeStrategy': StatisticalEdgeStrategy,
+    'ConsensusStrategy': ConsensusStrategy,
+    'DominanceStrategy': DominanceStrategy,
+}
+
+# Grilla alrededor de los parámetros fijos usados en el bot
+GRILLA_POR_DEFECTO = {
+    'StreakStrategy': {'streak_length': [3, 4, 5, 6]},
+    'TrendAnalysisStrategy': {'short_window': [3, 5, 7], 'long_window': [10, 15, 20, 30]},
+    'DominanceStrategy': {'window_size': [10, 15, 20, 30], 'dominance_threshold': [0.6, 0.65, 0.7, 0.75, 0.8]},
+    'StatisticalEdgeStrategy': {'min_sample_size': [20, 30, 50], 'deviation_threshold': [0.05, 0.1, 0.15, 0.2]},
+    'ConservativeStreakStrategy': {'min_streak_length': [4, 5, 6, 7]},
+    'ConfirmedPatternStrategy': {'pattern_length': [2, 3, 4, 5]},
+    'ConsensusStrategy': {'min_consensus': [2, 3, 4]},
+}
+
+# Bins de confianza para la calibración (0-9, 10-19, ..., 100)
+_BINS_CONFIANZA = 11
+
+Combinacion = Tuple[str, Dict[str, Any]]
+
+
+def expandir_grilla(grid: Dict[str, Dict[str, Sequence[Any]]]) -> List[Combinacion]:
+    """
+    Lista de combinaciones (estrategia, parámetros) de una grilla.
+
+    Raises:
+        ValueError: Si la grilla nombra una estrategia no barrible.
+    """
+    combinations = []
+    for strategy_name, params in grid.items():
+        if strategy_name not in ESTRATEGIAS_BARRIBLES:
+            raise ValueError(f"Estrategia no soportada en el barrido: {strategy_name}")
+        names = list(params)
+        for values in itertools.product(*(params[name] for name in names)):
+            combinations.append((strategy_name, dict(zip(names, values))))
+    return combinations
+
+
+def generar_corpus(rounds: int, seed: int = 42) -> np.ndarray:
+    """Historial simulado (codificado int8) con las probabilidades del simulador."""
+    return generar_codigos(np.random.default_rng(seed), rounds)
+
+
+def corpus_desde_db(db_path: str = "baccarat_data.db",
+                    mesa_nombre: Optional[str] = None,
+                    chunk_size: int = 50000) -> List[np.ndarray]:
+    """
+    Historiales codificados de la base de datos, uno por mesa.
+
+    Args:
+        db_path: Ruta de la base de datos SQLite
+        mesa_nombre: Mesa a leer (todas si es None)
+        chunk_size: Filas leídas por bloque
+    """
+    from baccarat_bot.simulations.replay import SQLiteReplaySource
+    try:
+        source = SQLiteReplaySource(db_path, mesa_nombre, chunk_size)
+        return list(source.codes_by_table().values())
+    except ValueError:
+        # Mesa inexistente: sin historiales
+        return []
+
+
+def _acumular(strategy_name: str, params: Dict[str, Any],
+              segments: Sequence[np.ndarray]) -> Dict[str, Any]:
+    """Evalúa una combinación sobre todos los segmentos del corpus."""
+    strategy = ESTRATEGIAS_BARRIBLES[strategy_name](**params)
+    opportunities = signals_total = correct_total = pushes_total = 0
+    bin_signals = np.zeros(_BINS_CONFIANZA, dtype=np.int64)
+    bin_correct = np.zeros(_BINS_CONFIANZA, dtype=np.int64)
+    bin_confidence = np.zeros(_BINS_CONFIANZA, dtype=np.int64)
+
+    for encoded in segments:
+        if len(encoded) < 2:
+            continue
+        signals, confidences = strategy.analyze_prefixes(encoded)
+        # La señal de la ronda i se juega en la ronda i + 1
+        signals, confidences, outcome = signals[:-1], confidences[:-1], encoded[1:]
+        has_signal = signals >= 0
+        correct = has_signal & (signals == outcome)
+        # Apuesta a banca/jugador que termina en empate: se devuelve
+        push = has_signal & (signals != E) & (outcome == E)
+
+        opportunities += len(outcome)
+        signals_total += int(has_signal.sum())
+        correct_total += int(correct.sum())
+        pushes_total += int(push.sum())
+
+        bins = np.minimum(confidences[has_signal] // 10, _BINS_CONFIANZA - 1)
+        bin_signals += np.bincount(bins, minlength=_BINS_CONFIANZA)
+        bin_correct += np.bincount(bins, weights=correct[has_signal], minlength=_BINS_CONFIANZA).astype(np.int64)
+        bin_confidence += np.bincount(bins, weights=confidences[has_signal], minlength=_BINS_CONFIANZA).astype(np.int64)
+
+    decided = signals_total - pushes_total
+    hit_rate = correct_total / signals_total if signals_total else 0.0
+    mean_confidence = bin_confidence.sum() / signals_total / 100 if signals_total else 0.0
+
+    # Error de calibración esperado: |confianza media - acierto| por bin, ponderado
+    calibration_error = 0.0
+    for signals_bin, correct_bin, confidence_bin in zip(bin_signals, bin_correct, bin_confidence):
+        if signals_bin:
+            calibration_error += signals_bin / signals_total * abs(
+                confidence_bin / signals_bin / 100 - correct_bin / signals_bin
+            )
+
+    return {
+        'strategy': strategy_name,
+        'params': params,
+        'rounds': opportunities,
+        'signals': signals_total,
+        'correct': correct_total,
+        'pushes': pushes_total,
+        'hit_rate': round(hit_rate * 100, 4),
+        'hit_rate_decided': round(correct_total / decided * 100, 4) if decided else 0.0,
+        'signal_frequency': round(signals_total / opportunities * 100, 4) if opportunities else 0.0,
+        'mean_confidence': round(mean_confidence * 100, 4),
+        'calibration_error': round(calibration_error * 100, 4),
+    }
+
+
+# --- Estado de cada proceso del pool ---
+
+_shm: Optional[shared_memory.SharedMemory] = None
+_segments: List[np.ndarray] = []
+
+
+def _init_worker(shm_name: str, length: int, offsets: List[int]) -> None:
+    """Adjunta el corpus publicado en memoria compartida (sin copiarlo)."""
+    global _shm, _segments
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    corpus = np.ndarray((length,), dtype=np.int8, buffer=_shm.buf)
+    _segments = [corpus[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _evaluar(combination: Combinacion) -> Dict[str, Any]:
+    strategy_name, params = combination
+    return _acumular(strategy_name, params, _segments)
+
+
+def ordenar_leaderboard(rows: List[Dict[str, Any]], min_signals: int = 30) -> List[Dict[str, Any]]:
+    """
+    Ordena por tasa de acierto y frecuencia de señal.
+
+    Las combinaciones con menos de ``min_signals`` señales quedan al final:
+    su tasa de acierto no es estadísticamente comparable.
+    """
+    ranked = sorted(
+        rows,
+        key=lambda r: (r['signals'] >= min_signals, r['hit_rate'], r['signal_frequency'], -r['calibration_error']),
+        reverse=True
+    )
+    for position, row in enumerate(ranked, start=1):
+        row['rank'] = position
+    return ranked
+
+
+def run_sweep(grid: Dict[str, Dict[str, Sequence[Any]]],
+              corpus: Sequence[np.ndarray],
+              workers: Optional[int] = None,
+              min_signals: int = 30) -> List[Dict[str, Any]]:
+    """
+    Evalúa todas las combinaciones de la grilla sobre el corpus.
+
+    Args:
+        grid: {estrategia: {parámetro: [valores]}}
+        corpus: Historiales codificados (uno por mesa o simulación)
+        workers: Procesos del pool (por defecto, uno por CPU; 1 = sin pool)
+        min_signals: Señales mínimas para competir en la tabla
+
+    Returns:
+        Leaderboard ordenado (ver ordenar_leaderboard)
+    """
+    combinations = expandir_grilla(grid)
+    segments = [np.ascontiguousarray(s, dtype=np.int8) for s in corpus]
+    workers = workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+
+    if workers == 1 or len(combinations) == 1:
+        rows = [_acumular(name, params, segments) for name, params in combinations]
+    else:
+        offsets = [0]
+        for segment in segments:
+            offsets.append(offsets[-1] + len(segment))
+        length = offsets[-1]
+        shm = shared_memory.SharedMemory(create=True, size=max(length, 1))
+        try:
+            np.ndarray((length,), dtype=np.int8, buffer=shm.buf)[:] = np.concatenate(segments) if segments else []
+            chunksize = max(1, len(combinations) // (workers * 8))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shm.name, length, offsets)) as executor:
+                rows = list(executor.map(_evaluar, combinations, chunksize=chunksize))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    logger.info(
+        f"Barrido: {len(combinations)} combinaciones × {sum(len(s) for s in segments):,} rondas "
+        f"en {time.perf_counter() - start_time:.1f}s ({workers} procesos)"
+    )
+    return ordenar_leaderboard(rows, min_signals)
+
+
+def guardar_leaderboard(rows: List[Dict[str, Any]], ruta_base: str) -> Tuple[str, str]:
+    """Guarda el leaderboard como ``<ruta_base>.csv`` y ``<ruta_base>.json``."""
+    csv_path, json_path = f"{ruta_base}.csv", f"{ruta_base}.json"
+    columns = ['rank', 'strategy', 'params', 'rounds', 'signals', 'correct', 'pushes',
+               'hit_rate', 'hit_rate_decided', 'signal_frequency', 'mean_confidence',
+               'calibration_error']
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, 'params': json.dumps(row['params'], sort_keys=True)})
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(rows, f, indent=2, ensure_ascii=False)
+    return csv_path, json_path
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Barrido paralelo de parámetros de estrategias")
+    parser.add_argument('--grid', help="Archivo JSON {estrategia: {parámetro: [valores]}}")
+    parser.add_argument('--rounds', type=int, default=1_000_000, help="Rondas simuladas")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', help="Usar los resultados de esta base de datos en lugar de simular")
+    parser.add_argument('--mesa', help="Mesa de la base de datos (todas por defecto)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--min-signals', type=int, default=30)
+    parser.add_argument('--out', default='leaderboard', help="Ruta base de los archivos de salida")
+    args = parser.parse_args(argv)
+
+    grid = GRILLA_POR_DEFECTO
+    if args.grid:
+        with open(args.grid, 'r', encoding='utf-8') as f:
+            grid = json.load(f)
+
+    if args.db:
+        corpus = corpus_desde_db(args.db, args.mesa)
+    else:
+        corpus = [generar_corpus(args.rounds, args.seed)]
+
+    rows = run_sweep(grid, corpus, workers=args.workers, min_signals=args.min_signals)
+    csv_path, json_path = guardar_leaderboard(rows, args.out)
+
+    print(f"{len(rows)} combinaciones evaluadas -> {csv_path}, {json_path}")
+    for row in rows[:10]:
+        print(f"  #{row['rank']:<3} {row['strategy']:<28} {json.dumps(row['params'], sort_keys=True):<50} "
+              f"acierto={row['hit_rate']:.2f}%  frecuencia={row['signal_frequency']:.2f}%  "
+              f"ECE={row['calibration_error']:.2f}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,15 +1,22 @@
 # baccarat_bot/strategies/advanced_strategies.py
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from abc import ABC, abstractmethod
 import logging
 
+from baccarat_bot.strategies.decision_tables import compile_decision_table, compile_decision_tables
+from baccarat_bot.strategies.bitboard import BitboardHistory
+from baccarat_bot.strategies.state import HistoryFeatures, TableState
+
 logger = logging.getLogger(__name__)
 
 
 class BettingStrategy(ABC):
     """Clase base abstracta para todas las estrategias de apuesta"""
     
+    # Tabla de decisión compilada (ver strategies.decision_tables)
+    decision_table = None
+    
     def __init__(self, name: str):
         self.name = name
     
@@ -38,6 +45,68 @@ class BettingStrategy(ABC):
             Nivel de confianza de 0 a 100
         """
         pass
+    
+    def required_windows(self) -> Tuple[int, ...]:
+        """Ventanas cuyos conteos necesita la estrategia en un TableState"""
+        return ()
+    
+    def required_pattern_lengths(self) -> Tuple[int, ...]:
+        """Longitudes de patrón que la estrategia necesita indexadas"""
+        return ()
+    
+    def min_history(self) -> int:
+        """Longitud de historial por debajo de la cual nunca genera señal"""
+        return 0
+    
+    def estimated_cost(self) -> float:
+        """Coste relativo estimado de una evaluación (para ordenar evaluaciones)"""
+        return 1.0
+    
+    def decision_window(self) -> int:
+        """
+        Últimos K resultados que determinan por completo (señal, confianza).
+        
+        0 si la estrategia depende de más historial y no se puede tabular.
+        """
+        return 0
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        """
+        Retorna (señal, confianza) a partir del estado incremental de una mesa.
+        
+        La implementación por defecto reconstruye el historial reciente
+        conservado en el estado; las estrategias de ventana fija la
+        sobrescriben para responder en tiempo constante.
+        """
+        history = state.recent()
+        return self.analyze(history), self.get_confidence_level(history)
+    
+    def evaluate(self, history: List[str],
+                 features: Optional[HistoryFeatures] = None
+                 ) -> Tuple[Optional[str], int, HistoryFeatures]:
+        """
+        Calcula señal y confianza en una sola pasada
+        
+        Args:
+            history: Lista de resultados previos ('B', 'P', 'E')
+            features: Contexto compartido entre estrategias evaluadas sobre
+                el mismo historial (se crea uno nuevo si no se indica)
+            
+        Returns:
+            Tupla (señal, confianza, contexto de características)
+        """
+        if features is None:
+            features = HistoryFeatures(history)
+        signal, confidence = features.evaluation(self)
+        return signal, confidence, features
+    
+    def analyze_state(self, state: TableState) -> Optional[str]:
+        """Equivalente a analyze() usando el estado incremental"""
+        return self.evaluate_state(state)[0]
+    
+    def confidence_from_state(self, state: TableState) -> int:
+        """Equivalente a get_confidence_level() usando el estado incremental"""
+        return self.evaluate_state(state)[1]
 
 
 class StreakStrategy(BettingStrategy):
@@ -47,6 +116,13 @@ class StreakStrategy(BettingStrategy):
         super().__init__("Racha")
         self.streak_length = streak_length
     
+    def min_history(self) -> int:
+        return self.streak_length
+    
+    def decision_window(self) -> int:
+        # La confianza deja de crecer (95%) con rachas de streak_length + 5
+        return self.streak_length + 5
+    
     def analyze(self, history: List[str]) -> Optional[str]:
         if len(history) < self.streak_length:
             return None
@@ -85,6 +161,32 @@ class StreakStrategy(BettingStrategy):
             return min(70 + (streak_count - self.streak_length) * 5, 95)
         
         return 0
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        if self.decision_table is not None:
+            return self.decision_table.lookup(state)
+        if len(state) < self.streak_length:
+            return None, 0
+        
+        value, streak_count = state.streak
+        if streak_count < self.streak_length:
+            return None, 0
+        
+        signal = {'B': 'JUGADOR', 'P': 'BANCA', 'E': 'EMPATE'}[value]
+        return signal, min(70 + (streak_count - self.streak_length) * 5, 95)
+    
+    def analyze_prefixes(self, encoded):
+        """
+        Señal y confianza para cada prefijo de un historial codificado
+        
+        Args:
+            encoded: Array int8 (P=0, B=1, E=2), ver strategies.vectorized
+            
+        Returns:
+            Tupla (señales, confianzas); señal -1 cuando no hay señal
+        """
+        from baccarat_bot.strategies.vectorized import streak_prefixes
+        return streak_prefixes(encoded, self.streak_length)
 
 
 class TieDetectionStrategy(BettingStrategy):
@@ -94,6 +196,12 @@ class TieDetectionStrategy(BettingStrategy):
         super().__init__("Detección de Empates")
         self.observation_window = observation_window
     
+    def min_history(self) -> int:
+        return self.observation_window
+    
+    def decision_window(self) -> int:
+        return self.observation_window
+    
     def analyze(self, history: List[str]) -> Optional[str]:
         if len(history) < self.observation_window:
             return None
@@ -128,6 +236,33 @@ class TieDetectionStrategy(BettingStrategy):
             return 50
         
         return 0
+    
+    def required_windows(self) -> Tuple[int, ...]:
+        return (self.observation_window,)
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        if self.decision_table is not None:
+            return self.decision_table.lookup(state)
+        if len(state) < self.observation_window:
+            return None, 0
+        
+        tie_count = state.window_counts(self.observation_window)[2]
+        recent_tie = 'E' in state.last(2)
+        
+        if tie_count >= 3:
+            return 'EMPATE', 75
+        elif tie_count == 2:
+            return 'EMPATE', 65
+        elif tie_count == 1 and recent_tie:
+            return 'EMPATE', 50
+        
+        return None, 0
+    
+    def analyze_prefixes(self, encoded):
+        """Versión vectorizada para todos los prefijos (ver StreakStrategy)"""
+        from baccarat_bot.strategies.vectorized import tie_detection_prefixes
+        return tie_detection_prefixes(encoded, self.observation_window)
+
 
 class ZigZagStrategy(BettingStrategy):
     """Estrategia 2: Patrón Zig-Zag - Detecta alternancias"""
@@ -136,6 +271,12 @@ class ZigZagStrategy(BettingStrategy):
         super().__init__("Zig-Zag")
         self.pattern_length = pattern_length
     
+    def min_history(self) -> int:
+        return self.pattern_length
+    
+    def decision_window(self) -> int:
+        return self.pattern_length
+    
     def analyze(self, history: List[str]) -> Optional[str]:
         if len(history) < self.pattern_length:
             return None
@@ -176,6 +317,24 @@ class ZigZagStrategy(BettingStrategy):
                 return 75
         
         return 0
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        if self.decision_table is not None:
+            return self.decision_table.lookup(state)
+        if len(state) < self.pattern_length:
+            return None, 0
+        
+        # La alternancia final ya excluye empates
+        if state.alternation_length < self.pattern_length:
+            return None, 0
+        
+        next_bet = state.last(2)[0]
+        return ('BANCA' if next_bet == 'B' else 'JUGADOR'), 75
+    
+    def analyze_prefixes(self, encoded):
+        """Versión vectorizada para todos los prefijos (ver StreakStrategy)"""
+        from baccarat_bot.strategies.vectorized import zigzag_prefixes
+        return zigzag_prefixes(encoded, self.pattern_length)
 
 
 class MartingaleAdaptedStrategy(BettingStrategy):
@@ -185,6 +344,12 @@ class MartingaleAdaptedStrategy(BettingStrategy):
         super().__init__("Martingale Adaptado")
         self.max_progression = max_progression
     
+    def min_history(self) -> int:
+        return 2
+    
+    def decision_window(self) -> int:
+        return 3
+    
     def analyze(self, history: List[str]) -> Optional[str]:
         if len(history) < 2:
             return None
@@ -213,6 +378,23 @@ class MartingaleAdaptedStrategy(BettingStrategy):
             return 60
         
         return 0
+    
+    def required_windows(self) -> Tuple[int, ...]:
+        return (3,)
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        if self.decision_table is not None:
+            return self.decision_table.lookup(state)
+        if len(state) < 2:
+            return None, 0
+        
+        b_count, p_count, _ = state.window_counts(3)
+        if b_count >= 2:
+            return 'BANCA', 60
+        elif p_count >= 2:
+            return 'JUGADOR', 60
+        
+        return None, 0
 
 
 class FibonacciStrategy(BettingStrategy):
@@ -222,6 +404,15 @@ class FibonacciStrategy(BettingStrategy):
         super().__init__("Fibonacci")
         self.fibonacci = [1, 1, 2, 3, 5, 8, 13, 21]
     
+    def min_history(self) -> int:
+        return 5
+    
+    def decision_window(self) -> int:
+        return 5
+    
+    def estimated_cost(self) -> float:
+        return 2.0
+    
     def analyze(self, history: List[str]) -> Optional[str]:
         if len(history) < 5:
             return None
@@ -253,6 +444,23 @@ class FibonacciStrategy(BettingStrategy):
             return 65
         
         return 0
+    
+    def required_windows(self) -> Tuple[int, ...]:
+        return (5,)
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        if self.decision_table is not None:
+            return self.decision_table.lookup(state)
+        if len(state) < 5:
+            return None, 0
+        
+        b_count, p_count, _ = state.window_counts(5)
+        if b_count in self.fibonacci:
+            return 'BANCA', 65
+        elif p_count in self.fibonacci:
+            return 'JUGADOR', 65
+        
+        return None, 0
 
 
 class TrendAnalysisStrategy(BettingStrategy):
@@ -263,6 +471,12 @@ class TrendAnalysisStrategy(BettingStrategy):
         self.short_window = short_window
         self.long_window = long_window
     
+    def min_history(self) -> int:
+        return self.long_window
+    
+    def estimated_cost(self) -> float:
+        return 2.0
+    
     def analyze(self, history: List[str]) -> Optional[str]:
         if len(history) < self.long_window:
             return None
@@ -317,6 +531,32 @@ class TrendAnalysisStrategy(BettingStrategy):
             return confidence
         
         return 0
+    
+    def required_windows(self) -> Tuple[int, ...]:
+        return (self.short_window, self.long_window)
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        if len(state) < self.long_window:
+            return None, 0
+        
+        short_b, short_p, _ = state.window_counts(self.short_window)
+        long_b, long_p, _ = state.window_counts(self.long_window)
+        
+        short_trend = 'B' if short_b > short_p else 'P' if short_p > short_b else None
+        long_trend = 'B' if long_b > long_p else 'P' if long_p > long_b else None
+        
+        if short_trend == long_trend and short_trend:
+            short_diff = abs(short_b - short_p) / self.short_window * 100
+            long_diff = abs(long_b - long_p) / self.long_window * 100
+            confidence = min(70 + int((short_diff + long_diff) / 2), 85)
+            return ('BANCA' if short_trend == 'B' else 'JUGADOR'), confidence
+        
+        return None, 0
+    
+    def analyze_prefixes(self, encoded):
+        """Versión vectorizada para todos los prefijos (ver StreakStrategy)"""
+        from baccarat_bot.strategies.vectorized import trend_prefixes
+        return trend_prefixes(encoded, self.short_window, self.long_window)
 
 
 class StrategyManager:
@@ -331,6 +571,79 @@ class StrategyManager:
             'fibonacci': FibonacciStrategy(),
             'tendencias': TrendAnalysisStrategy(5, 15)
         }
+        # Historial por mesa en bitboards (alimentado con update_table)
+        self.table_states: Dict[str, BitboardHistory] = {}
+        
+        # Las tablas de decisión se compilan en la primera evaluación sobre
+        # estado, no al importar el módulo (la instancia global se crea ahí)
+        self._tablas_compiladas = False
+    
+    def _compilar_tablas(self):
+        """Estrategias de ventana fija: una consulta a tabla por evaluación"""
+        if not self._tablas_compiladas:
+            compile_decision_tables(self.strategies.values())
+            self._tablas_compiladas = True
+    
+    def required_windows(self) -> Tuple[int, ...]:
+        """Unión de las ventanas requeridas por todas las estrategias"""
+        windows = set()
+        for strategy in self.strategies.values():
+            windows.update(strategy.required_windows())
+        return tuple(sorted(windows))
+    
+    def required_pattern_lengths(self) -> Tuple[int, ...]:
+        """Unión de las longitudes de patrón requeridas por las estrategias"""
+        lengths = set()
+        for strategy in self.strategies.values():
+            lengths.update(strategy.required_pattern_lengths())
+        return tuple(sorted(lengths))
+    
+    def _new_table_state(self) -> BitboardHistory:
+        return BitboardHistory(
+            self.required_windows(),
+            pattern_lengths=self.required_pattern_lengths()
+        )
+    
+    def update_table(self, table_name: str, result: str) -> BitboardHistory:
+        """
+        Incorpora un nuevo resultado al estado incremental de una mesa
+        
+        Args:
+            table_name: Nombre de la mesa
+            result: Resultado de la ronda ('B', 'P', 'E')
+            
+        Returns:
+            Estado actualizado de la mesa
+        """
+        state = self.table_states.get(table_name)
+        if state is None:
+            state = self._new_table_state()
+            self.table_states[table_name] = state
+        state.push(result)
+        return state
+    
+    def analyze_state(self, state: TableState) -> Dict[str, Any]:
+        """Igual que analyze_all pero sobre un TableState o BitboardHistory"""
+        self._compilar_tablas()
+        results = {}
+        
+        for name, strategy in self.strategies.items():
+            signal, confidence = strategy.evaluate_state(state)
+            
+            results[name] = {
+                'signal': signal,
+                'confidence': confidence,
+                'active': signal is not None
+            }
+        
+        return results
+    
+    def analyze_table(self, table_name: str) -> Dict[str, Any]:
+        """Analiza una mesa usando su estado incremental"""
+        state = self.table_states.get(table_name)
+        if state is None:
+            state = self._new_table_state()
+        return self.analyze_state(state)
     
     def analyze_all(self, history: List[str]) -> Dict[str, Any]:
         """
@@ -390,8 +703,14 @@ class StrategyManager:
         Returns:
             Señal de consenso con detalles
         """
-        results = self.analyze_all(history)
-        
+        return self._consensus_from_results(self.analyze_all(history))
+    
+    def get_table_consensus(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """Señal de consenso usando el estado incremental de una mesa"""
+        return self._consensus_from_results(self.analyze_table(table_name))
+    
+    def _consensus_from_results(self, results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Combina los resultados de las estrategias en una señal de consenso"""
         # Contar votos ponderados por confianza
         votes = {'BANCA': 0, 'JUGADOR': 0, 'EMPATE': 0}
         total_confidence = 0
@@ -429,6 +748,9 @@ class StrategyManager:
     def add_strategy(self, name: str, strategy: BettingStrategy):
         """Agrega una nueva estrategia al gestor"""
         self.strategies[name] = strategy
+        if self._tablas_compiladas:
+            compile_decision_table(strategy)
+        self._rebuild_table_states()
         logger.info(f"Estrategia '{name}' agregada al gestor")
     
     def remove_strategy(self, name: str):
@@ -436,6 +758,18 @@ class StrategyManager:
         if name in self.strategies:
             del self.strategies[name]
             logger.info(f"Estrategia '{name}' eliminada del gestor")
+    
+    def _rebuild_table_states(self):
+        """Reconstruye los estados de mesa si ya no cubren las ventanas o patrones"""
+        windows = self.required_windows()
+        pattern_lengths = self.required_pattern_lengths()
+        for table_name, state in self.table_states.items():
+            indexed = state.pattern_index.lengths if state.pattern_index else ()
+            if max(windows, default=0) > state.capacity or indexed != pattern_lengths:
+                # Solo se conserva el historial reciente de cada mesa
+                self.table_states[table_name] = BitboardHistory.from_history(
+                    state.recent(), windows, pattern_lengths=pattern_lengths
+                )
 
 
 # Instancia global del gestor de estrategias
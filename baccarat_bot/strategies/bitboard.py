@@ -0,0 +1,234 @@
+# baccarat_bot/strategies/bitboard.py
+
+"""
+Historial de mesa codificado como bitboards.
+
+``BitboardHistory`` guarda un entero por resultado (Banca, Jugador, Empate)
+en el que el bit 0 es la ronda más reciente. Cada resultado nuevo desplaza
+las tres máscaras un bit a la izquierda y enciende el bit 0 de la que
+corresponde, recortando a ``capacity`` bits. Con esa representación:
+
+- los conteos de cualquier ventana son ``(máscara & ventana).bit_count()``,
+  sin registrar las ventanas de antemano como en ``TableState``;
+- la racha es la cantidad de unos finales de la máscara del último resultado;
+- la alternancia B/P es la cantidad de unos finales de
+  ``(B ^ (B >> 1)) & sin_empate & (sin_empate >> 1)``.
+
+Ofrece la misma interfaz que ``TableState`` (``len``, ``window_counts``,
+``streak``, ``alternation_length``, ``window_code``, ``last``, ``recent``,
+``evaluation``), así que las estrategias de ``advanced_strategies`` y
+``safe_strategies`` lo consumen directamente con ``evaluate_state``.
+"""
+
+from collections import deque
+from typing import Any, Deque, Iterable, List, Optional, Tuple
+
+from baccarat_bot.strategies.pattern_index import PatternIndex
+from baccarat_bot.strategies.state import (
+    CODIGOS,
+    SIMBOLOS,
+    VENTANA_MAXIMA_CODIGO,
+    _MASCARA_CODIGO,
+    _check_code_window
+)
+
+# Rondas conservadas en las máscaras si no se pide una ventana mayor
+CAPACIDAD_BITBOARD = 256
+
+# Traducción de un historial a dígitos binarios, una tabla por máscara
+_A_BITS = {
+    symbol: str.maketrans({s: ('1' if s == symbol else '0') for s in SIMBOLOS})
+    for symbol in SIMBOLOS
+}
+
+
+def _trailing_ones(mask: int) -> int:
+    """Cantidad de bits en 1 consecutivos desde el bit 0."""
+    return ((mask + 1) & ~mask).bit_length() - 1
+
+
+class BitboardHistory:
+    """
+    Historial de una mesa como tres máscaras de bits (B, P, E).
+
+    Las consultas por ventana admiten cualquier tamaño hasta ``capacity``;
+    la racha y la alternancia también se miden dentro de esas rondas.
+    """
+
+    def __init__(self, windows: Iterable[int] = (), max_history: int = 50,
+                 pattern_lengths: Iterable[int] = (),
+                 pattern_index: Optional[PatternIndex] = None,
+                 capacity: int = CAPACIDAD_BITBOARD):
+        """
+        Args:
+            windows: Ventanas que se consultarán; la capacidad se amplía
+                para cubrir la mayor.
+            max_history: Resultados recientes que se conservan para
+                estrategias que aún necesitan la lista completa.
+            pattern_lengths: Longitudes de patrón a indexar (n-gramas).
+            pattern_index: Índice de patrones ya construido que se seguirá
+                actualizando.
+            capacity: Rondas mínimas representadas en las máscaras.
+        """
+        self.capacity = max(max(windows, default=0), capacity, VENTANA_MAXIMA_CODIGO)
+        self._mask = (1 << self.capacity) - 1
+
+        self.banker = 0
+        self.player = 0
+        self.tie = 0
+        self._filled = 0  # Bits de rondas existentes
+        self._recent: Deque[str] = deque(maxlen=max(max_history, 2))
+
+        self.total = 0
+        self.ties_total = 0
+        self._window_code = _MASCARA_CODIGO
+
+        pattern_lengths = tuple(pattern_lengths)
+        if pattern_index is None and pattern_lengths:
+            pattern_index = PatternIndex(pattern_lengths)
+        self.pattern_index = pattern_index
+
+    @classmethod
+    def from_history(cls, history: Iterable[str], windows: Iterable[int] = (),
+                     max_history: int = 50,
+                     pattern_lengths: Iterable[int] = (),
+                     capacity: int = CAPACIDAD_BITBOARD) -> 'BitboardHistory':
+        """
+        Construye el historial de una vez: cada máscara se obtiene
+        traduciendo el historial a una cadena binaria (sin recorrerlo
+        resultado a resultado salvo para el índice de patrones).
+
+        Raises:
+            ValueError: Si algún resultado no es 'B', 'P' o 'E'.
+        """
+        board = cls(windows, max_history, pattern_lengths, capacity=capacity)
+        text = history if isinstance(history, str) else ''.join(history)
+        invalid = text.translate({ord(s): None for s in SIMBOLOS})
+        if invalid:
+            raise ValueError(
+                f"Resultado inválido: {invalid[0]}. Debe ser 'B', 'P' o 'E'."
+            )
+
+        if text:
+            kept = text[-board.capacity:]
+            board.banker = int(kept.translate(_A_BITS['B']), 2)
+            board.player = int(kept.translate(_A_BITS['P']), 2)
+            board.tie = int(kept.translate(_A_BITS['E']), 2)
+            board._filled = (1 << len(kept)) - 1
+
+            code = _MASCARA_CODIGO
+            for result in text[-VENTANA_MAXIMA_CODIGO:]:
+                code = ((code << 2) | CODIGOS[result]) & _MASCARA_CODIGO
+            board._window_code = code
+
+            board.total = len(text)
+            board.ties_total = text.count('E')
+            board._recent.extend(text[-board._recent.maxlen:])
+
+        if board.pattern_index is not None:
+            for result in text:
+                board.pattern_index.push(result)
+        return board
+
+    def push(self, result: str) -> None:
+        """
+        Incorpora un nuevo resultado desplazando las máscaras.
+
+        Raises:
+            ValueError: Si el resultado no es 'B', 'P' o 'E'.
+        """
+        code = CODIGOS.get(result)
+        if code is None:
+            raise ValueError(
+                f"Resultado inválido: {result}. Debe ser 'B', 'P' o 'E'."
+            )
+
+        mask = self._mask
+        self.banker = ((self.banker << 1) | (code == 1)) & mask
+        self.player = ((self.player << 1) | (code == 0)) & mask
+        self.tie = ((self.tie << 1) | (code == 2)) & mask
+        self._filled = ((self._filled << 1) | 1) & mask
+
+        if code == 2:
+            self.ties_total += 1
+        self._recent.append(result)
+        self.total += 1
+        self._window_code = ((self._window_code << 2) | code) & _MASCARA_CODIGO
+
+        if self.pattern_index is not None:
+            self.pattern_index.push(result)
+
+    def extend(self, results: Iterable[str]) -> None:
+        """Incorpora varios resultados en orden."""
+        for result in results:
+            self.push(result)
+
+    def __len__(self) -> int:
+        return self.total
+
+    @property
+    def version(self) -> int:
+        """Número de resultados incorporados (crece monótonamente)."""
+        return self.total
+
+    def _board(self, result: str) -> int:
+        if result == 'B':
+            return self.banker
+        if result == 'P':
+            return self.player
+        return self.tie
+
+    @property
+    def streak(self) -> Tuple[Optional[str], int]:
+        """Tupla (valor, longitud) de la racha actual (hasta ``capacity``)."""
+        if not self.total:
+            return None, 0
+        value = self._recent[-1]
+        return value, _trailing_ones(self._board(value))
+
+    @property
+    def alternation_length(self) -> int:
+        """Longitud de la alternancia B/P final sin empates."""
+        not_tie = self._filled & ~self.tie
+        if not not_tie & 1:
+            return 0
+        banker = self.banker
+        alternating = (banker ^ (banker >> 1)) & not_tie & (not_tie >> 1)
+        return 1 + _trailing_ones(alternating)
+
+    def window_counts(self, window: int) -> Tuple[int, int, int]:
+        """
+        Conteos (banca, jugador, empate) en las últimas ``window`` rondas.
+
+        Raises:
+            KeyError: Si la ventana supera la capacidad de las máscaras.
+        """
+        if window > self.capacity:
+            raise KeyError(window)
+        if window <= 0:
+            return 0, 0, 0
+        window_mask = (1 << window) - 1
+        return (
+            (self.banker & window_mask).bit_count(),
+            (self.player & window_mask).bit_count(),
+            (self.tie & window_mask).bit_count()
+        )
+
+    def window_code(self, k: int) -> int:
+        """Código de las últimas ``k`` rondas (ver TableState.window_code)."""
+        _check_code_window(k)
+        return self._window_code & ((1 << (2 * k)) - 1)
+
+    def last(self, n: int) -> List[str]:
+        """Últimos ``n`` resultados (como máximo los conservados)."""
+        recent = self._recent
+        n = min(n, len(recent))
+        return [recent[i] for i in range(-n, 0)]
+
+    def recent(self) -> List[str]:
+        """Copia de los resultados recientes conservados."""
+        return list(self._recent)
+
+    def evaluation(self, strategy: Any) -> Tuple[Optional[str], int]:
+        """(señal, confianza) de una estrategia sobre este historial."""
+        return strategy.evaluate_state(self)
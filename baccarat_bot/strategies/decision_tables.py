@@ -0,0 +1,203 @@
+# baccarat_bot/strategies/decision_tables.py
+
+"""
+Tablas de decisión precompiladas para estrategias de ventana fija.
+
+Las estrategias cuyo (señal, confianza) depende solo de los últimos K
+resultados declaran ``decision_window() == K``. Al compilarlas se enumeran
+una vez todas las ventanas posibles y se guarda el resultado en dos arrays
+indexados por el código de la ventana, de modo que evaluar la estrategia
+es un único acceso a un array.
+
+Código de ventana: 2 bits por posición (P=0, B=1, E=2, 3 = ronda inexistente
+cuando el historial es más corto que K), con el resultado más reciente en
+los bits bajos. ``TableState`` mantiene este código al agregar resultados.
+
+Las tablas se guardan en disco (.npz) con una clave derivada de la clase,
+los parámetros y el código de la estrategia, para que el arranque no tenga
+que recompilarlas y un cambio en su lógica no sirva tablas viejas.
+"""
+
+import functools
+import hashlib
+import inspect
+import itertools
+import json
+import logging
+import marshal
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from baccarat_bot.strategies.state import CODIGOS, VENTANA_MAXIMA_CODIGO
+from baccarat_bot.utils.cache_dir import directorio_cache
+
+logger = logging.getLogger(__name__)
+
+# Ventana máxima tabulable: 4^10 entradas (2 MB por estrategia)
+VENTANA_MAXIMA_TABLA = min(10, VENTANA_MAXIMA_CODIGO)
+
+DIRECTORIO_TABLAS = os.getenv('DECISION_TABLES_DIR') or directorio_cache('decision_tables')
+
+# Cambiar si se modifica el formato o la codificación de las tablas
+_FORMATO = 1
+
+_SENALES = ('JUGADOR', 'BANCA', 'EMPATE')
+_CODIGO_SENAL = {signal: code for code, signal in enumerate(_SENALES)}
+_FALTANTE = 3
+
+# Tablas ya cargadas en este proceso, por clave
+_tablas: Dict[str, 'DecisionTable'] = {}
+
+
+class DecisionTable:
+    """(señal, confianza) precalculados para cada ventana de K resultados."""
+
+    def __init__(self, window: int, signals: np.ndarray, confidences: np.ndarray):
+        self.window = window
+        self.signals = signals          # int8, -1 = sin señal
+        self.confidences = confidences  # uint8
+
+        # Lista de tuplas compartidas: indexar una lista es mucho más barato
+        # que leer escalares de NumPy en el camino caliente
+        pairs: Dict[Tuple[int, int], Tuple[Optional[str], int]] = {}
+        self._results = []
+        for signal, confidence in zip(signals.tolist(), confidences.tolist()):
+            pair = pairs.get((signal, confidence))
+            if pair is None:
+                pair = (_SENALES[signal] if signal >= 0 else None, confidence)
+                pairs[(signal, confidence)] = pair
+            self._results.append(pair)
+
+    @classmethod
+    def build(cls, strategy) -> 'DecisionTable':
+        """Enumera todas las ventanas (incluidas las de historiales cortos)."""
+        window = strategy.decision_window()
+        size = 1 << (2 * window)
+        signals = np.full(size, -1, dtype=np.int8)
+        confidences = np.zeros(size, dtype=np.uint8)
+
+        for length in range(window + 1):
+            # Las posiciones más antiguas sin ronda se marcan con 3
+            missing = ((1 << (2 * (window - length))) - 1) << (2 * length)
+            for history in itertools.product('PBE', repeat=length):
+                code = 0
+                for result in history:
+                    code = (code << 2) | CODIGOS[result]
+                code |= missing
+
+                history = list(history)
+                signal = strategy.analyze(history)
+                if signal is not None:
+                    signals[code] = _CODIGO_SENAL[signal]
+                confidences[code] = strategy.get_confidence_level(history)
+
+        return cls(window, signals, confidences)
+
+    def lookup_code(self, code: int) -> Tuple[Optional[str], int]:
+        """(señal, confianza) para un código de ventana."""
+        return self._results[code]
+
+    def lookup(self, state) -> Tuple[Optional[str], int]:
+        """(señal, confianza) para el final de un TableState/HistoryFeatures."""
+        return self._results[state.window_code(self.window)]
+
+    def save(self, path: str) -> None:
+        """Guarda la tabla de forma atómica."""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, window=self.window, signals=self.signals, confidences=self.confidences)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'DecisionTable':
+        with np.load(path) as data:
+            return cls(int(data['window']), data['signals'], data['confidences'])
+
+
+@functools.lru_cache(maxsize=None)
+def _huella_codigo(cls) -> str:
+    """
+    Hash del código del que dependen las decisiones de una clase.
+
+    Se usa el fuente de los módulos de toda la jerarquía (incluye las
+    funciones auxiliares de nivel de módulo); si no está disponible, el
+    bytecode de los métodos de cada clase.
+    """
+    digest = hashlib.sha1()
+    for klass in cls.__mro__[:-1]:
+        try:
+            digest.update(inspect.getsource(inspect.getmodule(klass)).encode('utf-8'))
+        except (OSError, TypeError):
+            for name, value in sorted(vars(klass).items()):
+                code = getattr(value, '__code__', None)
+                if code is not None:
+                    digest.update(name.encode('utf-8') + marshal.dumps(code))
+    return digest.hexdigest()
+
+
+def table_key(strategy) -> str:
+    """Clave estable de la tabla de una estrategia: clase, parámetros, código y formato."""
+    params = {
+        name: value for name, value in sorted(vars(strategy).items())
+        if name not in ('name', 'decision_table') and not name.startswith('_')
+    }
+    payload = json.dumps(
+        [_FORMATO, type(strategy).__name__, strategy.decision_window(), params,
+         _huella_codigo(type(strategy))],
+        sort_keys=True, default=repr
+    )
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+    return f"{type(strategy).__name__}-{digest}"
+
+
+def compile_decision_table(strategy, cache_dir: Optional[str] = DIRECTORIO_TABLAS
+                           ) -> Optional[DecisionTable]:
+    """
+    Compila (o carga del disco) la tabla de una estrategia y se la asigna.
+
+    Args:
+        strategy: Estrategia con decision_window() > 0
+        cache_dir: Directorio de tablas compiladas (None = no usar disco)
+
+    Returns:
+        La tabla, o None si la estrategia no es tabulable
+    """
+    window = strategy.decision_window()
+    if not 0 < window <= VENTANA_MAXIMA_TABLA:
+        return None
+
+    key = table_key(strategy)
+    table = _tablas.get(key)
+    path = os.path.join(cache_dir, f"{key}.npz") if cache_dir else None
+
+    if table is None and path and os.path.exists(path):
+        try:
+            table = DecisionTable.load(path)
+        except Exception as e:
+            logger.warning(f"Tabla de decisión corrupta en {path}, se recompila: {e}")
+
+    if table is None:
+        try:
+            table = DecisionTable.build(strategy)
+        except Exception as e:
+            logger.warning(f"No se pudo compilar la tabla de {strategy.name}: {e}")
+            return None
+        if path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                table.save(path)
+            except OSError as e:
+                logger.debug(f"No se pudo guardar la tabla de {strategy.name}: {e}")
+
+    _tablas[key] = table
+    strategy.decision_table = table
+    return table
+
+
+def compile_decision_tables(strategies: Iterable, cache_dir: Optional[str] = DIRECTORIO_TABLAS) -> int:
+    """Compila las tablas de todas las estrategias tabulables; retorna cuántas."""
+    return sum(
+        1 for strategy in strategies
+        if compile_decision_table(strategy, cache_dir) is not None
+    )
@@ -0,0 +1,205 @@
+# baccarat_bot/strategies/pattern_index.py
+
+"""
+Índice incremental de n-gramas para la estrategia de patrón confirmado.
+
+Los empates se ignoran (igual que en ConfirmedPatternStrategy) y cada patrón
+de longitud k sobre B/P se empaqueta en un entero de k bits (P=0, B=1). Para
+cada longitud configurada se mantienen:
+
+- cuántas veces apareció cada patrón, y
+- qué resultado vino después de cada aparición.
+
+Así el conteo del último patrón y su sucesor más frecuente son consultas O(1)
+sin importar cuántas rondas se hayan indexado.
+"""
+
+import json
+import logging
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_BITS = {'P': 0, 'B': 1}
+
+
+class PatternIndex:
+    """Tabla de n-gramas mantenida incrementalmente para varias longitudes."""
+
+    def __init__(self, lengths: Iterable[int] = (3,)):
+        self.lengths: Tuple[int, ...] = tuple(sorted({k for k in lengths if k > 0}))
+        if not self.lengths:
+            raise ValueError("Se requiere al menos una longitud de patrón positiva")
+
+        # Se guarda un bit más que la longitud máxima para conocer el patrón anterior
+        self._mask = (1 << (self.lengths[-1] + 1)) - 1
+        self._code = 0
+
+        self.raw_total = 0      # Resultados recibidos (incluye empates)
+        self.clean_total = 0    # Resultados B/P indexados
+        self.last_id = 0        # Último id de la tabla resultados leído
+
+        self._occurrences: Dict[int, Dict[int, int]] = {k: {} for k in self.lengths}
+        self._successors: Dict[int, Dict[int, List[int]]] = {k: {} for k in self.lengths}
+
+    def push(self, result: str) -> None:
+        """Incorpora un resultado ('B', 'P' o 'E'); los empates solo se cuentan."""
+        self.raw_total += 1
+        bit = _BITS.get(result)
+        if bit is None:
+            return
+
+        previous_code = self._code
+        for k in self.lengths:
+            mask = (1 << k) - 1
+            # El patrón que terminaba en el resultado anterior gana un sucesor
+            if self.clean_total >= k:
+                self._successors[k].setdefault(previous_code & mask, [0, 0])[bit] += 1
+
+        self._code = ((previous_code << 1) | bit) & self._mask
+        self.clean_total += 1
+
+        for k in self.lengths:
+            if self.clean_total >= k:
+                code = self._code & ((1 << k) - 1)
+                occurrences = self._occurrences[k]
+                occurrences[code] = occurrences.get(code, 0) + 1
+
+    def extend(self, results: Iterable[str]) -> None:
+        """Incorpora varios resultados en orden."""
+        for result in results:
+            self.push(result)
+
+    def last_code(self, k: int) -> Optional[int]:
+        """Código empaquetado del último patrón de longitud k (None si no hay)."""
+        self._check_length(k)
+        if self.clean_total < k:
+            return None
+        return self._code & ((1 << k) - 1)
+
+    def lookup(self, k: int, code: int) -> Tuple[int, Tuple[int, int]]:
+        """Apariciones y sucesores (jugador, banca) de un patrón cualquiera."""
+        self._check_length(k)
+        successors = self._successors[k].get(code, (0, 0))
+        return self._occurrences[k].get(code, 0), (successors[0], successors[1])
+
+    def pattern_count(self, k: int) -> int:
+        """Repeticiones previas del último patrón (sin contar la actual)."""
+        code = self.last_code(k)
+        if code is None:
+            return 0
+        return self._occurrences[k][code] - 1
+
+    def next_counts(self, k: int) -> Tuple[int, int]:
+        """
+        Conteos (jugador, banca) de lo que vino después del último patrón.
+
+        Igual que ConfirmedPatternStrategy, no se considera la transición
+        hacia el resultado más reciente.
+        """
+        code = self.last_code(k)
+        if code is None:
+            return 0, 0
+        counts = list(self._successors[k].get(code, (0, 0)))
+        if self.clean_total > k and (self._code >> 1) & ((1 << k) - 1) == code:
+            counts[self._code & 1] -= 1
+        return counts[0], counts[1]
+
+    def most_common_next(self, k: int) -> Optional[str]:
+        """Sucesor más frecuente del último patrón ('B' en caso de empate)."""
+        player, banker = self.next_counts(k)
+        if player + banker == 0:
+            return None
+        return 'B' if banker >= player else 'P'
+
+    def _check_length(self, k: int) -> None:
+        if k not in self._occurrences:
+            raise KeyError(f"Longitud de patrón no indexada: {k}")
+
+    # --- Persistencia ---
+
+    def to_dict(self) -> Dict:
+        """Representación serializable a JSON."""
+        return {
+            'lengths': list(self.lengths),
+            'code': self._code,
+            'raw_total': self.raw_total,
+            'clean_total': self.clean_total,
+            'last_id': self.last_id,
+            'occurrences': {
+                str(k): {str(code): n for code, n in table.items()}
+                for k, table in self._occurrences.items()
+            },
+            'successors': {
+                str(k): {str(code): counts for code, counts in table.items()}
+                for k, table in self._successors.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PatternIndex':
+        """Reconstruye un índice a partir de to_dict()."""
+        index = cls(data['lengths'])
+        index._code = data['code']
+        index.raw_total = data['raw_total']
+        index.clean_total = data['clean_total']
+        index.last_id = data.get('last_id', 0)
+        for k in index.lengths:
+            index._occurrences[k] = {
+                int(code): n for code, n in data['occurrences'][str(k)].items()
+            }
+            index._successors[k] = {
+                int(code): list(counts) for code, counts in data['successors'][str(k)].items()
+            }
+        return index
+
+    def save(self, path: str) -> None:
+        """Guarda el índice de una mesa en un archivo JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> 'PatternIndex':
+        """Carga un índice guardado con save()."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def update_from_database(self, mesa_nombre: str, db_path: str = "baccarat_data.db",
+                             chunk_size: int = 5000) -> int:
+        """
+        Indexa los resultados almacenados de una mesa con id mayor al último leído.
+
+        Args:
+            mesa_nombre: Nombre de la mesa en la tabla mesas
+            db_path: Ruta de la base de datos SQLite
+            chunk_size: Filas leídas por bloque
+
+        Returns:
+            Número de resultados nuevos indexados
+        """
+        conn = sqlite3.connect(db_path)
+        try:
+            cursor = conn.execute(
+                """SELECT r.id, r.resultado
+                   FROM resultados r
+                   JOIN mesas m ON r.mesa_id = m.id
+                   WHERE m.nombre = ? AND r.id > ?
+                   ORDER BY r.id""",
+                (mesa_nombre, self.last_id)
+            )
+            added = 0
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for _, result in rows:
+                    self.push(result)
+                self.last_id = rows[-1][0]
+                added += len(rows)
+        finally:
+            conn.close()
+
+        if added:
+            logger.info(f"Índice de patrones de {mesa_nombre}: {added} resultados nuevos")
+        return added
@@ -5,8 +5,11 @@ Estrategias de apuesta conservadoras y seguras para Baccarat.
 Enfocadas en minimizar riesgo y maximizar precisión.
 """
 
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from baccarat_bot.strategies.advanced_strategies import BettingStrategy
+from baccarat_bot.strategies.decision_tables import compile_decision_tables
+from baccarat_bot.strategies.pattern_index import PatternIndex
+from baccarat_bot.strategies.state import HistoryFeatures, TableState
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,6 +29,9 @@ class ConservativeStreakStrategy(BettingStrategy):
         super().__init__("Racha Conservadora")
         self.min_streak_length = min_streak_length
     
+    def min_history(self) -> int:
+        return self.min_streak_length
+    
     def analyze(self, history: List[str]) -> Optional[str]:
         if len(history) < self.min_streak_length:
             return None
@@ -70,6 +76,24 @@ class ConservativeStreakStrategy(BettingStrategy):
             return min(85 + (streak_count - self.min_streak_length) * 2, 95)
         
         return 0
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        if len(state) < self.min_streak_length:
+            return None, 0
+        
+        value, streak_count = state.streak
+        if streak_count < self.min_streak_length:
+            return None, 0
+        
+        confidence = min(85 + (streak_count - self.min_streak_length) * 2, 95)
+        # Las rachas de empates no generan señal pero sí confianza
+        signal = {'B': 'JUGADOR', 'P': 'BANCA'}.get(value)
+        return signal, confidence
+    
+    def analyze_prefixes(self, encoded):
+        """Versión vectorizada para todos los prefijos (ver StatisticalEdgeStrategy)"""
+        from baccarat_bot.strategies.vectorized import conservative_streak_prefixes
+        return conservative_streak_prefixes(encoded, self.min_streak_length)
 
 
 class ConfirmedPatternStrategy(BettingStrategy):
@@ -86,6 +110,13 @@ class ConfirmedPatternStrategy(BettingStrategy):
         super().__init__("Patrón Confirmado")
         self.pattern_length = pattern_length
     
+    def min_history(self) -> int:
+        return self.pattern_length * 3
+    
+    def estimated_cost(self) -> float:
+        # Recorre todo el historial sin empates (salvo con índice de patrones)
+        return 10.0
+    
     def analyze(self, history: List[str]) -> Optional[str]:
         if len(history) < self.pattern_length * 3:
             return None
@@ -117,7 +148,7 @@ class ConfirmedPatternStrategy(BettingStrategy):
             
             if next_results:
                 # Tomar el resultado más común
-                most_common = max(set(next_results), key=next_results.count)
+                most_common = self._most_common(next_results)
                 if most_common == 'B':
                     return 'BANCA'
                 elif most_common == 'P':
@@ -141,6 +172,66 @@ class ConfirmedPatternStrategy(BettingStrategy):
             return min(80 + (pattern_count - 2) * 5, 90)
         
         return 0
+    
+    def required_pattern_lengths(self) -> Tuple[int, ...]:
+        return (self.pattern_length,)
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        index = getattr(state, 'pattern_index', None)
+        if index is not None and self.pattern_length in index.lengths:
+            return self._evaluate_index(index)
+        
+        # Una sola pasada: cuenta repeticiones y sucesores a la vez
+        clean_history = [r for r in state.recent() if r != 'E']
+        n = len(clean_history)
+        k = self.pattern_length
+        if n < k * 3:
+            return None, 0
+        
+        last_pattern = clean_history[-k:]
+        pattern_count = 0
+        next_results = []
+        for i in range(n - k):
+            if clean_history[i:i + k] == last_pattern:
+                pattern_count += 1
+                if i < n - k - 1:
+                    next_results.append(clean_history[i + k])
+        
+        if pattern_count < 2:
+            return None, 0
+        
+        confidence = min(80 + (pattern_count - 2) * 5, 90)
+        if not next_results:
+            return None, confidence
+        
+        most_common = self._most_common(next_results)
+        return ('BANCA' if most_common == 'B' else 'JUGADOR'), confidence
+    
+    def _evaluate_index(self, index: PatternIndex) -> Tuple[Optional[str], int]:
+        """Evaluación O(1) sobre el índice de n-gramas de la mesa"""
+        k = self.pattern_length
+        if index.clean_total < k * 3:
+            return None, 0
+        
+        pattern_count = index.pattern_count(k)
+        if pattern_count < 2:
+            return None, 0
+        
+        confidence = min(80 + (pattern_count - 2) * 5, 90)
+        most_common = index.most_common_next(k)
+        if most_common is None:
+            return None, confidence
+        return ('BANCA' if most_common == 'B' else 'JUGADOR'), confidence
+    
+    def analyze_prefixes(self, encoded):
+        """Versión vectorizada para todos los prefijos (ver StatisticalEdgeStrategy)"""
+        from baccarat_bot.strategies.vectorized import confirmed_pattern_prefixes
+        return confirmed_pattern_prefixes(encoded, self.pattern_length)
+    
+    @staticmethod
+    def _most_common(next_results: List[str]) -> str:
+        """Resultado más frecuente; en caso de empate se prefiere Banca"""
+        return max(('B', 'P'), key=next_results.count)
 
 
 class StatisticalEdgeStrategy(BettingStrategy):
@@ -159,6 +250,12 @@ class StatisticalEdgeStrategy(BettingStrategy):
         self.min_sample_size = min_sample_size
         self.deviation_threshold = deviation_threshold
     
+    def min_history(self) -> int:
+        return self.min_sample_size
+    
+    def estimated_cost(self) -> float:
+        return 2.0
+    
     def analyze(self, history: List[str]) -> Optional[str]:
         if len(history) < self.min_sample_size:
             return None
@@ -234,6 +331,48 @@ class StatisticalEdgeStrategy(BettingStrategy):
             return confidence
         
         return 0
+    
+    def required_windows(self) -> Tuple[int, ...]:
+        return (self.min_sample_size,)
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        if len(state) < self.min_sample_size:
+            return None, 0
+        
+        b_count, p_count, _ = state.window_counts(self.min_sample_size)
+        total = b_count + p_count
+        if total < self.min_sample_size * 0.8:
+            return None, 0
+        
+        b_ratio = b_count / total
+        p_ratio = p_count / total
+        b_deviation = abs(b_ratio - 0.5068)
+        p_deviation = abs(p_ratio - 0.4932)
+        
+        signal = None
+        if b_deviation > self.deviation_threshold:
+            signal = 'JUGADOR' if b_ratio > 0.5068 else 'BANCA'
+        elif p_deviation > self.deviation_threshold:
+            signal = 'BANCA' if p_ratio > 0.4932 else 'JUGADOR'
+        
+        max_deviation = max(b_deviation, p_deviation)
+        if max_deviation > self.deviation_threshold:
+            return signal, 70 + min(int(max_deviation * 100), 15)
+        
+        return signal, 0
+    
+    def analyze_prefixes(self, encoded):
+        """
+        Señal y confianza para cada prefijo de un historial codificado
+        
+        Args:
+            encoded: Array int8 (P=0, B=1, E=2), ver strategies.vectorized
+            
+        Returns:
+            Tupla (señales, confianzas); señal -1 cuando no hay señal
+        """
+        from baccarat_bot.strategies.vectorized import statistical_edge_prefixes
+        return statistical_edge_prefixes(encoded, self.min_sample_size, self.deviation_threshold)
 
 
 class ConsensusStrategy(BettingStrategy):
@@ -247,7 +386,7 @@ class ConsensusStrategy(BettingStrategy):
     - Máxima seguridad
     """
     
-    def __init__(self, strategies: List[BettingStrategy] = None):
+    def __init__(self, strategies: List[BettingStrategy] = None, min_consensus: int = 3):
         super().__init__("Consenso")
         
         if strategies is None:
@@ -267,64 +406,186 @@ class ConsensusStrategy(BettingStrategy):
         else:
             self.strategies = strategies
         
-        self.min_consensus = 3  # Mínimo de estrategias que deben coincidir
+        self.min_consensus = min_consensus  # Mínimo de estrategias que deben coincidir
+        
+        # Contadores de evaluación (ver get_stats)
+        self.stats = {
+            'evaluations': 0,
+            'sub_evaluations': 0,
+            'skipped_short_history': 0,
+            'skipped_unreachable': 0,
+            'skipped_decided': 0
+        }
+    
+    def min_history(self) -> int:
+        return 20
+    
+    def estimated_cost(self) -> float:
+        return sum(strategy.estimated_cost() for strategy in self.strategies)
     
     def analyze(self, history: List[str]) -> Optional[str]:
         if len(history) < 20:  # Requiere historial mínimo
             return None
         
-        # Obtener recomendaciones de todas las estrategias
-        recommendations = {}
+        # Obtener recomendaciones; se detiene en cuanto la señal está decidida
+        recommendations = self._collect_votes(
+            lambda strategy: self._evaluate_history(strategy, history),
+            len(history),
+            signal_only=True
+        )
+        return self._resolve_signal(recommendations)
+    
+    def get_confidence_level(self, history: List[str]) -> int:
+        if len(history) < 20:
+            return 0
+        
+        recommendations = self._collect_votes(
+            lambda strategy: self._evaluate_history(strategy, history),
+            len(history)
+        )
+        return self._resolve_confidence(recommendations)
+    
+    def required_windows(self) -> Tuple[int, ...]:
+        windows = set()
+        for strategy in self.strategies:
+            windows.update(strategy.required_windows())
+        return tuple(sorted(windows))
+    
+    def required_pattern_lengths(self) -> Tuple[int, ...]:
+        lengths = set()
         for strategy in self.strategies:
+            lengths.update(strategy.required_pattern_lengths())
+        return tuple(sorted(lengths))
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        if len(state) < 20:
+            return None, 0
+        
+        recommendations = self._collect_votes(state.evaluation, len(state))
+        return (
+            self._resolve_signal(recommendations),
+            self._resolve_confidence(recommendations)
+        )
+    
+    def analyze_prefixes(self, encoded):
+        """
+        Versión vectorizada para todos los prefijos.
+        
+        Requiere que todas las sub-estrategias implementen analyze_prefixes.
+        """
+        from baccarat_bot.strategies.vectorized import consensus_prefixes
+        votes = [strategy.analyze_prefixes(encoded) for strategy in self.strategies]
+        return consensus_prefixes(votes, self.min_consensus)
+    
+    @staticmethod
+    def _evaluate_history(strategy: BettingStrategy, history: List[str]) -> Tuple[Optional[str], int]:
+        """Señal y confianza de una sub-estrategia sobre una lista de resultados"""
+        result = strategy.analyze(history)
+        if not result:
+            return None, 0
+        return result, strategy.get_confidence_level(history)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Contadores de sub-evaluaciones realizadas y omitidas"""
+        return dict(self.stats)
+    
+    def _collect_votes(self, evaluate, history_length: int,
+                       signal_only: bool = False) -> Dict[str, List[int]]:
+        """
+        Agrupa por resultado las confianzas de las estrategias que votan.
+        
+        Las sub-estrategias se evalúan de menor a mayor coste estimado. Se
+        omiten las que no tienen historial suficiente para dar señal y se
+        deja de evaluar cuando ningún resultado puede llegar al consenso
+        (o, con ``signal_only``, cuando la señal ya no puede cambiar). El
+        resultado es el mismo que evaluando todas las estrategias.
+        
+        Args:
+            evaluate: Función que recibe una estrategia y retorna
+                (resultado, confianza)
+            history_length: Longitud del historial evaluado
+            signal_only: Si solo interesa la señal (no la confianza)
+        
+        Returns:
+            {resultado: [confianzas]} en el orden de votación original
+        """
+        stats = self.stats
+        stats['evaluations'] += 1
+        
+        eligible = sorted(
+            (
+                (position, strategy) for position, strategy in enumerate(self.strategies)
+                if history_length >= strategy.min_history()
+            ),
+            key=lambda item: item[1].estimated_cost()
+        )
+        stats['skipped_short_history'] += len(self.strategies) - len(eligible)
+        
+        votes: Dict[str, List[Tuple[int, int]]] = {}
+        remaining = len(eligible)
+        for position, strategy in eligible:
+            if max((len(v) for v in votes.values()), default=0) + remaining < self.min_consensus:
+                stats['skipped_unreachable'] += remaining
+                break
+            if signal_only and self._signal_decided(votes, remaining):
+                stats['skipped_decided'] += remaining
+                break
+            
+            remaining -= 1
+            stats['sub_evaluations'] += 1
             try:
-                result = strategy.analyze(history)
-                if result:
-                    confidence = strategy.get_confidence_level(history)
-                    if confidence >= 70:  # Solo considerar alta confianza
-                        if result not in recommendations:
-                            recommendations[result] = []
-                        recommendations[result].append({
-                            'strategy': strategy.name,
-                            'confidence': confidence
-                        })
+                result, confidence = evaluate(strategy)
+                if result and confidence >= 70:  # Solo considerar alta confianza
+                    votes.setdefault(result, []).append((position, confidence))
             except Exception as e:
                 logger.warning(f"Error en estrategia {strategy.name}: {e}")
                 continue
         
-        # Verificar consenso
-        for result, votes in recommendations.items():
-            if len(votes) >= self.min_consensus:
+        # Mismo orden que si se hubieran evaluado en el orden de la lista
+        return {
+            result: [confidence for _, confidence in sorted(entries)]
+            for result, entries in sorted(votes.items(), key=lambda item: min(item[1]))
+        }
+    
+    def _signal_decided(self, votes: Dict[str, List[Tuple[int, int]]], remaining: int) -> bool:
+        """
+        Indica si los votos pendientes ya no pueden cambiar la señal.
+        
+        Ocurre cuando un resultado alcanzó el consenso con una media que
+        sigue >= 75 aunque los votos restantes lleguen con la confianza
+        mínima (70), y ningún otro resultado puede alcanzarlo.
+        """
+        leaders = [
+            entries for entries in votes.values()
+            if len(entries) >= self.min_consensus
+            and (sum(c for _, c in entries) + remaining * 70) / (len(entries) + remaining) >= 75
+        ]
+        if len(leaders) != 1:
+            return False
+        others = [entries for entries in votes.values() if entries is not leaders[0]]
+        return (
+            all(len(entries) + remaining < self.min_consensus for entries in others)
+            and remaining < self.min_consensus
+        )
+    
+    def _resolve_signal(self, recommendations: Dict[str, List[int]]) -> Optional[str]:
+        """Primer resultado que alcanza el consenso con confianza media >= 75"""
+        for result, confidences in recommendations.items():
+            if len(confidences) >= self.min_consensus:
                 # Calcular confianza promedio
-                avg_confidence = sum(v['confidence'] for v in votes) / len(votes)
+                avg_confidence = sum(confidences) / len(confidences)
                 
                 if avg_confidence >= 75:
                     logger.info(
-                        f"Consenso alcanzado: {result} con {len(votes)} votos, "
+                        f"Consenso alcanzado: {result} con {len(confidences)} votos, "
                         f"confianza promedio: {avg_confidence:.1f}%"
                     )
                     return result
         
         return None
     
-    def get_confidence_level(self, history: List[str]) -> int:
-        if len(history) < 20:
-            return 0
-        
-        # Obtener recomendaciones
-        recommendations = {}
-        for strategy in self.strategies:
-            try:
-                result = strategy.analyze(history)
-                if result:
-                    confidence = strategy.get_confidence_level(history)
-                    if confidence >= 70:
-                        if result not in recommendations:
-                            recommendations[result] = []
-                        recommendations[result].append(confidence)
-            except:
-                continue
-        
-        # Buscar el resultado con más votos
+    def _resolve_confidence(self, recommendations: Dict[str, List[int]]) -> int:
+        """Confianza del resultado con más votos que alcanza el consenso"""
         max_votes = 0
         max_confidence = 0
         
@@ -357,6 +618,12 @@ class DominanceStrategy(BettingStrategy):
         self.window_size = window_size
         self.dominance_threshold = dominance_threshold
     
+    def min_history(self) -> int:
+        return self.window_size
+    
+    def estimated_cost(self) -> float:
+        return 2.0
+    
     def analyze(self, history: List[str]) -> Optional[str]:
         if len(history) < self.window_size:
             return None
@@ -404,6 +671,75 @@ class DominanceStrategy(BettingStrategy):
             return min(confidence, 90)
         
         return 0
+    
+    def required_windows(self) -> Tuple[int, ...]:
+        return (self.window_size,)
+    
+    def evaluate_state(self, state: TableState) -> Tuple[Optional[str], int]:
+        if len(state) < self.window_size:
+            return None, 0
+        
+        b_count, p_count, _ = state.window_counts(self.window_size)
+        total = b_count + p_count
+        if total < self.window_size * 0.8:
+            return None, 0
+        
+        b_ratio = b_count / total
+        p_ratio = p_count / total
+        
+        if b_ratio >= self.dominance_threshold:
+            signal = 'BANCA'
+        elif p_ratio >= self.dominance_threshold:
+            signal = 'JUGADOR'
+        else:
+            return None, 0
+        
+        max_ratio = max(b_ratio, p_ratio)
+        confidence = 80 + int((max_ratio - self.dominance_threshold) * 100)
+        return signal, min(confidence, 90)
+    
+    def analyze_prefixes(self, encoded):
+        """Versión vectorizada para todos los prefijos (ver StatisticalEdgeStrategy)"""
+        from baccarat_bot.strategies.vectorized import dominance_prefixes
+        return dominance_prefixes(encoded, self.window_size, self.dominance_threshold)
+
+
+# Estrategias seguras preconstruidas (se crean una sola vez)
+_safe_strategies: Optional[List[BettingStrategy]] = None
+
+
+def get_safe_strategies() -> List[BettingStrategy]:
+    """
+    Retorna las estrategias usadas por get_safest_signal.
+    
+    El consenso comparte instancias con las estrategias individuales, de modo
+    que cada una se evalúa una sola vez por llamada.
+    """
+    global _safe_strategies
+    if _safe_strategies is None:
+        from baccarat_bot.strategies.advanced_strategies import (
+            StreakStrategy,
+            TrendAnalysisStrategy
+        )
+        conservative_streak = ConservativeStreakStrategy(min_streak_length=5)
+        confirmed_pattern = ConfirmedPatternStrategy(pattern_length=3)
+        statistical_edge = StatisticalEdgeStrategy(min_sample_size=30)
+        consensus = ConsensusStrategy([
+            conservative_streak,
+            confirmed_pattern,
+            statistical_edge,
+            StreakStrategy(streak_length=4),
+            TrendAnalysisStrategy(short_window=5, long_window=20)
+        ])
+        _safe_strategies = [
+            conservative_streak,
+            confirmed_pattern,
+            statistical_edge,
+            consensus,
+            DominanceStrategy(window_size=20, dominance_threshold=0.70)
+        ]
+        compile_decision_tables(consensus.strategies)
+    return _safe_strategies
 
 
 # Función helper para obtener la mejor estrategia segura
@@ -417,22 +753,30 @@ def get_safest_signal(history: List[str]) -> Optional[Tuple[str, str, int]]:
     Returns:
         Tupla (resultado, estrategia, confianza) o None si no hay señal segura
     """
-    strategies = [
-        ConservativeStreakStrategy(min_streak_length=5),
-        ConfirmedPatternStrategy(pattern_length=3),
-        StatisticalEdgeStrategy(min_sample_size=30),
-        ConsensusStrategy(),
-        DominanceStrategy(window_size=20, dominance_threshold=0.70)
-    ]
+    return safest_signal_from_state(HistoryFeatures(history))
+
+
+def safest_signal_from_state(state, strategies: Optional[List[BettingStrategy]] = None
+                             ) -> Optional[Tuple[str, str, int]]:
+    """
+    Igual que get_safest_signal sobre un TableState (o HistoryFeatures) ya
+    construido, para alimentar el estado ronda a ronda sin re-cortar el
+    historial.
     
+    Args:
+        state: Estado de la mesa
+        strategies: Estrategias a evaluar (por defecto get_safe_strategies())
+        
+    Returns:
+        Tupla (resultado, estrategia, confianza) o None si no hay señal segura
+    """
     best_signal = None
     best_confidence = 0
     
-    for strategy in strategies:
+    for strategy in strategies if strategies is not None else get_safe_strategies():
         try:
-            result = strategy.analyze(history)
+            result, confidence = state.evaluation(strategy)
             if result:
-                confidence = strategy.get_confidence_level(history)
                 if confidence > best_confidence and confidence >= 80:  # Solo señales muy seguras
                     best_signal = (result, strategy.name, confidence)
                     best_confidence = confidence
@@ -0,0 +1,275 @@
+# baccarat_bot/strategies/state.py
+
+"""
+Estado incremental por mesa para las estrategias de apuesta.
+
+En lugar de re-cortar y re-contar el historial completo en cada chequeo,
+``TableState`` se alimenta resultado a resultado y mantiene los agregados
+que necesitan las estrategias: conteos por ventana, racha actual,
+longitud de alternancia y empates. Todas las consultas son O(1) respecto
+a la longitud del historial.
+
+``HistoryFeatures`` expone la misma interfaz sobre una lista ya existente
+y memoriza cada estadística durante una sola llamada, de modo que varias
+estrategias evaluadas sobre el mismo historial la calculan una única vez.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from baccarat_bot.strategies.pattern_index import PatternIndex
+
+# Codificación compartida de resultados (misma que usa el predictor ML)
+CODIGOS = {'P': 0, 'B': 1, 'E': 2}
+SIMBOLOS = 'PBE'
+
+# Rondas incluidas en el código de ventana (2 bits por ronda, 3 = sin ronda)
+VENTANA_MAXIMA_CODIGO = 16
+_MASCARA_CODIGO = (1 << (2 * VENTANA_MAXIMA_CODIGO)) - 1
+
+
+def _check_code_window(k: int) -> None:
+    if not 0 <= k <= VENTANA_MAXIMA_CODIGO:
+        raise ValueError(f"Ventana de código fuera de rango: {k}")
+
+
+class TableState:
+    """
+    Estado incremental de una mesa.
+
+    Mantiene conteos móviles para un conjunto fijo de ventanas (registradas
+    al crear el estado), la racha actual (valor y longitud), la longitud de
+    la alternancia B/P final sin empates y el total de empates.
+    """
+
+    def __init__(self, windows: Iterable[int] = (), max_history: int = 50,
+                 pattern_lengths: Iterable[int] = (),
+                 pattern_index: Optional[PatternIndex] = None):
+        """
+        Args:
+            windows: Tamaños de ventana cuyos conteos se mantendrán.
+            max_history: Resultados recientes que se conservan para
+                estrategias que aún necesitan la lista completa.
+            pattern_lengths: Longitudes de patrón a indexar (n-gramas).
+            pattern_index: Índice de patrones ya construido (p. ej. cargado
+                desde disco) que se seguirá actualizando.
+        """
+        self.windows: Tuple[int, ...] = tuple(sorted({w for w in windows if w > 0}))
+        capacity = max(max(self.windows, default=0), max_history, 2)
+
+        self._recent: Deque[str] = deque(maxlen=capacity)
+        self._counts: Dict[int, List[int]] = {w: [0, 0, 0] for w in self.windows}
+
+        self.total = 0
+        self.ties_total = 0
+        self.streak_value: Optional[str] = None
+        self.streak_length = 0
+        self.alternation_length = 0
+        self._window_code = _MASCARA_CODIGO
+        self._evaluations: Dict[int, Tuple[Optional[str], int]] = {}
+
+        pattern_lengths = tuple(pattern_lengths)
+        if pattern_index is None and pattern_lengths:
+            pattern_index = PatternIndex(pattern_lengths)
+        self.pattern_index = pattern_index
+
+    @classmethod
+    def from_history(cls, history: Iterable[str], windows: Iterable[int] = (),
+                     max_history: int = 50,
+                     pattern_lengths: Iterable[int] = ()) -> 'TableState':
+        """Construye un estado alimentándolo con un historial existente."""
+        state = cls(windows, max_history, pattern_lengths)
+        for result in history:
+            state.push(result)
+        return state
+
+    def push(self, result: str) -> None:
+        """
+        Incorpora un nuevo resultado al estado.
+
+        Raises:
+            ValueError: Si el resultado no es 'B', 'P' o 'E'.
+        """
+        code = CODIGOS.get(result)
+        if code is None:
+            raise ValueError(
+                f"Resultado inválido: {result}. Debe ser 'B', 'P' o 'E'."
+            )
+
+        recent = self._recent
+        for window, counts in self._counts.items():
+            if self.total >= window:
+                counts[CODIGOS[recent[-window]]] -= 1
+            counts[code] += 1
+
+        # Racha actual
+        if self.total and result == self.streak_value:
+            self.streak_length += 1
+        else:
+            self.streak_value = result
+            self.streak_length = 1
+
+        # Alternancia B/P sin empates
+        if result == 'E':
+            self.alternation_length = 0
+            self.ties_total += 1
+        elif self.total and recent[-1] != 'E' and recent[-1] != result:
+            self.alternation_length += 1
+        else:
+            self.alternation_length = 1
+
+        recent.append(result)
+        self.total += 1
+        self._window_code = ((self._window_code << 2) | code) & _MASCARA_CODIGO
+
+        if self.pattern_index is not None:
+            self.pattern_index.push(result)
+        if self._evaluations:
+            self._evaluations.clear()
+
+    def __len__(self) -> int:
+        return self.total
+
+    @property
+    def version(self) -> int:
+        """Número de resultados incorporados (crece monótonamente)."""
+        return self.total
+
+    @property
+    def streak(self) -> Tuple[Optional[str], int]:
+        """Tupla (valor, longitud) de la racha actual."""
+        return self.streak_value, self.streak_length
+
+    def window_counts(self, window: int) -> Tuple[int, int, int]:
+        """
+        Conteos (banca, jugador, empate) en las últimas ``window`` rondas.
+
+        Raises:
+            KeyError: Si la ventana no fue registrada al crear el estado.
+        """
+        counts = self._counts[window]
+        return counts[1], counts[0], counts[2]
+
+    def window_code(self, k: int) -> int:
+        """
+        Código de las últimas ``k`` rondas (2 bits por ronda, la más
+        reciente en los bits bajos; 3 si el historial es más corto).
+        """
+        _check_code_window(k)
+        return self._window_code & ((1 << (2 * k)) - 1)
+
+    def last(self, n: int) -> List[str]:
+        """Últimos ``n`` resultados (como máximo los conservados)."""
+        recent = self._recent
+        n = min(n, len(recent))
+        return [recent[i] for i in range(-n, 0)]
+
+    def recent(self) -> List[str]:
+        """Copia de los resultados recientes conservados."""
+        return list(self._recent)
+
+    def evaluation(self, strategy: Any) -> Tuple[Optional[str], int]:
+        """
+        (señal, confianza) de una estrategia sobre este estado, calculado
+        una sola vez por resultado incorporado.
+        """
+        key = id(strategy)
+        result = self._evaluations.get(key)
+        if result is None:
+            result = strategy.evaluate_state(self)
+            self._evaluations[key] = result
+        return result
+
+
+class HistoryFeatures:
+    """
+    Contexto de características de un historial para una sola evaluación.
+
+    Ofrece la misma interfaz que ``TableState`` (``len``, ``window_counts``,
+    ``streak``, ``alternation_length``, ``last``, ``recent``) calculando
+    cada valor de forma perezosa y memorizándolo, junto con el resultado
+    de cada estrategia evaluada sobre él.
+    """
+
+    def __init__(self, history: Sequence[str]):
+        self.history = history
+        self._counts: Dict[int, Tuple[int, int, int]] = {}
+        self._streak: Optional[Tuple[Optional[str], int]] = None
+        self._alternation: Optional[int] = None
+        self._codes: Dict[int, int] = {}
+        self._evaluations: Dict[int, Tuple[Optional[str], int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.history)
+
+    @property
+    def streak(self) -> Tuple[Optional[str], int]:
+        """Tupla (valor, longitud) de la racha final del historial."""
+        if self._streak is None:
+            history = self.history
+            if not history:
+                self._streak = (None, 0)
+            else:
+                value = history[-1]
+                length = 1
+                for i in range(len(history) - 2, -1, -1):
+                    if history[i] != value:
+                        break
+                    length += 1
+                self._streak = (value, length)
+        return self._streak
+
+    @property
+    def alternation_length(self) -> int:
+        """Longitud de la alternancia B/P final sin empates."""
+        if self._alternation is None:
+            history = self.history
+            length = 0
+            if history and history[-1] != 'E':
+                length = 1
+                for i in range(len(history) - 2, -1, -1):
+                    if history[i] == 'E' or history[i] == history[i + 1]:
+                        break
+                    length += 1
+            self._alternation = length
+        return self._alternation
+
+    def window_counts(self, window: int) -> Tuple[int, int, int]:
+        """Conteos (banca, jugador, empate) en las últimas ``window`` rondas."""
+        counts = self._counts.get(window)
+        if counts is None:
+            recent = self.history[-window:]
+            counts = (recent.count('B'), recent.count('P'), recent.count('E'))
+            self._counts[window] = counts
+        return counts
+
+    def window_code(self, k: int) -> int:
+        """Código de las últimas ``k`` rondas (ver TableState.window_code)."""
+        code = self._codes.get(k)
+        if code is None:
+            _check_code_window(k)
+            recent = self.history[-k:] if k > 0 else []
+            code = 0
+            for result in recent:
+                code = (code << 2) | CODIGOS[result]
+            missing = k - len(recent)
+            code |= ((1 << (2 * missing)) - 1) << (2 * len(recent))
+            self._codes[k] = code
+        return code
+
+    def last(self, n: int) -> List[str]:
+        """Últimos ``n`` resultados."""
+        return list(self.history[-n:]) if n > 0 else []
+
+    def recent(self) -> Sequence[str]:
+        """Historial completo (sin copiar; no debe modificarse)."""
+        return self.history
+
+    def evaluation(self, strategy: Any) -> Tuple[Optional[str], int]:
+        """(señal, confianza) de una estrategia, calculado una sola vez."""
+        key = id(strategy)
+        result = self._evaluations.get(key)
+        if result is None:
+            result = strategy.evaluate_state(self)
+            self._evaluations[key] = result
+        return result
@@ -0,0 +1,349 @@
+# baccarat_bot/strategies/vectorized.py
+
+"""
+Evaluación vectorizada de estrategias sobre todos los prefijos de un historial.
+
+Los historiales se codifican como arrays int8 (P=0, B=1, E=2, igual que en
+``strategies.state``). Cada función retorna dos arrays de la misma longitud
+que el historial: en la posición ``i`` la señal y la confianza que daría la
+estrategia escalar con ``history[:i + 1]``.
+
+Las señales se codifican con el mismo código del lado recomendado
+(JUGADOR=0, BANCA=1, EMPATE=2) y ``SIN_SENAL`` (-1) cuando no hay señal.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from baccarat_bot.strategies.state import CODIGOS
+
+SIN_SENAL = -1
+SENALES = {0: 'JUGADOR', 1: 'BANCA', 2: 'EMPATE'}
+
+P, B, E = CODIGOS['P'], CODIGOS['B'], CODIGOS['E']
+
+_ASCII_A_CODIGO = np.full(256, -1, dtype=np.int8)
+for _simbolo, _codigo in CODIGOS.items():
+    _ASCII_A_CODIGO[ord(_simbolo)] = _codigo
+
+# Señal de la estrategia de racha según el valor de la racha: contra B/P, a favor de E
+_CONTRA_RACHA = np.array([1, 0, 2], dtype=np.int8)
+
+PrefixResult = Tuple[np.ndarray, np.ndarray]
+
+
+def encode_history(history: Sequence[str]) -> np.ndarray:
+    """
+    Codifica una lista de resultados ('B', 'P', 'E') como array int8.
+
+    Raises:
+        ValueError: Si algún resultado no es 'B', 'P' o 'E'.
+    """
+    joined = ''.join(history)
+    raw = np.frombuffer(joined.encode('ascii', 'replace'), dtype=np.uint8)
+    encoded = _ASCII_A_CODIGO[raw]
+    if len(joined) != len(history) or (encoded < 0).any():
+        raise ValueError("El historial solo puede contener 'B', 'P' o 'E'")
+    return encoded
+
+
+def decode_signals(signals: np.ndarray) -> List[Optional[str]]:
+    """Convierte un array de señales codificadas a 'BANCA'/'JUGADOR'/'EMPATE'/None."""
+    return [SENALES.get(int(s)) for s in signals]
+
+
+def window_counts(encoded: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Conteos (banca, jugador, empate) en la ventana que termina en cada posición.
+
+    Usa sumas acumuladas, así que el coste es O(n) independiente de la ventana.
+    """
+    n = len(encoded)
+    end = np.arange(1, n + 1)
+    start = np.maximum(end - window, 0)
+    counts = []
+    for code in (B, P, E):
+        cumulative = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(encoded == code, out=cumulative[1:])
+        counts.append(cumulative[end] - cumulative[start])
+    return counts[0], counts[1], counts[2]
+
+
+def run_lengths(encoded: np.ndarray) -> np.ndarray:
+    """Longitud de la racha que termina en cada posición (codificación run-length)."""
+    n = len(encoded)
+    index = np.arange(n)
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = encoded[1:] != encoded[:-1]
+    run_start = np.maximum.accumulate(np.where(starts, index, 0))
+    return index - run_start + 1
+
+
+def alternation_lengths(encoded: np.ndarray) -> np.ndarray:
+    """Longitud de la alternancia B/P sin empates que termina en cada posición."""
+    n = len(encoded)
+    index = np.arange(n)
+    is_tie = encoded == E
+    breaks = np.ones(n, dtype=bool)
+    breaks[1:] = is_tie[1:] | is_tie[:-1] | (encoded[1:] == encoded[:-1])
+    segment_start = np.maximum.accumulate(np.where(breaks, index, 0))
+    return np.where(is_tie, 0, index - segment_start + 1)
+
+
+def _empty(n: int) -> PrefixResult:
+    return np.full(n, SIN_SENAL, dtype=np.int8), np.zeros(n, dtype=np.int32)
+
+
+def streak_prefixes(encoded: np.ndarray, streak_length: int) -> PrefixResult:
+    """Equivalente vectorizado de StreakStrategy."""
+    signals, confidences = _empty(len(encoded))
+    runs = run_lengths(encoded)
+    active = runs >= streak_length
+    signals[active] = _CONTRA_RACHA[encoded[active]]
+    confidences[active] = np.minimum(70 + (runs[active] - streak_length) * 5, 95)
+    return signals, confidences
+
+
+def conservative_streak_prefixes(encoded: np.ndarray, min_streak_length: int) -> PrefixResult:
+    """Equivalente vectorizado de ConservativeStreakStrategy."""
+    signals, confidences = _empty(len(encoded))
+    runs = run_lengths(encoded)
+    active = runs >= min_streak_length
+    # Contra la racha de B/P; las rachas de empates dan confianza sin señal
+    signals[active & (encoded == B)] = P
+    signals[active & (encoded == P)] = B
+    confidences[active] = np.minimum(85 + (runs[active] - min_streak_length) * 2, 95)
+    return signals, confidences
+
+
+def zigzag_prefixes(encoded: np.ndarray, pattern_length: int) -> PrefixResult:
+    """Equivalente vectorizado de ZigZagStrategy."""
+    signals, confidences = _empty(len(encoded))
+    active = alternation_lengths(encoded) >= max(pattern_length, 2)
+    active_index = np.flatnonzero(active)
+    # Se continúa el patrón: se apuesta al penúltimo resultado
+    signals[active_index] = encoded[active_index - 1]
+    confidences[active] = 75
+    return signals, confidences
+
+
+def tie_detection_prefixes(encoded: np.ndarray, observation_window: int) -> PrefixResult:
+    """Equivalente vectorizado de TieDetectionStrategy."""
+    n = len(encoded)
+    signals, confidences = _empty(n)
+    ties = window_counts(encoded, observation_window)[2]
+    is_tie = encoded == E
+    recent_tie = is_tie.copy()
+    recent_tie[1:] |= is_tie[:-1]
+
+    valid = np.arange(1, n + 1) >= observation_window
+    single = valid & (ties == 1) & recent_tie
+    signals[valid & (ties >= 2) | single] = E
+    confidences[valid & (ties >= 3)] = 75
+    confidences[valid & (ties == 2)] = 65
+    confidences[single] = 50
+    return signals, confidences
+
+
+def trend_prefixes(encoded: np.ndarray, short_window: int, long_window: int) -> PrefixResult:
+    """Equivalente vectorizado de TrendAnalysisStrategy."""
+    n = len(encoded)
+    signals, confidences = _empty(n)
+    short_b, short_p, _ = window_counts(encoded, short_window)
+    long_b, long_p, _ = window_counts(encoded, long_window)
+
+    short_trend = np.sign(short_b - short_p)
+    long_trend = np.sign(long_b - long_p)
+    valid = np.arange(1, n + 1) >= long_window
+    active = valid & (short_trend == long_trend) & (short_trend != 0)
+
+    short_diff = np.abs(short_b - short_p) / short_window * 100
+    long_diff = np.abs(long_b - long_p) / long_window * 100
+    confidence = np.minimum(70 + ((short_diff + long_diff) / 2).astype(np.int64), 85)
+
+    signals[active] = np.where(short_trend[active] > 0, B, P)
+    confidences[active] = confidence[active]
+    return signals, confidences
+
+
+def dominance_prefixes(encoded: np.ndarray, window_size: int,
+                       dominance_threshold: float) -> PrefixResult:
+    """Equivalente vectorizado de DominanceStrategy."""
+    n = len(encoded)
+    signals, confidences = _empty(n)
+    b_count, p_count, _ = window_counts(encoded, window_size)
+    total = b_count + p_count
+    valid = (np.arange(1, n + 1) >= window_size) & (total >= window_size * 0.8) & (total > 0)
+
+    safe_total = np.where(total > 0, total, 1)
+    b_ratio = b_count / safe_total
+    p_ratio = p_count / safe_total
+    banker = valid & (b_ratio >= dominance_threshold)
+    player = valid & ~banker & (p_ratio >= dominance_threshold)
+    active = banker | player
+
+    max_ratio = np.maximum(b_ratio, p_ratio)
+    confidence = np.minimum(80 + ((max_ratio - dominance_threshold) * 100).astype(np.int64), 90)
+
+    signals[banker] = B
+    signals[player] = P
+    confidences[active] = confidence[active]
+    return signals, confidences
+
+
+def statistical_edge_prefixes(encoded: np.ndarray, min_sample_size: int,
+                              deviation_threshold: float) -> PrefixResult:
+    """Equivalente vectorizado de StatisticalEdgeStrategy."""
+    n = len(encoded)
+    signals, confidences = _empty(n)
+    b_count, p_count, _ = window_counts(encoded, min_sample_size)
+    total = b_count + p_count
+    valid = (np.arange(1, n + 1) >= min_sample_size) & (total >= min_sample_size * 0.8) & (total > 0)
+
+    safe_total = np.where(total > 0, total, 1)
+    b_ratio = b_count / safe_total
+    p_ratio = p_count / safe_total
+    b_deviation = np.abs(b_ratio - 0.5068)
+    p_deviation = np.abs(p_ratio - 0.4932)
+
+    by_banker = valid & (b_deviation > deviation_threshold)
+    by_player = valid & ~by_banker & (p_deviation > deviation_threshold)
+    # Se apuesta hacia el equilibrio estadístico
+    signals[by_banker] = np.where(b_ratio[by_banker] > 0.5068, P, B)
+    signals[by_player] = np.where(p_ratio[by_player] > 0.4932, B, P)
+
+    max_deviation = np.maximum(b_deviation, p_deviation)
+    active = valid & (max_deviation > deviation_threshold)
+    confidence = 70 + np.minimum((max_deviation * 100).astype(np.int64), 15)
+    confidences[active] = confidence[active]
+    return signals, confidences
+
+
+def _group_ranks(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Para cada posición: cuántas posiciones anteriores tienen la misma clave
+    y la suma de ``values`` en esas posiciones.
+    """
+    n = len(keys)
+    index = np.arange(n)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    group_start = np.maximum.accumulate(np.where(starts, index, 0))
+
+    sorted_values = values[order]
+    exclusive = np.cumsum(sorted_values) - sorted_values
+    ranks = np.empty(n, dtype=np.int64)
+    sums = np.empty(n, dtype=np.int64)
+    ranks[order] = index - group_start
+    sums[order] = exclusive - exclusive[group_start]
+    return ranks, sums
+
+
+def confirmed_pattern_prefixes(encoded: np.ndarray, pattern_length: int) -> PrefixResult:
+    """
+    Equivalente vectorizado de ConfirmedPatternStrategy.
+
+    Cada patrón de longitud k del historial sin empates se empaqueta en un
+    entero; agrupando las posiciones por patrón se obtienen, para cada
+    prefijo, las repeticiones previas del último patrón y lo que vino
+    después de ellas (sin la transición hacia el resultado más reciente).
+    """
+    n = len(encoded)
+    k = pattern_length
+    signals, confidences = _empty(n)
+    clean_mask = encoded != E
+    clean = encoded[clean_mask].astype(np.int64)
+    m = len(clean)
+    if k < 1 or m < k * 3:
+        return signals, confidences
+
+    # Patrón que termina en cada posición limpia j >= k - 1
+    grams = np.zeros(m - k + 1, dtype=np.int64)
+    for shift in range(k):
+        grams |= clean[k - 1 - shift:m - shift] << shift
+
+    # Sucesor de cada patrón (banca=1); el último aún no tiene sucesor
+    next_banker = np.zeros(len(grams), dtype=np.int64)
+    next_banker[:-1] = clean[k:] == B
+
+    pattern_count, banker_before = _group_ranks(grams, next_banker)
+
+    # Se excluye la transición hacia el resultado más reciente
+    repeated = np.zeros(len(grams), dtype=np.int64)
+    repeated[1:] = grams[1:] == grams[:-1]
+    banker_last = np.zeros(len(grams), dtype=np.int64)
+    banker_last[1:] = next_banker[:-1]
+    successors = pattern_count - repeated
+    banker = banker_before - repeated * banker_last
+    player = successors - banker
+
+    clean_signals = np.full(m, SIN_SENAL, dtype=np.int8)
+    clean_confidences = np.zeros(m, dtype=np.int32)
+    confirmed = pattern_count >= 2
+    confirmed[:k * 3 - k] = False  # Se requieren al menos 3k resultados limpios
+    offset = k - 1
+    clean_confidences[offset:][confirmed] = np.minimum(80 + (pattern_count[confirmed] - 2) * 5, 90)
+    with_signal = confirmed & (successors > 0)
+    clean_signals[offset:][with_signal] = np.where(banker[with_signal] >= player[with_signal], B, P)
+
+    clean_length = np.cumsum(clean_mask)
+    valid = clean_length >= k * 3
+    position = clean_length[valid] - 1
+    signals[valid] = clean_signals[position]
+    confidences[valid] = clean_confidences[position]
+    return signals, confidences
+
+
+def consensus_prefixes(votes: Sequence[PrefixResult], min_consensus: int,
+                       min_history: int = 20) -> PrefixResult:
+    """
+    Equivalente vectorizado de ConsensusStrategy.
+
+    Args:
+        votes: Resultado de analyze_prefixes de cada sub-estrategia, en el
+            mismo orden que ConsensusStrategy.strategies
+        min_consensus: Votos mínimos para alcanzar consenso
+        min_history: Historial mínimo para evaluar
+    """
+    n = len(votes[0][0]) if votes else 0
+    signals, confidences = _empty(n)
+    if n == 0:
+        return signals, confidences
+
+    # Votos, suma de confianzas y primera estrategia que votó cada resultado
+    never = len(votes)
+    counts = np.zeros((3, n), dtype=np.int64)
+    sums = np.zeros((3, n), dtype=np.int64)
+    first = np.full((3, n), never, dtype=np.int64)
+    for position, (signal, confidence) in enumerate(votes):
+        voting = (signal >= 0) & (confidence >= 70)
+        for code in (P, B, E):
+            vote = voting & (signal == code)
+            counts[code] += vote
+            sums[code] += np.where(vote, confidence, 0)
+            first[code] = np.where(vote & (first[code] == never), position, first[code])
+
+    average = sums / np.maximum(counts, 1)
+    reached = (counts >= min_consensus) & (counts > 0)
+    valid = np.arange(1, n + 1) >= min_history
+    columns = np.arange(n)
+
+    # Señal: el primer resultado (en orden de votación) con consenso y media >= 75
+    candidate = reached & (average >= 75)
+    order = np.where(candidate, first, never + 1)
+    chosen = np.argmin(order, axis=0)
+    with_signal = valid & candidate[chosen, columns]
+    signals[with_signal] = chosen[with_signal]
+
+    # Confianza: el resultado con consenso y más votos (el primero si empatan)
+    order = np.where(reached, -counts * (never + 1) + first, never + 1)
+    chosen = np.argmin(order, axis=0)
+    with_confidence = valid & reached[chosen, columns]
+    chosen_average = average[chosen, columns]
+    bonus = (counts[chosen, columns] - min_consensus) * 2
+    confidence = np.minimum(chosen_average + bonus, 98).astype(np.int64)
+    confidences[with_confidence] = confidence[with_confidence]
+    return signals, confidences
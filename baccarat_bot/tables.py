@@ -3,6 +3,8 @@
 # Configuración de la única mesa a monitorear: XXXTreme Lightning Baccarat
 # URL: https://col.1xbet.com/es/casino/game/97446/xxxtreme-lightning-baccarat
 
+from baccarat_bot.utils.history_buffer import HistoryBuffer
+
 BASE_URL = "https://col.1xbet.com/es/casino/game/97446/xxxtreme-lightning-baccarat"
 GAME_ID = "97446"
 GAME_SLUG = "xxxtreme-lightning-baccarat"
@@ -12,6 +14,9 @@ MESA_NOMBRES = [
     "XXXTreme Lightning Baccarat"
 ]
 
+# Rondas conservadas en memoria por mesa (1 byte por ronda)
+CAPACIDAD_HISTORIAL = 5000
+
 def generar_slug(nombre_mesa):
     """Genera un slug simple para la URL a partir del nombre de la mesa."""
     slug = nombre_mesa.lower().replace(" ", "-").replace("á", "a").replace("é", "e").replace("í", "i").replace("ó", "o").replace("ú", "u")
@@ -26,7 +31,7 @@ def inicializar_mesas():
             "url": BASE_URL,
             "game_id": GAME_ID,  # ID del juego para scraping real
             "game_slug": GAME_SLUG,  # Slug del juego para la URL
-            "historial_resultados": [],
+            "historial_resultados": HistoryBuffer(CAPACIDAD_HISTORIAL),
             "ultima_senal_enviada": None,
             "ultima_senal_tiempo": None
         }
@@ -0,0 +1,21 @@
+# baccarat_bot/utils/cache_dir.py
+
+"""
+Directorio de caché en disco del bot (tablas de decisión, modelos ML).
+
+Se usa un directorio fijo por usuario (``$XDG_CACHE_HOME/baccarat_bot`` o
+``~/.cache/baccarat_bot``) en lugar de una ruta relativa al directorio de
+trabajo, para que la caché no dependa de desde dónde se lance el proceso.
+``BACCARAT_CACHE_DIR`` permite cambiar la base.
+"""
+
+import os
+
+
+def directorio_cache(*partes: str) -> str:
+    """Ruta dentro del directorio de caché del usuario (no la crea)."""
+    base = os.getenv('BACCARAT_CACHE_DIR') or os.path.join(
+        os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+        'baccarat_bot'
+    )
+    return os.path.join(base, *partes)
@@ -0,0 +1,183 @@
+# baccarat_bot/utils/history_buffer.py
+
+"""
+Buffer circular compacto para el historial de resultados de una mesa.
+
+Cada resultado ocupa un byte (P=0, B=1, E=2, la misma codificación que
+``strategies.state``). Los datos se escriben dos veces en un bytearray de
+tamaño 2 × capacidad, de modo que las últimas N rondas siempre forman un
+bloque contiguo: las ventanas se pueden exponer como ``memoryview`` o como
+array de NumPy sin copiar nada, y al llenarse el buffer no hay que recortar
+ni re-asignar la lista.
+
+La clase también se comporta como una lista de 'B'/'P'/'E' (``len``,
+índices, slices, iteración, ``count``, comparación) para que el código
+existente pueda seguir usándola sin cambios.
+"""
+
+from typing import Hashable, Iterable, Iterator, List, Union
+
+from baccarat_bot.strategies.state import CODIGOS, SIMBOLOS
+
+_CODIGO_A_SIMBOLO = bytes.maketrans(bytes(range(len(SIMBOLOS))), SIMBOLOS.encode('ascii'))
+
+
+class HistoryBuffer:
+    """Historial de capacidad fija con vistas de ventana sin copia."""
+
+    def __init__(self, capacity: int = 5000, initial: Iterable[str] = ()):
+        """
+        Args:
+            capacity: Número máximo de rondas conservadas.
+            initial: Resultados iniciales opcionales.
+        """
+        if capacity < 1:
+            raise ValueError("La capacidad del historial debe ser positiva")
+        self.capacity = capacity
+        self._data = bytearray(2 * capacity)
+        self._head = 0      # Próxima posición de escritura en [0, capacity)
+        self._size = 0
+        self.version = 0    # Total de resultados agregados (monótono)
+        self.last_round_id: Hashable = None  # Identidad de la última ronda agregada
+        self.extend(initial)
+
+    # --- Escritura ---
+
+    def append(self, result: str) -> None:
+        """
+        Agrega un resultado, descartando el más antiguo si el buffer está lleno.
+
+        Raises:
+            ValueError: Si el resultado no es 'B', 'P' o 'E'.
+        """
+        code = CODIGOS.get(result)
+        if code is None:
+            raise ValueError(
+                f"Resultado inválido: {result}. Debe ser 'B', 'P' o 'E'."
+            )
+        head = self._head
+        self._data[head] = code
+        self._data[head + self.capacity] = code
+        self._head = head + 1 if head + 1 < self.capacity else 0
+        if self._size < self.capacity:
+            self._size += 1
+        self.version += 1
+
+    def append_round(self, result: str, round_id: Hashable = None) -> bool:
+        """
+        Agrega el resultado de una ronda salvo que ya se haya agregado.
+
+        Al sondear la mesa varias veces durante la misma ronda la fuente
+        devuelve el mismo resultado; con la identidad de la ronda se evita
+        duplicarlo (y que la versión cambie sin una ronda nueva).
+
+        Args:
+            result: Resultado de la ronda ('B', 'P', 'E').
+            round_id: Identidad de la ronda según la fuente; None si la
+                fuente no la conoce (cada llamada cuenta como ronda nueva).
+
+        Returns:
+            True si se agregó el resultado.
+        """
+        if round_id is not None and round_id == self.last_round_id:
+            return False
+        self.append(result)
+        self.last_round_id = round_id
+        return True
+
+    def extend(self, results: Iterable[str]) -> None:
+        """Agrega varios resultados en orden."""
+        for result in results:
+            self.append(result)
+
+    def clear(self) -> None:
+        """Vacía el historial (la versión sigue creciendo)."""
+        self._head = 0
+        self._size = 0
+        self.last_round_id = None
+        self.version += 1
+
+    # --- Vistas sin copia ---
+
+    def _bounds(self, n: int = None):
+        """Posiciones [inicio, fin) en _data de las últimas n rondas."""
+        if n is None or n > self._size:
+            n = self._size
+        end = self._head + self.capacity
+        return end - max(n, 0), end
+
+    def window(self, n: int = None) -> memoryview:
+        """
+        Vista (sin copia) de los códigos de las últimas n rondas.
+
+        La vista comparte memoria con el buffer: deja de ser válida en
+        cuanto se agregan nuevos resultados.
+        """
+        start, end = self._bounds(n)
+        return memoryview(self._data)[start:end]
+
+    def as_numpy(self, n: int = None):
+        """Array int8 (sin copia) de los códigos de las últimas n rondas."""
+        import numpy as np
+
+        start, end = self._bounds(n)
+        return np.frombuffer(self._data, dtype=np.int8, count=end - start, offset=start)
+
+    def tail(self, n: int = None) -> str:
+        """Últimas n rondas como texto, p. ej. 'BPPBE'."""
+        start, end = self._bounds(n)
+        return self._data[start:end].translate(_CODIGO_A_SIMBOLO).decode('ascii')
+
+    # --- Fachada compatible con list ---
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[str, List[str]]:
+        start, end = self._bounds()
+        if isinstance(key, slice):
+            first, last, step = key.indices(self._size)
+            if step == 1:
+                if last <= first:
+                    return []
+                chunk = self._data[start + first:start + last]
+                return list(chunk.translate(_CODIGO_A_SIMBOLO).decode('ascii'))
+            return [SIMBOLOS[self._data[start + i]] for i in range(first, last, step)]
+        if key < 0:
+            key += self._size
+        if not 0 <= key < self._size:
+            raise IndexError("Índice fuera del historial")
+        return SIMBOLOS[self._data[start + key]]
+
+    def __iter__(self) -> Iterator[str]:
+        start, end = self._bounds()
+        data = self._data
+        for i in range(start, end):
+            yield SIMBOLOS[data[i]]
+
+    def __contains__(self, result: object) -> bool:
+        code = CODIGOS.get(result) if isinstance(result, str) else None
+        return code is not None and code in self.window()
+
+    def count(self, result: str) -> int:
+        """Número de apariciones de un resultado en el historial."""
+        code = CODIGOS.get(result)
+        if code is None:
+            return 0
+        start, end = self._bounds()
+        return self._data.count(code, start, end)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, HistoryBuffer):
+            return self.window() == other.window()
+        if isinstance(other, (list, tuple)):
+            return len(other) == self._size and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def to_list(self) -> List[str]:
+        """Copia del historial como lista de 'B'/'P'/'E'."""
+        return list(self.tail())
+
+    def __repr__(self) -> str:
+        prefix = '...' if self._size > 20 else ''
+        return f"HistoryBuffer(capacity={self.capacity}, len={self._size}, '{prefix}{self.tail(20)}')"
@@ -0,0 +1,118 @@
+# baccarat_bot/utils/result_cache.py
+
+"""
+Caché de resultados de análisis por mesa.
+
+Las estrategias, el consenso y el predictor ML solo dependen del historial
+de la mesa, así que mientras no se agregue una nueva ronda su resultado no
+cambia. ``ResultCache`` guarda el último valor calculado para cada par
+(mesa, nombre) junto con la versión del historial con que se calculó, y lo
+reutiliza hasta que la versión cambia. El número de entradas está acotado
+con desalojo LRU.
+"""
+
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+_VACIO = object()
+
+
+def version_historial(historial: Sequence[str]) -> Hashable:
+    """
+    Versión de un historial para usar como clave de caché.
+
+    Un HistoryBuffer expone un contador monótono (O(1)); para listas se usa
+    un hash del contenido, que cambia en cuanto se agrega una ronda.
+    """
+    version = getattr(historial, 'version', None)
+    if version is not None:
+        return version
+    return len(historial), hash(''.join(historial))
+
+
+class ResultCache:
+    """Caché LRU de resultados por mesa, invalidada por versión del historial."""
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Args:
+            max_entries: Máximo de pares (mesa, nombre) conservados.
+        """
+        if max_entries < 1:
+            raise ValueError("La caché debe admitir al menos una entrada")
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[Hashable, Any]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self.lock = threading.RLock()
+
+    def get(self, mesa: str, nombre: str, version: Hashable, default: Any = None) -> Any:
+        """Valor guardado para esa versión del historial (o ``default``)."""
+        with self.lock:
+            entry = self._entries.get((mesa, nombre))
+            if entry is None or entry[0] != version:
+                return default
+            self._entries.move_to_end((mesa, nombre))
+            return entry[1]
+
+    def put(self, mesa: str, nombre: str, version: Hashable, value: Any) -> None:
+        """Guarda un valor, reemplazando el de versiones anteriores."""
+        with self.lock:
+            key = (mesa, nombre)
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, mesa: str, nombre: str, version: Hashable,
+                       compute: Callable[[], Any]) -> Any:
+        """
+        Retorna el valor cacheado para (mesa, nombre, versión) o lo calcula.
+
+        ``None`` también se cachea: "sin señal" es un resultado válido.
+        """
+        with self.lock:
+            value = self.get(mesa, nombre, version, _VACIO)
+            if value is not _VACIO:
+                self.hits += 1
+                self.counters[nombre]['hits'] += 1
+                return value
+            self.misses += 1
+            self.counters[nombre]['misses'] += 1
+
+        value = compute()
+        self.put(mesa, nombre, version, value)
+        return value
+
+    def invalidate(self, mesa: Optional[str] = None) -> None:
+        """Descarta las entradas de una mesa (o todas)."""
+        with self.lock:
+            if mesa is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == mesa]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de aciertos y fallos (global y por nombre)."""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total * 100, 2) if total else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'by_name': {nombre: dict(c) for nombre, c in self.counters.items()}
+            }
+
+
+# Instancia global
+result_cache = ResultCache()
@@ -6,16 +6,18 @@ Proporciona modelos de datos tipados y validados para garantizar la integridad.
 """
 
 from pydantic import BaseModel, Field, validator, HttpUrl
-from typing import List, Optional, Literal
+from typing import List, Optional, Literal, Union
 from datetime import datetime
 
+from baccarat_bot.utils.history_buffer import HistoryBuffer
+
 
 class MesaData(BaseModel):
     """Modelo de validación para datos de mesa"""
     nombre: str = Field(..., min_length=1, max_length=100)
     url: str = Field(..., description="URL de la mesa")
     game_id: str = Field(..., pattern=r'^\d+$', description="ID numérico del juego")
-    historial_resultados: List[str] = Field(default_factory=list)
+    historial_resultados: Union[HistoryBuffer, List[str]] = Field(default_factory=list)
     
     @validator('url')
     def validate_url(cls, v):
@@ -29,6 +31,9 @@ class MesaData(BaseModel):
     @validator('historial_resultados')
     def validate_historial(cls, v):
         """Valida que el historial contenga solo valores válidos"""
+        if isinstance(v, HistoryBuffer):
+            # El buffer valida cada resultado al agregarlo; se usa sin copiar
+            return v
         valid_results = {'B', 'P', 'E'}
         for result in v:
             if result not in valid_results:
@@ -37,6 +42,7 @@ class MesaData(BaseModel):
     
     class Config:
         validate_assignment = True
+        arbitrary_types_allowed = True
 
 
 class ResultadoData(BaseModel):
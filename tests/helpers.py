@@ -0,0 +1,46 @@
+# tests/helpers.py
+
+"""
+Utilidades compartidas por los tests.
+"""
+
+import random
+
+from baccarat_bot.strategies.advanced_strategies import (
+    StreakStrategy,
+    ZigZagStrategy,
+    MartingaleAdaptedStrategy,
+    FibonacciStrategy,
+    TrendAnalysisStrategy,
+    TieDetectionStrategy
+)
+from baccarat_bot.strategies.safe_strategies import (
+    ConservativeStreakStrategy,
+    ConfirmedPatternStrategy,
+    StatisticalEdgeStrategy,
+    ConsensusStrategy,
+    DominanceStrategy
+)
+
+
+def random_history(seed, length, weights=(0.45, 0.45, 0.10)):
+    """Historial reproducible de resultados ('B', 'P', 'E'); weights=None es uniforme."""
+    rng = random.Random(seed)
+    return rng.choices(['B', 'P', 'E'], weights=weights, k=length)
+
+
+# Una instancia de cada estrategia, para comparar estado incremental y listas
+STRATEGIES = [
+    StreakStrategy(3),
+    StreakStrategy(4),
+    ZigZagStrategy(4),
+    MartingaleAdaptedStrategy(),
+    FibonacciStrategy(),
+    TrendAnalysisStrategy(5, 15),
+    TieDetectionStrategy(5),
+    ConservativeStreakStrategy(5),
+    ConfirmedPatternStrategy(3),
+    StatisticalEdgeStrategy(30, 0.15),
+    DominanceStrategy(20, 0.70),
+    ConsensusStrategy(),
+]
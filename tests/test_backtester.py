@@ -0,0 +1,78 @@
+# tests/test_backtester.py
+
+"""
+Tests para el backtest en streaming (StreamingBacktester).
+"""
+
+import pytest
+from baccarat_bot.simulations.backtester import StreamingBacktester, generate_streaming_report
+from baccarat_bot.simulations.simulator import (
+    BaccaratSimulator,
+    StrategyTester,
+    decodificar_codigos,
+    generate_simulation_report
+)
+from baccarat_bot.strategies import safe_strategies
+from baccarat_bot.strategies.state import TableState
+from tests.helpers import random_history
+
+
+class TestStreamingBacktester:
+    """Tests: mismo reporte que StrategyTester con memoria acotada"""
+
+    @pytest.mark.parametrize('seed', [0, 1])
+    def test_matches_strategy_tester(self, seed):
+        history = random_history(seed, 600)
+        tester = StrategyTester(safe_strategies)
+        tester.test_strategies(history, 'Mesa 1')
+        backtester = StreamingBacktester('Mesa 1', max_details=None)
+        backtester.feed(history)
+        assert backtester.get_report() == tester.get_report()
+        assert backtester.get_detailed_results() == tester.get_detailed_results()
+
+    def test_signals_scored_against_next_round(self):
+        backtester = StreamingBacktester(max_details=None)
+        backtester.feed(['B'] * 12 + ['P'])
+        details = backtester.get_detailed_results()
+        # Racha larga de Banca: las estrategias apuestan a Jugador
+        assert details and details[-1]['signal'] == 'JUGADOR'
+        assert details[-1]['actual_result'] == 'P' and details[-1]['is_correct']
+
+    def test_bounded_details(self):
+        codes = BaccaratSimulator(seed=2).simulate_codes(3000)
+        limited = StreamingBacktester(max_details=50)
+        limited.feed_codes(codes)
+        full = StreamingBacktester(max_details=None)
+        full.feed(decodificar_codigos(codes))
+        assert limited.get_report() == full.get_report()
+        assert limited.get_detailed_results() == full.get_detailed_results()[-50:]
+        assert len(limited.state.recent()) <= 50
+
+    def test_report_schema(self):
+        legacy = generate_simulation_report(200, 'Mesa 1')
+        streaming = generate_streaming_report(5000, 'Mesa 1', seed=3, chunk_size=999)
+        assert streaming.keys() == legacy.keys()
+        assert streaming['simulation_details'].keys() == legacy['simulation_details'].keys()
+        assert streaming['strategy_report'].keys() == legacy['strategy_report'].keys()
+        assert streaming['strategy_report']['total_rounds'] == 5000
+        assert sum(streaming['baccarat_stats'].values()) == 5000
+        assert len(streaming['detailed_results']) <= 1000
+
+    def test_state_memoizes_evaluations(self):
+        calls = []
+
+        class Counting(safe_strategies.DominanceStrategy):
+            def evaluate_state(self, state):
+                calls.append(len(state))
+                return super().evaluate_state(state)
+
+        strategy = Counting()
+        state = TableState(strategy.required_windows())
+        for result in random_history(4, 30):
+            state.push(result)
+            assert state.evaluation(strategy) == state.evaluation(strategy)
+        assert calls == list(range(1, 31))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
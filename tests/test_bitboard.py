@@ -0,0 +1,89 @@
+# tests/test_bitboard.py
+
+"""
+Tests para el historial en bitboards y su equivalencia con el análisis
+sobre listas.
+"""
+
+import pytest
+from baccarat_bot.strategies.bitboard import BitboardHistory
+from baccarat_bot.strategies.state import HistoryFeatures
+from tests.helpers import STRATEGIES, random_history
+
+
+WEIGHTS = [(0.45, 0.45, 0.10), (0.7, 0.2, 0.1), (0.3, 0.3, 0.4)]
+
+
+class TestBitboardHistory:
+    """Tests para los conteos, rachas y alternancias por máscaras"""
+
+    @pytest.mark.parametrize('seed', range(3))
+    def test_aggregates_match_list(self, seed):
+        history = random_history(seed, 150, WEIGHTS[seed])
+        board = BitboardHistory(capacity=64)
+        for i, result in enumerate(history):
+            board.push(result)
+            prefix = history[:i + 1]
+            features = HistoryFeatures(prefix)
+            for window in (1, 3, 5, 20, 64):
+                assert board.window_counts(window) == features.window_counts(window)
+            assert board.alternation_length == features.alternation_length
+            assert board.window_code(10) == features.window_code(10)
+            value, length = features.streak
+            assert board.streak == (value, min(length, 64))
+
+    def test_streak_and_alternation(self):
+        """Test: Racha y alternancia se leen de las máscaras"""
+        board = BitboardHistory()
+        assert board.streak == (None, 0)
+        board.extend(['E', 'B', 'P', 'B', 'P', 'P'])
+        assert board.streak == ('P', 2)
+        assert board.alternation_length == 1
+        board.push('B')
+        assert board.alternation_length == 2
+        board.push('E')
+        assert board.alternation_length == 0
+        assert board.ties_total == 2
+
+    def test_from_history_matches_push(self):
+        """Test: La construcción de una vez equivale a agregar uno a uno"""
+        history = random_history(7, 300)
+        built = BitboardHistory.from_history(history, capacity=100, pattern_lengths=(3,))
+        pushed = BitboardHistory(capacity=100, pattern_lengths=(3,))
+        pushed.extend(history)
+        assert (built.banker, built.player, built.tie) == (pushed.banker, pushed.player, pushed.tie)
+        assert built.window_code(16) == pushed.window_code(16)
+        assert built.recent() == pushed.recent()
+        assert (len(built), built.ties_total) == (len(pushed), pushed.ties_total)
+        assert built.pattern_index.pattern_count(3) == pushed.pattern_index.pattern_count(3)
+
+    def test_invalid_result(self):
+        """Test: Rechaza resultados inválidos"""
+        with pytest.raises(ValueError):
+            BitboardHistory().push('X')
+        with pytest.raises(ValueError):
+            BitboardHistory.from_history(['B', 'X'])
+
+    def test_window_beyond_capacity(self):
+        """Test: Las ventanas mayores que la capacidad no se pueden consultar"""
+        board = BitboardHistory(windows=(300,))
+        assert board.capacity == 300
+        with pytest.raises(KeyError):
+            board.window_counts(301)
+
+    @pytest.mark.parametrize('seed', range(3))
+    def test_strategies_consume_bitboard(self, seed):
+        history = random_history(seed, 80, WEIGHTS[seed])
+        for strategy in STRATEGIES:
+            board = BitboardHistory(pattern_lengths=strategy.required_pattern_lengths())
+            for i, result in enumerate(history):
+                board.push(result)
+                prefix = history[:i + 1]
+                assert strategy.evaluate_state(board) == (
+                    strategy.analyze(prefix),
+                    strategy.get_confidence_level(prefix)
+                ), f"{strategy.name} difiere en la ronda {i}"
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,132 @@
+# tests/test_decision_tables.py
+
+"""
+Tests para las tablas de decisión precompiladas de estrategias de ventana fija.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from baccarat_bot.strategies import decision_tables
+from baccarat_bot.strategies.decision_tables import (
+    DecisionTable,
+    compile_decision_table,
+    table_key
+)
+from baccarat_bot.strategies.state import HistoryFeatures, TableState
+from baccarat_bot.strategies.advanced_strategies import (
+    StrategyManager,
+    StreakStrategy,
+    ZigZagStrategy,
+    MartingaleAdaptedStrategy,
+    FibonacciStrategy,
+    TieDetectionStrategy,
+    TrendAnalysisStrategy
+)
+from tests.helpers import random_history
+
+
+def fixed_window_strategies():
+    return [
+        StreakStrategy(3),
+        StreakStrategy(4),
+        ZigZagStrategy(4),
+        TieDetectionStrategy(5),
+        MartingaleAdaptedStrategy(),
+        FibonacciStrategy(),
+    ]
+
+
+class TestDecisionTables:
+    """Tests: la consulta a la tabla coincide con analyze/get_confidence_level"""
+
+    @pytest.mark.parametrize('seed', range(3))
+    def test_lookup_matches_list_analysis(self, seed, tmp_path):
+        weights = [(0.45, 0.45, 0.10), (0.7, 0.2, 0.1), (0.3, 0.3, 0.4)][seed]
+        history = random_history(seed, 300, weights)
+        for strategy in fixed_window_strategies():
+            assert compile_decision_table(strategy, str(tmp_path)) is not None
+            state = TableState(strategy.required_windows())
+            for i in range(len(history) + 1):
+                prefix = history[:i]
+                expected = (strategy.analyze(prefix), strategy.get_confidence_level(prefix))
+                assert strategy.evaluate_state(state) == expected, f"{strategy.name} en {i}"
+                assert strategy.evaluate_state(HistoryFeatures(prefix)) == expected
+                if i < len(history):
+                    state.push(history[i])
+
+    def test_disk_cache_roundtrip(self, tmp_path, monkeypatch):
+        """Test: La tabla se guarda y se vuelve a cargar desde disco"""
+        monkeypatch.setattr(decision_tables, '_tablas', {})
+        strategy = StreakStrategy(3)
+        built = compile_decision_table(strategy, str(tmp_path))
+        path = tmp_path / f"{table_key(strategy)}.npz"
+        assert path.exists()
+        loaded = DecisionTable.load(str(path))
+        assert loaded.window == built.window == 8
+        assert (loaded.signals == built.signals).all()
+        assert (loaded.confidences == built.confidences).all()
+
+    def test_key_depends_on_parameters(self):
+        """Test: Parámetros distintos usan tablas distintas"""
+        assert table_key(StreakStrategy(3)) != table_key(StreakStrategy(4))
+        assert table_key(StreakStrategy(3)) == table_key(StreakStrategy(3))
+
+    def test_key_depends_on_strategy_code(self, monkeypatch):
+        """Test: Cambiar el código de la estrategia invalida las tablas guardadas"""
+        before = table_key(StreakStrategy(3))
+        getsource = decision_tables.inspect.getsource
+
+        def edited(module):
+            return getsource(module) + '\n# cambio\n'
+
+        monkeypatch.setattr(decision_tables.inspect, 'getsource', edited)
+        decision_tables._huella_codigo.cache_clear()
+        try:
+            assert table_key(StreakStrategy(3)) != before
+        finally:
+            decision_tables._huella_codigo.cache_clear()
+
+    def test_untabulable_strategy(self, tmp_path):
+        """Test: Las estrategias que dependen de todo el historial no se compilan"""
+        strategy = TrendAnalysisStrategy(5, 15)
+        assert compile_decision_table(strategy, str(tmp_path)) is None
+        assert strategy.decision_table is None
+        assert os.listdir(tmp_path) == []
+
+    def test_import_does_not_write_to_cwd(self, tmp_path):
+        """Test: Importar las estrategias no compila ni escribe en el directorio actual"""
+        cache = tmp_path / 'cache'
+        env = dict(os.environ, BACCARAT_CACHE_DIR=str(cache))
+        env.pop('DECISION_TABLES_DIR', None)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+        code = (
+            "from baccarat_bot.strategies import advanced_strategies, safe_strategies, decision_tables\n"
+            "assert decision_tables._tablas == {}\n"
+            "print(decision_tables.DIRECTORIO_TABLAS)"
+        )
+        workdir = tmp_path / 'cwd'
+        workdir.mkdir()
+        output = subprocess.run([sys.executable, '-c', code], cwd=workdir, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        assert output.strip() == str(cache / 'decision_tables')
+        assert os.listdir(workdir) == []
+        assert not cache.exists()
+
+    def test_manager_compiles_on_first_analysis(self, monkeypatch):
+        """Test: El gestor compila sus tablas al analizar, no al crearse"""
+        compiled = []
+        monkeypatch.setattr('baccarat_bot.strategies.advanced_strategies.compile_decision_tables',
+                            lambda strategies: compiled.append(list(strategies)))
+        manager = StrategyManager()
+        assert compiled == []
+        manager.analyze_table('Mesa 1')
+        manager.analyze_table('Mesa 1')
+        assert len(compiled) == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
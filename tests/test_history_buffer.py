@@ -0,0 +1,89 @@
+# tests/test_history_buffer.py
+
+"""
+Tests para el buffer circular de historial (HistoryBuffer).
+"""
+
+import numpy as np
+import pytest
+from baccarat_bot.utils.history_buffer import HistoryBuffer
+from baccarat_bot.utils.validators import MesaData
+from baccarat_bot.ml_predictor import codificar_historial
+from baccarat_bot.strategies.safe_strategies import get_safest_signal
+from tests.helpers import random_history
+
+
+class TestHistoryBuffer:
+    """Tests para el almacenamiento y las vistas del buffer"""
+
+    def test_wraparound_keeps_latest(self):
+        """Test: Al llenarse conserva solo las últimas rondas"""
+        history = random_history(1, 23)
+        buffer = HistoryBuffer(capacity=10, initial=history)
+        assert len(buffer) == 10
+        assert buffer.to_list() == history[-10:]
+        assert buffer.version == 23
+
+    def test_list_facade(self):
+        """Test: Índices, slices, conteos e iteración como una lista"""
+        history = random_history(2, 37)
+        buffer = HistoryBuffer(capacity=16, initial=history)
+        expected = history[-16:]
+        assert buffer == expected
+        assert list(buffer) == expected
+        assert buffer[0] == expected[0]
+        assert buffer[-1] == expected[-1]
+        assert buffer[-5:] == expected[-5:]
+        assert buffer[3:9] == expected[3:9]
+        assert buffer[::-2] == expected[::-2]
+        assert buffer[5:2] == []
+        assert buffer.count('E') == expected.count('E')
+        assert ('E' in buffer) == ('E' in expected)
+        with pytest.raises(IndexError):
+            buffer[16]
+
+    def test_zero_copy_views(self):
+        """Test: window y as_numpy comparten memoria con el buffer"""
+        buffer = HistoryBuffer(capacity=8, initial='BPBPBPBPBE')
+        codes = buffer.as_numpy(4)
+        assert codes.tolist() == [1, 0, 1, 2]
+        assert np.shares_memory(codes, buffer.as_numpy())
+        assert bytes(buffer.window(3)) == bytes([0, 1, 2])
+        assert buffer.tail(4) == 'BPBE'
+
+    def test_invalid_result(self):
+        """Test: Rechaza resultados inválidos"""
+        buffer = HistoryBuffer(capacity=4)
+        with pytest.raises(ValueError):
+            buffer.append('X')
+        assert len(buffer) == 0
+
+    def test_append_round_skips_same_round(self):
+        """Test: Sondear la misma ronda no agrega el resultado otra vez"""
+        buffer = HistoryBuffer(capacity=10)
+        assert buffer.append_round('B', 'ronda-1')
+        assert not buffer.append_round('B', 'ronda-1')
+        assert buffer.append_round('B', 'ronda-2')
+        # Sin identidad cada llamada es una ronda nueva
+        assert buffer.append_round('P') and buffer.append_round('P')
+        assert buffer.to_list() == ['B', 'B', 'P', 'P']
+        assert buffer.version == 4
+
+    def test_consumers_accept_buffer(self):
+        """Test: Estrategias, ML y validadores leen el buffer directamente"""
+        history = random_history(3, 300)
+        buffer = HistoryBuffer(capacity=100, initial=history)
+        assert get_safest_signal(buffer) == get_safest_signal(history[-100:])
+        assert codificar_historial(buffer, 12).tolist() == codificar_historial(history, 12).tolist()
+
+        mesa = MesaData(
+            nombre="Mesa",
+            url="https://col.1xbet.com/es/casino/game/97408/",
+            game_id="97408",
+            historial_resultados=buffer
+        )
+        assert mesa.historial_resultados is buffer
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
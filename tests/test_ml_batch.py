@@ -0,0 +1,81 @@
+# tests/test_ml_batch.py
+
+"""
+Tests para la predicción ML por lote de varias mesas.
+"""
+
+import numpy as np
+import pytest
+from baccarat_bot import ml_integration
+from baccarat_bot.ml_pool import ModelPool
+from baccarat_bot.ml_predictor import BaccaratMLPredictor, codificar_historial
+from baccarat_bot.utils.result_cache import ResultCache
+from tests.helpers import random_history
+
+
+@pytest.fixture
+def pool(monkeypatch, tmp_path):
+    pool = ModelPool(directory=str(tmp_path))
+    monkeypatch.setattr(ml_integration, 'pool_modelos', pool)
+    return pool
+
+
+class TestPredictProbaWindows:
+    """Tests: el lote coincide con las predicciones de a una ventana"""
+
+    def test_matches_single_predictions(self):
+        predictor = BaccaratMLPredictor()
+        predictor.train(random_history(0, 600))
+        histories = [random_history(seed, 40) for seed in range(1, 30)]
+        windows = np.stack([codificar_historial(h, predictor.window) for h in histories])
+
+        single = BaccaratMLPredictor()
+        single.model, single.is_trained = predictor.model, True
+        single.lut = None
+        expected = [single.predict_proba_next(h) for h in histories]
+
+        probas = predictor.predict_proba_windows(windows)
+        assert np.allclose(probas, expected, atol=1e-6)
+        # Segunda pasada: todo sale de la tabla
+        misses = predictor.lut.misses
+        assert np.array_equal(predictor.predict_proba_windows(windows), probas)
+        assert predictor.lut.misses == misses
+
+
+class TestPredecirLote:
+    """Tests para predecir_ml_lote() y entrenar_y_predecir_ml_lote()"""
+
+    def test_batch_forest_models(self, monkeypatch, pool):
+        monkeypatch.setattr(ml_integration, 'ML_ONLINE', False)
+        histories = {f"Mesa {i}": random_history(i, 300) for i in range(3)}
+        for mesa, history in histories.items():
+            predictor = BaccaratMLPredictor()
+            predictor.train(history)
+            pool.put(mesa, predictor, ml_integration._config_modelo())
+        histories['Sin modelo'] = random_history(9, 300)
+
+        batch = ml_integration.predecir_ml_lote(histories)
+        assert batch['Sin modelo'] is None
+        for mesa, history in histories.items():
+            expected = ml_integration.obtener_prediccion_ml(history, mesa)
+            assert (batch[mesa][0] if batch[mesa] else None) == expected
+
+    def test_online_train_and_cache(self, monkeypatch, pool):
+        monkeypatch.setattr(ml_integration, 'ML_ONLINE', True)
+        cache = ResultCache()
+        histories = {f"Mesa {i}": random_history(i, 200) for i in range(3)}
+        first = ml_integration.entrenar_y_predecir_ml_lote(histories, cache=cache)
+        for mesa, history in histories.items():
+            predictor = pool.get(mesa, ml_integration._config_modelo(), create=False)
+            assert predictor.rounds_seen == 200
+            expected = predictor.predict_next(history)
+            assert (first[mesa][0] if first[mesa] else None) == expected
+
+        # Sin rondas nuevas se reutiliza la predicción sin volver a entrenar
+        monkeypatch.setattr(ml_integration, 'entrenar_ml_si_posible',
+                            lambda *args: pytest.fail("no debía entrenar"))
+        assert ml_integration.entrenar_y_predecir_ml_lote(histories, cache=cache) == first
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
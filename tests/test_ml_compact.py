@@ -0,0 +1,107 @@
+# tests/test_ml_compact.py
+
+"""
+Tests para la exportación del RandomForest a arrays (CompactForest).
+"""
+
+import os
+import pickle
+import random
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from baccarat_bot.ml_compact import CompactForest
+from baccarat_bot.ml_predictor import BaccaratMLPredictor
+from tests.helpers import random_history
+
+
+@pytest.fixture(scope='module')
+def trained():
+    history = random_history(0, 800)
+    predictor = BaccaratMLPredictor()
+    predictor.train(history)
+    assert predictor.is_trained
+    return predictor, history
+
+
+def all_windows(window, step=1):
+    codes = np.arange(0, 3 ** window, step, dtype=np.int64)
+    return ((codes[:, None] // 3 ** np.arange(window - 1, -1, -1)) % 3).astype(np.int8)
+
+
+class TestCompactForest:
+    """Tests: el bosque exportado reproduce exactamente a sklearn"""
+
+    def test_predict_proba_exact(self, trained):
+        predictor, _ = trained
+        forest = CompactForest.from_sklearn(predictor.model)
+        X = all_windows(predictor.window, step=37)
+        assert np.array_equal(forest.predict_proba(X), predictor.model.predict_proba(X))
+        # Una sola fila recorre todos los árboles en un bloque
+        for row in X[:20]:
+            assert np.array_equal(forest.predict_proba(row[None, :]),
+                                  predictor.model.predict_proba(row[None, :]))
+        assert np.array_equal(forest.predict(X), predictor.model.predict(X))
+
+    def test_missing_class(self):
+        """Test: Sin empates en el entrenamiento las clases siguen alineadas"""
+        history = random.Random(1).choices(['B', 'P'], k=400)
+        predictor = BaccaratMLPredictor()
+        predictor.train(history)
+        forest = CompactForest.from_sklearn(predictor.model)
+        X = all_windows(predictor.window, step=101)
+        assert list(forest.classes_) == [0, 1]
+        assert np.array_equal(forest.predict_proba(X), predictor.model.predict_proba(X))
+
+    def test_save_load_mmap(self, trained, tmp_path):
+        predictor, _ = trained
+        forest = CompactForest.from_sklearn(predictor.model)
+        path = str(tmp_path / 'forest.npz')
+        forest.save(path)
+        loaded = CompactForest.load(path)
+        assert isinstance(loaded.value, np.memmap)
+        assert loaded.digest() == forest.digest()
+        X = all_windows(predictor.window, step=53)
+        assert np.array_equal(loaded.predict_proba(X), forest.predict_proba(X))
+        # Al serializarlo se copian los datos mapeados
+        restored = pickle.loads(pickle.dumps(loaded))
+        assert type(restored.value) is np.ndarray
+        assert np.array_equal(restored.predict_proba(X), forest.predict_proba(X))
+
+    def test_predictor_save_compact(self, trained, tmp_path):
+        predictor, history = trained
+        expected = [predictor.predict_next(history[:end]) for end in range(12, len(history), 7)]
+        original = pickle.loads(pickle.dumps(predictor))
+        path = str(tmp_path / 'modelo.npz')
+        original.save_compact(path)
+        assert isinstance(original.model, CompactForest)
+
+        loaded = BaccaratMLPredictor()
+        loaded.load_compact(path)
+        assert loaded.is_trained
+        # La tabla de probabilidades se recupera con la huella del bosque
+        assert loaded.lut.filled.sum() == original.lut.filled.sum()
+        assert [loaded.predict_next(history[:end]) for end in range(12, len(history), 7)] == expected
+
+    def test_inference_without_sklearn(self, trained, tmp_path):
+        predictor, history = trained
+        path = str(tmp_path / 'modelo.npz')
+        pickle.loads(pickle.dumps(predictor)).save_compact(path)
+        code = (
+            "import sys\n"
+            "from baccarat_bot.ml_predictor import BaccaratMLPredictor\n"
+            "p = BaccaratMLPredictor()\n"
+            f"p.load_compact({path!r})\n"
+            f"print(p.predict_next({history!r}))\n"
+            "assert not any(m.startswith('sklearn') for m in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == str(predictor.predict_next(history))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,70 @@
+# tests/test_ml_dataset.py
+
+"""
+Tests para el dataset ML leído incrementalmente de la base de datos.
+"""
+
+import numpy as np
+import pytest
+from baccarat_bot.benchmarks.ml_features import _features_bucle
+from baccarat_bot.database.models import DatabaseManager
+from baccarat_bot.ml_dataset import DatasetBuilder
+from tests.helpers import random_history
+
+
+def _insertar(db, mesa, resultados):
+    for resultado in resultados:
+        db.registrar_resultado(mesa, resultado)
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'test.db'))
+    manager.registrar_mesa('Mesa A', 'http://a')
+    manager.registrar_mesa('Mesa B', 'http://b')
+    return manager
+
+
+class TestDatasetBuilder:
+    """Tests para la lectura por bloques y las actualizaciones incrementales"""
+
+    def test_matches_loop_features(self, db):
+        history = random_history(1, 250, weights=None)
+        _insertar(db, 'Mesa A', history[:100])
+        _insertar(db, 'Mesa B', ['B'] * 30)
+        _insertar(db, 'Mesa A', history[100:])
+
+        builder = DatasetBuilder(db.db_path, 'Mesa A', chunk_size=37)
+        assert builder.refresh() == 250
+        X, y = builder.dataset()
+        X_ref, y_ref = _features_bucle(history)
+        assert np.array_equal(X, X_ref) and np.array_equal(y, y_ref)
+
+    def test_incremental_refresh(self, db):
+        """Test: Solo se leen las filas con id mayor que el último visto"""
+        history = random_history(2, 120, weights=None)
+        _insertar(db, 'Mesa A', history[:80])
+        builder = DatasetBuilder(db.db_path, 'Mesa A')
+        assert builder.refresh() == 80
+        last_id = builder.last_id
+        assert builder.refresh() == 0
+
+        _insertar(db, 'Mesa A', history[80:] + ['X'])
+        assert builder.refresh() == 40
+        assert builder.last_id > last_id
+        assert builder.skipped == 1
+        assert np.array_equal(builder.codes(), np.array(['PBE'.index(r) for r in history], dtype=np.int8))
+
+    def test_max_rows(self, db):
+        history = random_history(3, 300, weights=None)
+        _insertar(db, 'Mesa A', history)
+        builder = DatasetBuilder(db.db_path, 'Mesa A', chunk_size=50, max_rows=100)
+        builder.refresh()
+        X, y = builder.dataset()
+        X_ref, y_ref = _features_bucle(history[-112:])
+        assert len(builder) == 100
+        assert np.array_equal(X, X_ref) and np.array_equal(y, y_ref)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,65 @@
+# tests/test_ml_features.py
+
+"""
+Tests para la construcción vectorizada e incremental de características ML.
+"""
+
+import numpy as np
+import pytest
+from baccarat_bot.benchmarks.ml_features import _features_bucle
+from baccarat_bot.ml_predictor import BaccaratMLPredictor, FeatureMatrix
+from baccarat_bot.utils.history_buffer import HistoryBuffer
+from tests.helpers import random_history
+
+
+class TestFeatureMatrix:
+    """Tests: las matrices coinciden con la construcción por bucle"""
+
+    def test_prepare_features_matches_loop(self):
+        history = random_history(1, 500)
+        X, y = BaccaratMLPredictor().prepare_features(history)
+        X_ref, y_ref = _features_bucle(history)
+        assert np.array_equal(X, X_ref) and np.array_equal(y, y_ref)
+
+    def test_short_history(self):
+        """Test: Sin filas si el historial no supera la ventana"""
+        X, y = BaccaratMLPredictor().prepare_features(['B'] * 12)
+        assert X.shape == (0, 12) and len(y) == 0
+
+    def test_incremental_rows(self):
+        """Test: Agregar rondas equivale a reconstruir la matriz"""
+        history = random_history(2, 3000)
+        matrix = FeatureMatrix(12)
+        for result in history:
+            matrix.append(result)
+        X, y = matrix.matrix()
+        X_ref, y_ref = _features_bucle(history)
+        assert len(matrix) == len(X_ref)
+        assert np.array_equal(X, X_ref) and np.array_equal(y, y_ref)
+
+    def test_max_rows_keeps_latest(self):
+        """Test: Con max_rows solo se conservan las filas más recientes"""
+        history = random_history(3, 2000)
+        matrix = FeatureMatrix(12, max_rows=100)
+        for start in range(0, len(history), 37):
+            matrix.sync(history[:start + 37])
+        X, y = matrix.matrix()
+        X_ref, y_ref = _features_bucle(history[-112:])
+        assert len(matrix) == 100
+        assert np.array_equal(X, X_ref) and np.array_equal(y, y_ref)
+
+    def test_sync_with_history_buffer(self):
+        """Test: sync() con un HistoryBuffer que descarta rondas antiguas"""
+        buffer = HistoryBuffer(capacity=50)
+        matrix = FeatureMatrix(12, max_rows=200)
+        history = random_history(4, 400)
+        for result in history:
+            buffer.append(result)
+            matrix.sync(buffer, buffer.version)
+        X, y = matrix.matrix()
+        X_ref, y_ref = _features_bucle(history[-212:])
+        assert np.array_equal(X, X_ref) and np.array_equal(y, y_ref)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,71 @@
+# tests/test_ml_lut.py
+
+"""
+Tests para la tabla de probabilidades compilada desde el RandomForest.
+"""
+
+import numpy as np
+import pytest
+from baccarat_bot.ml_predictor import BaccaratMLPredictor, ProbabilityTable
+from tests.helpers import random_history
+
+
+@pytest.fixture(scope='module')
+def trained():
+    history = random_history(0, 600)
+    predictor = BaccaratMLPredictor()
+    predictor.train(history)
+    assert predictor.is_trained
+    return predictor, history
+
+
+class TestProbabilityTable:
+    """Tests: la consulta a la tabla coincide con predict_proba"""
+
+    def test_lookup_matches_model(self, trained):
+        predictor, _ = trained
+        rng = np.random.default_rng(1)
+        windows = rng.integers(0, 3, size=(200, predictor.window)).astype(np.int8)
+        expected = predictor.model.predict_proba(windows)
+        for window, proba in zip(windows, expected):
+            assert np.allclose(predictor.lut.lookup(window, predictor.model), proba, atol=1e-6)
+        assert predictor.lut.misses > 0
+
+    def test_predict_next_unchanged(self, trained):
+        predictor, history = trained
+        with_lut = [predictor.predict_next(history[:end]) for end in range(12, len(history), 5)]
+        lut, predictor.lut = predictor.lut, None
+        try:
+            without = [predictor.predict_next(history[:end]) for end in range(12, len(history), 5)]
+        finally:
+            predictor.lut = lut
+        assert with_lut == without
+
+    def test_full_table_needs_no_model(self):
+        """Test: Una tabla completa responde sin el modelo"""
+        predictor = BaccaratMLPredictor()
+        predictor.window = 4
+        predictor.train(random_history(2, 300, weights=None))
+        predictor.compile_lut(full=True)
+        assert predictor.lut.complete
+        window = np.array([1, 0, 1, 2], dtype=np.int8)
+        assert np.allclose(
+            predictor.lut.lookup(window),
+            predictor.model.predict_proba(window.reshape(1, -1))[0], atol=1e-6
+        )
+
+    def test_saved_next_to_model(self, trained, tmp_path):
+        """Test: La tabla se guarda junto al modelo y solo se reusa con ese modelo"""
+        predictor, history = trained
+        path = str(tmp_path / 'model.pkl')
+        predictor.save(path)
+        loaded = BaccaratMLPredictor()
+        loaded.load(path)
+        assert np.array_equal(loaded.lut.filled, predictor.lut.filled)
+        assert loaded.predict_next(history) == predictor.predict_next(history)
+
+        assert ProbabilityTable.load(BaccaratMLPredictor.lut_path(path), key='otro') is None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,150 @@
+# tests/test_ml_markov.py
+
+"""
+Tests para el predictor de Markov por conteo (MarkovPredictor).
+"""
+
+import numpy as np
+import pytest
+from baccarat_bot import ml_integration
+from baccarat_bot.ml_markov import MarkovPredictor
+from baccarat_bot.ml_pool import ModelPool, crear_predictor
+from tests.helpers import random_history
+
+
+class TestMarkovPredictor:
+    """Tests para conteos, backoff, decaimiento, combinación y serialización"""
+
+    @pytest.mark.parametrize('decay', [1.0, 0.97])
+    @pytest.mark.parametrize('backoff', [True, False])
+    def test_updates_match_full_rebuild(self, decay, backoff):
+        history = random_history(1, 400)
+        incremental = MarkovPredictor(backoff=backoff, decay=decay, min_observations=1)
+        incremental.train(history[:50])
+        for result in history[50:]:
+            incremental.update(result)
+        rebuilt = MarkovPredictor(backoff=backoff, decay=decay, min_observations=1)
+        rebuilt.train(history)
+        assert np.allclose(incremental.to_array(), rebuilt.to_array())
+        assert np.allclose(incremental.predict_proba_next(history), rebuilt.predict_proba_next(history))
+
+    def test_tensor_counts_transitions(self):
+        history = random_history(2, 300)
+        predictor = MarkovPredictor(order=2)
+        predictor.train(history)
+        assert predictor.tensor.shape == (9, 3)
+        assert predictor.tensor.sum() == 300 - 2
+        # Orden 0: frecuencia de cada resultado
+        codes = {'P': 0, 'B': 1, 'E': 2}
+        assert predictor.counts[0].tolist() == [history.count(r) for r in 'PBE']
+        # Contexto 'B','B' -> siguiente
+        expected = [0, 0, 0]
+        for a, b, c in zip(history, history[1:], history[2:]):
+            if a == b == 'B':
+                expected[codes[c]] += 1
+        assert predictor.tensor[1 * 3 + 1].tolist() == expected
+
+    def test_backoff_to_lower_order(self):
+        history = ['B', 'P'] * 40
+        with_backoff = MarkovPredictor(order=2)
+        with_backoff.train(history)
+        without = MarkovPredictor(order=2, backoff=False)
+        without.train(history)
+        # El contexto 'B','B' nunca se vio: solo responde el modelo con backoff
+        assert without.predict_proba_next(['B', 'B']) is None
+        proba = with_backoff.predict_proba_next(['B', 'B'])
+        assert proba is not None and proba[0] > proba[2]
+        assert with_backoff.predict_next(history) == 'Banker'
+
+    def test_decay_favors_recent_rounds(self):
+        history = ['B'] * 200 + ['P'] * 60
+        plain = MarkovPredictor(order=0)
+        plain.train(history)
+        decayed = MarkovPredictor(order=0, decay=0.95)
+        decayed.train(history)
+        assert plain.predict_next(history) == 'Banker'
+        assert decayed.predict_next(history) == 'Player'
+
+    def test_decay_rescales_without_overflow(self):
+        predictor = MarkovPredictor(order=1, decay=0.5)
+        for result in random_history(3, 2000):
+            predictor.update(result)
+        assert np.isfinite(predictor.counts).all()
+        assert np.isclose(predictor.to_array()[0].sum(), 2.0, rtol=1e-9)
+
+    def test_merge_adds_counts(self):
+        a, b = MarkovPredictor(), MarkovPredictor()
+        a.train(random_history(4, 200))
+        b.train(random_history(5, 300))
+        expected = a.to_array() + b.to_array()
+        assert np.array_equal(a.merge(b).to_array(), expected)
+        assert (a.rounds_seen, a.rounds_imported) == (200, 300)
+        with pytest.raises(ValueError):
+            a.merge(MarkovPredictor(order=2))
+
+    @pytest.mark.parametrize('decay', [1.0, 0.97])
+    def test_merged_counts_survive_sync(self, decay):
+        """Test: Sincronizar la mesa tras combinar no descarta los conteos importados"""
+        history = random_history(4, 201)
+        a, b = MarkovPredictor(decay=decay), MarkovPredictor(decay=decay)
+        a.sync(history[:200])
+        b.train(random_history(5, 300))
+        a.merge(b)
+
+        alone = MarkovPredictor(decay=decay)
+        alone.sync(history[:200])
+        assert a.sync(history, 201) is False and alone.sync(history, 201) is False
+        assert a.rounds_seen == 201
+        assert np.allclose(a.to_array(), alone.to_array() + b.to_array() * decay)
+        assert not np.allclose(a.predict_proba_next(history), alone.predict_proba_next(history))
+
+        # Un reentrenamiento local conserva la capa importada
+        total = a.to_array().sum()
+        a.train(history)
+        assert np.isclose(a.to_array().sum(), total)
+
+    @pytest.mark.parametrize('decay', [1.0, 0.95])
+    def test_save_load(self, tmp_path, decay):
+        predictor = MarkovPredictor(order=4, decay=decay)
+        history = random_history(6, 1000)
+        predictor.sync(history[:990])
+        other = MarkovPredictor(order=4, decay=decay)
+        other.train(random_history(7, 100))
+        predictor.merge(other)
+        path = str(tmp_path / 'markov.npz')
+        predictor.save(path)
+        loaded = MarkovPredictor.load(path)
+        assert (loaded.order, loaded.decay, loaded.backoff) == (4, decay, True)
+        assert (loaded.rounds_seen, loaded.rounds_imported) == (990, 100)
+        assert loaded.is_trained
+        assert np.allclose(loaded.predict_proba_next(history), predictor.predict_proba_next(history))
+        # El modelo cargado sigue sincronizando sin reconstruirse
+        assert loaded.sync(history, 1000) is False and predictor.sync(history, 1000) is False
+        assert np.allclose(loaded.to_array(), predictor.to_array())
+
+
+class TestMarkovIntegration:
+    """Tests: el backend se elige por configuración"""
+
+    def test_pool_creates_markov(self, tmp_path):
+        pool = ModelPool(directory=str(tmp_path))
+        predictor = pool.get('Mesa 1', {'backend': 'markov', 'order': 2})
+        assert isinstance(predictor, MarkovPredictor) and predictor.order == 2
+        assert not isinstance(crear_predictor({'online': True}), MarkovPredictor)
+
+    def test_selected_through_config(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(ml_integration, 'pool_modelos', ModelPool(directory=str(tmp_path)))
+        monkeypatch.setattr(ml_integration, 'ML_ONLINE', True)
+        monkeypatch.setattr(ml_integration, 'ML_MODELO_ONLINE', 'markov')
+        history = ['B', 'B', 'P'] * 30
+        for end in range(1, len(history) + 1):
+            ml_integration.entrenar_ml_si_posible(history[:end], 'Mesa 1')
+        predictor = ml_integration._predictor_mesa('Mesa 1')
+        assert isinstance(predictor, MarkovPredictor)
+        assert predictor.retrains == 1
+        assert predictor.rounds_seen == len(history)
+        assert ml_integration.obtener_prediccion_ml(history, 'Mesa 1') == 'Banker'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,74 @@
+# tests/test_ml_online.py
+
+"""
+Tests para el modo online (n-gramas por conteo) del predictor ML.
+"""
+
+import pytest
+from baccarat_bot.ml_predictor import BaccaratMLPredictor
+from baccarat_bot.utils.history_buffer import HistoryBuffer
+from tests.helpers import random_history
+
+
+class TestOnlinePredictor:
+    """Tests para update(), sync() y los disparadores de reentrenamiento"""
+
+    def test_updates_match_full_rebuild(self):
+        """Test: Los conteos incrementales coinciden con reconstruirlos"""
+        history = random_history(1, 400)
+        incremental = BaccaratMLPredictor(online=True, retrain_every=10 ** 6)
+        incremental.train(history[:100])
+        for result in history[100:]:
+            incremental.update(result)
+        rebuilt = BaccaratMLPredictor(online=True)
+        rebuilt.train(history)
+        assert incremental._counts == rebuilt._counts
+        assert incremental.predict_next(history) == rebuilt.predict_next(history)
+
+    def test_sync_feeds_only_new_rounds(self):
+        """Test: sync() con un HistoryBuffer que descarta rondas antiguas"""
+        buffer = HistoryBuffer(capacity=50)
+        predictor = BaccaratMLPredictor(online=True, retrain_every=10 ** 6, drift_threshold=1.0)
+        retrains = []
+        for result in random_history(2, 300):
+            buffer.append(result)
+            retrains.append(predictor.sync(buffer, buffer.version))
+        # Se entrena una vez alcanzado el mínimo y luego solo se actualiza
+        assert predictor.retrains == 1
+        assert predictor.rounds_seen == 300
+        assert sum(sum(counts) for counts in predictor._counts) == 300 - predictor.order
+
+    def test_scheduled_retrain(self):
+        """Test: Reentrena al cumplirse el calendario"""
+        predictor = BaccaratMLPredictor(online=True, retrain_every=50, drift_threshold=1.0)
+        history = random_history(3, 200)
+        for end in range(1, len(history) + 1):
+            predictor.sync(history[:end])
+        assert predictor.retrains == 1 + (200 - 33) // 50
+
+    def test_drift_triggers_retrain(self):
+        """Test: Un cambio en la distribución de resultados fuerza el reentrenamiento"""
+        predictor = BaccaratMLPredictor(online=True, retrain_every=10 ** 6)
+        history = random_history(4, 300)
+        predictor.sync(history)
+        assert not predictor.needs_retrain()
+        history += ['E'] * 50
+        for result in history[300:]:
+            predictor.update(result)
+        assert predictor.drift_score() > predictor.drift_threshold
+        assert predictor.needs_retrain()
+        assert predictor.sync(history)
+        assert predictor.retrains == 2
+        assert not predictor.needs_retrain()
+
+    def test_predicts_dominant_successor(self):
+        """Test: Predice el sucesor más frecuente del contexto"""
+        predictor = BaccaratMLPredictor(online=True)
+        history = ['B', 'B', 'P'] * 30
+        predictor.sync(history)
+        assert predictor.predict_next(history) == 'Banker'
+        assert predictor.predict_next(history[:-1]) == 'Player'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
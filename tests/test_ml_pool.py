@@ -0,0 +1,86 @@
+# tests/test_ml_pool.py
+
+"""
+Tests para el pool de predictores ML por mesa.
+"""
+
+import os
+
+import pytest
+from baccarat_bot.ml_pool import ModelPool, clave_config
+from tests.helpers import random_history
+
+
+ONLINE = {'online': True, 'order': 3}
+
+
+class TestModelPool:
+    """Tests para el aislamiento por mesa y el desalojo LRU a disco"""
+
+    def test_tables_do_not_share_models(self, tmp_path):
+        pool = ModelPool(directory=str(tmp_path))
+        a = pool.get('mesa_a', ONLINE)
+        b = pool.get('mesa_b', ONLINE)
+        assert a is not b
+        assert pool.get('mesa_a', ONLINE) is a
+        assert pool.get('mesa_a', {'online': True, 'order': 4}) is not a
+        assert pool.get('mesa_c', create=False) is None
+
+    def test_evicts_lru_to_disk_and_reloads(self, tmp_path):
+        """Test: Los menos usados van a disco y se recargan con su estado"""
+        probe = ModelPool(directory=str(tmp_path / 'probe'))
+        probe.get('x', ONLINE)
+        size_mb = probe.get_stats()['memory_mb']
+
+        pool = ModelPool(budget_mb=size_mb * 2.5, directory=str(tmp_path))
+        history = random_history(1, 200)
+        pool.get('mesa_a', ONLINE).sync(history)
+        pool.get('mesa_b', ONLINE)
+        pool.get('mesa_c', ONLINE)
+        stats = pool.get_stats()
+        assert stats['models'] == 2 and stats['evictions'] == 1
+        assert 'mesa_a' not in pool
+
+        reloaded = pool.get('mesa_a', ONLINE)
+        assert reloaded.rounds_seen == 200 and reloaded.is_trained
+        assert pool.get_stats()['disk_loads'] == 1
+        assert 'mesa_b' not in pool
+
+    def test_ignores_models_it_did_not_evict(self, tmp_path):
+        """Test: Los archivos de otra instancia o ejecución no se cargan"""
+        previous = ModelPool(directory=str(tmp_path))
+        stale = previous.get('mesa', ONLINE)
+        stale.sync(random_history(2, 100))
+        previous._save(('mesa', clave_config(ONLINE)), stale)
+
+        pool = ModelPool(directory=str(tmp_path))
+        fresh = pool.get('mesa', ONLINE)
+        assert fresh.rounds_seen == 0
+        assert pool.get_stats()['disk_loads'] == 0 and pool.get_stats()['created'] == 1
+
+    def test_reload_removes_disk_copy(self, tmp_path):
+        probe = ModelPool(directory=str(tmp_path / 'probe'))
+        probe.get('x', ONLINE)
+        size_mb = probe.get_stats()['memory_mb']
+
+        pool = ModelPool(budget_mb=size_mb * 1.5, directory=str(tmp_path / 'pool'))
+        pool.get('mesa_a', ONLINE)
+        pool.get('mesa_b', ONLINE)
+        assert len(list((tmp_path / 'pool').iterdir())) == 1
+        pool.get('mesa_a', ONLINE)
+        assert [p.name for p in (tmp_path / 'pool').iterdir()] == [
+            os.path.basename(pool._path(('mesa_b', clave_config(ONLINE))))
+        ]
+        assert pool.get_stats()['disk_loads'] == 1
+
+    def test_put_replaces_model(self, tmp_path):
+        pool = ModelPool(directory=str(tmp_path))
+        first = pool.get('mesa', ONLINE)
+        second = pool.get('otra', ONLINE)
+        pool.put('mesa', second, ONLINE)
+        assert pool.get('mesa', ONLINE) is second
+        assert pool.get('mesa', ONLINE) is not first
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,68 @@
+# tests/test_ml_trainer.py
+
+"""
+Tests para el entrenamiento del predictor ML en procesos aparte.
+"""
+
+import threading
+
+import pytest
+from baccarat_bot.ml_trainer import BackgroundTrainer
+from tests.helpers import random_history
+
+
+class TestBackgroundTrainer:
+    """Tests para el intercambio de modelos, la deduplicación y las métricas"""
+
+    def test_trains_and_swaps_model(self):
+        """Test: El modelo entrenado en otro proceso llega al callback"""
+        ready = {}
+        trainer = BackgroundTrainer(lambda key, predictor: ready.__setitem__(key, predictor))
+        try:
+            trainer.submit('mesa', random_history(1, 300), {'online': True})
+            assert trainer.wait(timeout=60)
+        finally:
+            trainer.shutdown()
+        predictor = ready['mesa']
+        assert predictor.is_trained and predictor.online
+        stats = trainer.get_stats()
+        assert stats['completed'] == 1 and stats['last_duration'] > 0
+        assert 'mesa' in stats['staleness']
+
+    def test_queued_request_is_replaced(self):
+        """Test: Una solicitud nueva reemplaza a la que esperaba en cola"""
+        gate = threading.Event()
+        installed = []
+
+        def on_ready(key, predictor):
+            gate.wait(timeout=30)  # Retiene el primer trabajo como "en curso"
+            installed.append(predictor.rounds_seen)
+
+        trainer = BackgroundTrainer(on_ready)
+        try:
+            assert trainer.submit('mesa', random_history(2, 100), {'online': True})
+            assert not trainer.submit('mesa', random_history(3, 200), {'online': True})
+            assert not trainer.submit('mesa', random_history(4, 300), {'online': True})
+            gate.set()
+            assert trainer.wait(timeout=60)
+        finally:
+            trainer.shutdown()
+        assert installed == [100, 300]
+        stats = trainer.get_stats()
+        assert (stats['submitted'], stats['replaced'], stats['completed']) == (3, 1, 2)
+
+    def test_untrainable_history_keeps_previous_model(self):
+        """Test: Si no hay datos suficientes no se instala ningún modelo"""
+        installed = []
+        trainer = BackgroundTrainer(lambda key, predictor: installed.append(predictor))
+        try:
+            trainer.submit('mesa', random_history(5, 10))
+            assert trainer.wait(timeout=60)
+        finally:
+            trainer.shutdown()
+        assert installed == []
+        assert trainer.get_stats()['completed'] == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
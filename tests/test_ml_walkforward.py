@@ -0,0 +1,56 @@
+# tests/test_ml_walkforward.py
+
+"""
+Tests para la evaluación walk-forward de los modelos ML.
+"""
+
+import json
+
+import pytest
+from baccarat_bot.simulations.ml_walkforward import (
+    guardar_informe,
+    origenes_folds,
+    run_walkforward
+)
+from baccarat_bot.simulations.sweep import generar_corpus
+
+
+NGRAM = {'ngram3': {'online': True, 'order': 3}}
+
+
+class TestWalkForward:
+    """Tests para los folds, las métricas y el informe JSON"""
+
+    def test_fold_origins(self):
+        assert origenes_folds(10000, 3, 2000, 1000) == [2000, 5500, 9000]
+        assert origenes_folds(3000, 1, 2000, 1000) == [2000]
+        with pytest.raises(ValueError):
+            origenes_folds(2500, 2, 2000, 1000)
+
+    def test_pool_matches_single_process(self):
+        """Test: Los folds en paralelo dan las mismas métricas de acierto"""
+        corpus = generar_corpus(8000, seed=3)
+        single = run_walkforward(corpus, NGRAM, folds=2, train_size=1000, test_size=500, workers=1)
+        pooled = run_walkforward(corpus, NGRAM, folds=2, train_size=1000, test_size=500, workers=2)
+        for key in ('accuracy', 'log_loss', 'brier', 'calibration_error', 'signal_coverage'):
+            assert single['models']['ngram3']['summary'][key] == pooled['models']['ngram3']['summary'][key]
+
+    def test_report_contents(self, tmp_path):
+        """Test: El informe incluye calidad, coste y recursos por modelo"""
+        corpus = generar_corpus(2000, seed=4)
+        models = dict(NGRAM, forest={}, markov3={'backend': 'markov', 'order': 3})
+        report = run_walkforward(corpus, models, folds=2, train_size=400, test_size=60, workers=1)
+        for name in models:
+            summary = report['models'][name]['summary']
+            assert summary['rounds'] == 120
+            assert 0 <= summary['accuracy'] <= 1
+            assert summary['latency_p99_us'] >= summary['latency_p50_us'] > 0
+            assert summary['model_size_bytes'] > 0 and summary['peak_rss_mb'] > 0
+            assert len(report['models'][name]['folds']) == 2
+        path = guardar_informe(report, str(tmp_path / 'wf.json'))
+        with open(path, encoding='utf-8') as f:
+            assert json.load(f)['settings'] == {'folds': 2, 'train_size': 400, 'test_size': 60}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
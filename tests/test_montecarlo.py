@@ -0,0 +1,105 @@
+# tests/test_montecarlo.py
+
+"""
+Tests para el backtest Monte Carlo en paralelo.
+"""
+
+import json
+
+import numpy as np
+import pytest
+from baccarat_bot.simulations.montecarlo import (
+    intervalo_bootstrap,
+    intervalo_wilson,
+    run_montecarlo,
+    semilla_tarea
+)
+from baccarat_bot.simulations.simulator import generadores_independientes
+
+STRATEGIES = {'StreakStrategy': {'streak_length': 4}, 'DominanceStrategy': {}}
+
+
+def sin_tiempos(report):
+    return {key: value for key, value in report.items() if key not in ('elapsed', 'throughput')}
+
+
+class TestIntervalos:
+    """Tests para los intervalos de confianza"""
+
+    def test_wilson(self):
+        low, high = intervalo_wilson(45, 100)
+        assert low == pytest.approx(0.3561, abs=1e-4)
+        assert high == pytest.approx(0.5475, abs=1e-4)
+        assert intervalo_wilson(0, 0) == (0.0, 0.0)
+        assert intervalo_wilson(10, 10)[1] == 1.0
+
+    def test_bootstrap_contains_rate(self):
+        rng = np.random.default_rng(0)
+        total = rng.integers(50, 100, size=200)
+        correct = rng.binomial(total, 0.45)
+        low, high = intervalo_bootstrap(correct, total)
+        rate = correct.sum() / total.sum()
+        assert low < rate < high
+        assert high - low < 0.03
+        assert intervalo_bootstrap(correct, total) == (low, high)
+
+    def test_task_seeds_match_spawn(self):
+        rngs = generadores_independientes(7, 5)
+        for index, rng in enumerate(rngs):
+            expected = np.random.default_rng(semilla_tarea(7, index)).integers(0, 1000, 10)
+            assert np.array_equal(rng.integers(0, 1000, 10), expected)
+
+
+class TestRunMonteCarlo:
+    """Tests: resultados reproducibles, reportes parciales y reanudación"""
+
+    def test_independent_of_workers(self):
+        single = run_montecarlo(tasks=6, shoes_per_task=2, strategies=STRATEGIES, workers=1)
+        pooled = run_montecarlo(tasks=6, shoes_per_task=2, strategies=STRATEGIES, workers=2)
+        assert sin_tiempos(single) == sin_tiempos(pooled)
+        assert single['tasks_done'] == 6 and 400 < single['rounds'] < 1200
+        for row in single['strategies']:
+            assert row['ci_wilson'][0] <= row['hit_rate'] <= row['ci_wilson'][1]
+            assert 'ci_bootstrap' in row
+        assert all(rate > 0 for rate in single['throughput'].values())
+
+    def test_progress_and_resume(self, tmp_path):
+        checkpoint = str(tmp_path / 'mc.json')
+        options = dict(tasks=8, mode='rounds', rounds_per_task=500, strategies=STRATEGIES,
+                       workers=1, checkpoint_every=1)
+        expected = run_montecarlo(**options)
+
+        class Interrumpido(Exception):
+            pass
+
+        partials = []
+
+        def interrumpir(partial):
+            partials.append(partial)
+            if partial['tasks_done'] == 3:
+                raise Interrumpido()
+
+        with pytest.raises(Interrumpido):
+            run_montecarlo(checkpoint=checkpoint, on_progress=interrumpir, progress_every=1, **options)
+        assert [p['tasks_done'] for p in partials] == [1, 2, 3]
+        assert 'ci_bootstrap' not in partials[-1]['strategies'][0]
+        with open(checkpoint, encoding='utf-8') as f:
+            assert len(json.load(f)['results']) == 3
+
+        resumed = run_montecarlo(checkpoint=checkpoint, on_progress=partials.append,
+                                 progress_every=1, **options)
+        assert [p['tasks_done'] for p in partials[3:]] == [4, 5, 6, 7, 8]
+        assert sin_tiempos(resumed) == sin_tiempos(expected)
+
+        with pytest.raises(ValueError):
+            run_montecarlo(checkpoint=checkpoint, **dict(options, seed=1))
+
+    def test_invalid_options(self):
+        with pytest.raises(ValueError):
+            run_montecarlo(tasks=1, mode='cartas')
+        with pytest.raises(ValueError):
+            run_montecarlo(tasks=1, strategies={'Desconocida': {}})
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,94 @@
+# tests/test_pattern_index.py
+
+"""
+Tests para el índice incremental de n-gramas (PatternIndex).
+"""
+
+import sqlite3
+
+import pytest
+from baccarat_bot.strategies.pattern_index import PatternIndex
+from baccarat_bot.strategies.state import TableState
+from baccarat_bot.strategies.safe_strategies import ConfirmedPatternStrategy
+from tests.helpers import random_history
+
+
+class TestPatternIndex:
+    """Tests para los conteos del índice"""
+
+    def test_counts_and_successors(self):
+        index = PatternIndex(lengths=(2,))
+        index.extend(['B', 'P', 'E', 'B', 'P', 'B', 'P'])
+        # Sin empates: B P B P B P -> último patrón B-P
+        assert index.last_code(2) == 0b10
+        assert index.pattern_count(2) == 2
+        # Antes de la última transición, B-P fue seguido por B dos veces
+        assert index.next_counts(2) == (0, 2)
+        assert index.most_common_next(2) == 'B'
+
+    def test_unindexed_length(self):
+        index = PatternIndex(lengths=(3,))
+        with pytest.raises(KeyError):
+            index.pattern_count(4)
+
+    def test_persistence_roundtrip(self, tmp_path):
+        index = PatternIndex(lengths=(2, 3))
+        index.extend(random_history(1, 200))
+        path = tmp_path / 'mesa.json'
+        index.save(str(path))
+        loaded = PatternIndex.load(str(path))
+        for k in (2, 3):
+            assert loaded.pattern_count(k) == index.pattern_count(k)
+            assert loaded.next_counts(k) == index.next_counts(k)
+        # Ambos siguen actualizándose igual
+        for result in ['B', 'P', 'P', 'B']:
+            index.push(result)
+            loaded.push(result)
+        assert loaded.to_dict() == index.to_dict()
+
+    def test_update_from_database(self, tmp_path):
+        db_path = str(tmp_path / 'test.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE mesas (id INTEGER PRIMARY KEY, nombre TEXT, url TEXT)")
+        conn.execute("CREATE TABLE resultados (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "mesa_id INTEGER, resultado TEXT)")
+        conn.execute("INSERT INTO mesas (id, nombre, url) VALUES (1, 'mesa', ''), (2, 'otra', '')")
+        history = random_history(3, 120)
+        conn.executemany("INSERT INTO resultados (mesa_id, resultado) VALUES (?, ?)",
+                         [(1, r) for r in history[:100]] + [(2, 'B')] * 10)
+        conn.commit()
+
+        index = PatternIndex(lengths=(3,))
+        assert index.update_from_database('mesa', db_path, chunk_size=7) == 100
+
+        conn.executemany("INSERT INTO resultados (mesa_id, resultado) VALUES (?, ?)",
+                         [(1, r) for r in history[100:]])
+        conn.commit()
+        conn.close()
+        assert index.update_from_database('mesa', db_path) == 20
+
+        expected = PatternIndex(lengths=(3,))
+        expected.extend(history)
+        assert index.pattern_count(3) == expected.pattern_count(3)
+        assert index.next_counts(3) == expected.next_counts(3)
+
+
+class TestConfirmedPatternWithIndex:
+    """Tests: la estrategia sobre el índice coincide con el análisis de listas"""
+
+    @pytest.mark.parametrize('pattern_length', [2, 3, 4])
+    def test_matches_list_analysis(self, pattern_length):
+        strategy = ConfirmedPatternStrategy(pattern_length)
+        history = random_history(pattern_length, 300, (0.5, 0.35, 0.15))
+        state = TableState(pattern_lengths=(2, 3, 4))
+        for i, result in enumerate(history):
+            state.push(result)
+            prefix = history[:i + 1]
+            assert strategy.evaluate_state(state) == (
+                strategy.analyze(prefix),
+                strategy.get_confidence_level(prefix)
+            ), f"Difiere en la ronda {i}"
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
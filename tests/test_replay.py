@@ -0,0 +1,106 @@
+# tests/test_replay.py
+
+"""
+Tests para el backtest sobre los resultados de la base de datos.
+"""
+
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+from baccarat_bot.database.models import DatabaseManager
+from baccarat_bot.simulations.backtester import StreamingBacktester
+from baccarat_bot.simulations.replay import SQLiteReplaySource, run_replay
+from baccarat_bot.simulations.sweep import corpus_desde_db
+from baccarat_bot.strategies.vectorized import encode_history
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'test.db'))
+    manager.registrar_mesa('Mesa A', 'http://a')
+    manager.registrar_mesa('Mesa B', 'http://b')
+    rng = random.Random(0)
+    histories = {'Mesa A': [], 'Mesa B': []}
+    # Rondas de las dos mesas intercaladas, como las registra el bot
+    for _ in range(900):
+        mesa = rng.choice(['Mesa A', 'Mesa A', 'Mesa B'])
+        resultado = rng.choices(['B', 'P', 'E'], weights=(0.45, 0.45, 0.10))[0]
+        manager.registrar_resultado(mesa, resultado)
+        histories[mesa].append(resultado)
+    return manager, histories
+
+
+class TestSQLiteReplaySource:
+    """Tests: bloques en orden de id separados por mesa"""
+
+    @pytest.mark.parametrize('chunk_size', [1, 37, 50_000])
+    def test_codes_by_table(self, db, chunk_size):
+        manager, histories = db
+        source = SQLiteReplaySource(manager.db_path, chunk_size=chunk_size)
+        codes = source.codes_by_table()
+        names = source.mesas()
+        assert {names[mesa_id]: c.tolist() for mesa_id, c in codes.items()} == {
+            mesa: encode_history(history).tolist() for mesa, history in histories.items()
+        }
+        assert source.rows_read == 900 and source.skipped == 0
+
+    def test_single_table_and_invalid_rows(self, db):
+        manager, histories = db
+        conn = sqlite3.connect(manager.db_path)
+        conn.execute("INSERT INTO resultados (mesa_id, resultado) VALUES (1, 'X')")
+        conn.commit()
+        conn.close()
+        source = SQLiteReplaySource(manager.db_path, 'Mesa A', chunk_size=100)
+        chunks = list(source.chunks())
+        assert {mesa_id for mesa_id, _ in chunks} == {1}
+        assert np.concatenate([c for _, c in chunks]).tolist() == encode_history(histories['Mesa A']).tolist()
+        assert source.skipped == 1
+        with pytest.raises(ValueError):
+            list(SQLiteReplaySource(manager.db_path, 'Sin mesa').chunks())
+
+    def test_corpus_desde_db(self, db):
+        manager, histories = db
+        corpus = corpus_desde_db(manager.db_path, chunk_size=50)
+        assert [c.tolist() for c in corpus] == [
+            encode_history(histories[mesa]).tolist() for mesa in ('Mesa A', 'Mesa B')
+        ]
+        assert corpus_desde_db(manager.db_path, 'Sin mesa') == []
+
+
+class TestRunReplay:
+    """Tests: backtester, estrategias y walk-forward sobre cada mesa"""
+
+    def test_reports_per_table(self, db):
+        manager, histories = db
+        report = run_replay(manager.db_path, chunk_size=64, strategies={'StreakStrategy': {}},
+                            ml_models={'markov3': {'backend': 'markov', 'order': 3}},
+                            walkforward={'folds': 2, 'train_size': 300, 'test_size': 100})
+        assert report['source']['rows_read'] == 900
+        for mesa, history in histories.items():
+            table = report['tables'][mesa]
+            assert table['simulation_details']['num_rounds'] == len(history)
+            assert table['baccarat_stats'] == {r: history.count(r) for r in 'PBE'}
+
+            expected = StreamingBacktester(mesa)
+            expected.feed(history)
+            assert table['strategy_report'] == expected.get_report()
+            assert table['detailed_results'] == expected.get_detailed_results()
+            assert table['strategies'][0]['strategy'] == 'StreakStrategy'
+
+        # Mesa B (~300 rondas) no alcanza para el walk-forward
+        assert report['tables']['Mesa A']['ml']['models']['markov3']['folds']
+        assert report['tables']['Mesa B']['ml'] is None
+
+    def test_without_backtest_or_ml(self, db):
+        manager, _ = db
+        report = run_replay(manager.db_path, 'Mesa B', backtest=False, ml=False)
+        table = report['tables']['Mesa B']
+        assert list(report['tables']) == ['Mesa B']
+        assert 'strategy_report' not in table and 'ml' not in table
+        assert len(table['strategies']) == 9
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,80 @@
+# tests/test_result_cache.py
+
+"""
+Tests para la caché de resultados por versión de historial.
+"""
+
+import pytest
+from baccarat_bot.utils.history_buffer import HistoryBuffer
+from baccarat_bot.utils.result_cache import ResultCache, version_historial
+
+
+class TestResultCache:
+    """Tests para aciertos, invalidación y desalojo LRU"""
+
+    def test_reuses_until_new_round(self):
+        """Test: El valor se reutiliza hasta que cambia la versión"""
+        cache = ResultCache()
+        historial = HistoryBuffer(capacity=10, initial='BPB')
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return None  # "sin señal" también se cachea
+
+        for _ in range(3):
+            cache.get_or_compute('mesa', 'senales', version_historial(historial), compute)
+        historial.append('P')
+        cache.get_or_compute('mesa', 'senales', version_historial(historial), compute)
+
+        assert len(calls) == 2
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses']) == (2, 2)
+        assert stats['by_name']['senales'] == {'hits': 2, 'misses': 2}
+
+    def test_polls_without_new_round_hit(self):
+        """Test: Dos sondeos de la misma ronda reutilizan el análisis"""
+        cache = ResultCache()
+        historial = HistoryBuffer(capacity=10, initial='BPB')
+        calls = []
+
+        def sondear(resultado, ronda_id):
+            # Como el bucle de monitoreo: agregar la ronda y analizar la mesa
+            historial.append_round(resultado, ronda_id)
+            return cache.get_or_compute('mesa', 'senales', version_historial(historial),
+                                        lambda: calls.append(1))
+
+        sondear('P', 'BPBP')
+        sondear('P', 'BPBP')
+        assert len(calls) == 1 and cache.get_stats()['hits'] == 1
+        sondear('P', 'BPBPP')
+        assert len(calls) == 2 and len(historial) == 5
+
+    def test_list_version_changes_with_content(self):
+        """Test: Las listas se versionan por contenido"""
+        assert version_historial(['B', 'P']) == version_historial(['B', 'P'])
+        assert version_historial(['B', 'P']) != version_historial(['B', 'P', 'P'])
+
+    def test_lru_eviction(self):
+        """Test: Se descarta la entrada usada hace más tiempo"""
+        cache = ResultCache(max_entries=2)
+        cache.put('a', 'x', 1, 'A')
+        cache.put('b', 'x', 1, 'B')
+        assert cache.get('a', 'x', 1) == 'A'
+        cache.put('c', 'x', 1, 'C')
+        assert cache.get('b', 'x', 1) is None
+        assert cache.get('a', 'x', 1) == 'A'
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_invalidate_table(self):
+        """Test: Invalidar una mesa no afecta a las demás"""
+        cache = ResultCache()
+        cache.put('a', 'x', 1, 'A')
+        cache.put('b', 'x', 1, 'B')
+        cache.invalidate('a')
+        assert cache.get('a', 'x', 1) is None
+        assert cache.get('b', 'x', 1) == 'B'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -4,7 +4,10 @@
 Tests para las estrategias de apuesta seguras y conservadoras.
 """
 
+import random
+
 import pytest
+from baccarat_bot.strategies.advanced_strategies import StreakStrategy, ZigZagStrategy
 from baccarat_bot.strategies.safe_strategies import (
     ConservativeStreakStrategy,
     ConfirmedPatternStrategy,
@@ -152,6 +155,48 @@ class TestConsensusStrategy:
         # Si hay consenso, debe tener alta confianza
         if confidence > 0:
             assert confidence >= 75
+    
+    @staticmethod
+    def _full_votes(strategy, history):
+        """Votos evaluando todas las sub-estrategias, sin cortocircuito"""
+        votes = {}
+        for sub in strategy.strategies:
+            result = sub.analyze(history)
+            confidence = sub.get_confidence_level(history) if result else 0
+            if result and confidence >= 70:
+                votes.setdefault(result, []).append(confidence)
+        return votes
+    
+    @pytest.mark.parametrize('weights', [(0.45, 0.45, 0.10), (0.75, 0.2, 0.05), (0.2, 0.75, 0.05)])
+    def test_short_circuit_matches_full_evaluation(self, weights):
+        """Test: El cortocircuito no cambia señal ni confianza"""
+        rng = random.Random(int(weights[0] * 100))
+        history = rng.choices(['B', 'P', 'E'], weights=weights, k=150)
+        strategies = [
+            ConsensusStrategy(),
+            ConsensusStrategy([StreakStrategy(2), ZigZagStrategy(3), StreakStrategy(3),
+                               DominanceStrategy(10, 0.6)], min_consensus=2),
+        ]
+        for strategy in strategies:
+            for end in range(len(history) + 1):
+                prefix = history[:end]
+                votes = self._full_votes(strategy, prefix)
+                expected_signal = strategy._resolve_signal(votes) if end >= 20 else None
+                expected_confidence = strategy._resolve_confidence(votes) if end >= 20 else 0
+                assert strategy.analyze(prefix) == expected_signal
+                assert strategy.get_confidence_level(prefix) == expected_confidence
+    
+    def test_skip_counters(self):
+        """Test: Cuenta las sub-evaluaciones omitidas"""
+        strategy = ConsensusStrategy()
+        # StatisticalEdge (30) no tiene historial suficiente
+        strategy.get_confidence_level(['B', 'P'] * 12 + ['E'])
+        stats = strategy.get_stats()
+        assert stats['evaluations'] == 1
+        assert stats['skipped_short_history'] == 1
+        # Alternancia sin rachas: nadie vota y el consenso se vuelve inalcanzable
+        assert stats['skipped_unreachable'] > 0
+        assert stats['sub_evaluations'] + stats['skipped_unreachable'] == 4
 
 
 class TestDominanceStrategy:
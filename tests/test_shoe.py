@@ -0,0 +1,137 @@
+# tests/test_shoe.py
+
+"""
+Tests para la simulación de zapatos carta a carta.
+"""
+
+import numpy as np
+import pytest
+from baccarat_bot.simulations.shoe import (
+    PUNTOS,
+    barajar_zapatos,
+    repartir_zapatos,
+    simular_zapatos
+)
+from baccarat_bot.simulations.simulator import BaccaratSimulator
+
+
+def puntos(carta):
+    return min(carta, 10) % 10
+
+
+def banca_pide(banca, tercera):
+    """Tabla de tercera carta de la Banca escrita regla por regla."""
+    if tercera is None:
+        return banca <= 5
+    if banca <= 2:
+        return True
+    if banca == 3:
+        return tercera != 8
+    if banca == 4:
+        return 2 <= tercera <= 7
+    if banca == 5:
+        return 4 <= tercera <= 7
+    if banca == 6:
+        return tercera in (6, 7)
+    return False
+
+
+def repartir_referencia(cartas, corte, extra_hand=True):
+    """Reparto ronda a ronda de un zapato, sin vectorizar."""
+    cartas = [int(c) for c in cartas]
+    pos = 1 + (puntos(cartas[0]) or 10)
+    rondas, ultima = [], False
+    while pos <= corte or ultima:
+        if pos + 6 > len(cartas):
+            break
+        jugador, banca = [cartas[pos], cartas[pos + 2]], [cartas[pos + 1], cartas[pos + 3]]
+        siguiente = pos + 4
+        total_j = sum(map(puntos, jugador)) % 10
+        total_b = sum(map(puntos, banca)) % 10
+        if total_j < 8 and total_b < 8:
+            tercera = None
+            if total_j <= 5:
+                jugador.append(cartas[siguiente])
+                tercera = puntos(cartas[siguiente])
+                siguiente += 1
+                total_j = (total_j + tercera) % 10
+            if banca_pide(total_b, tercera):
+                banca.append(cartas[siguiente])
+                total_b = (total_b + puntos(cartas[siguiente])) % 10
+                siguiente += 1
+        codigo = 2 if total_j == total_b else int(total_b > total_j)
+        rondas.append((codigo, jugador, banca, len(cartas) - siguiente))
+        if ultima:
+            break
+        ultima = extra_hand and siguiente > corte
+        if siguiente > corte and not extra_hand:
+            break
+        pos = siguiente
+    return rondas
+
+
+class TestShoe:
+    """Tests: reglas de tercera carta, carta de corte y límites de zapato"""
+
+    @pytest.mark.parametrize('extra_hand', [True, False])
+    def test_matches_reference_dealing(self, extra_hand):
+        rng = np.random.default_rng(0)
+        cartas = barajar_zapatos(rng, 40, num_decks=8)
+        corte = 416 - rng.integers(14, 17, size=40)
+        results = repartir_zapatos(cartas, corte, extra_hand=extra_hand)
+        assert results.num_shoes == 40
+        for i in range(40):
+            expected = repartir_referencia(cartas[i], corte[i], extra_hand)
+            rondas = slice(results.offsets[i], results.offsets[i + 1])
+            assert (results.shoe[rondas] == i).all()
+            assert results.codes[rondas].tolist() == [r[0] for r in expected]
+            assert [[c for c in mano if c] for mano in results.player_cards[rondas].tolist()] == \
+                [r[1] for r in expected]
+            assert [[c for c in mano if c] for mano in results.banker_cards[rondas].tolist()] == \
+                [r[2] for r in expected]
+            assert results.cards_remaining[rondas].tolist() == [r[3] for r in expected]
+
+    def test_metadata_consistent(self):
+        results = BaccaratSimulator(seed=1).simulate_shoes(200)
+        totals_j = PUNTOS[results.player_cards].sum(axis=1) % 10
+        totals_b = PUNTOS[results.banker_cards].sum(axis=1) % 10
+        assert np.array_equal(totals_j, results.player_total)
+        assert np.array_equal(totals_b, results.banker_total)
+        assert results.cards_dealt.min() >= 4 and results.cards_dealt.max() <= 6
+        # Las cartas restantes bajan exactamente lo repartido dentro del zapato
+        for codes, start in zip(results.shoe_codes(), results.offsets[:-1]):
+            rondas = slice(start, start + len(codes))
+            remaining = results.cards_remaining[rondas].astype(int)
+            assert np.array_equal(-np.diff(remaining), results.cards_dealt[rondas][1:])
+            assert remaining[-1] <= 16
+        assert np.array_equal(results.round_index[results.offsets[:-1]], np.zeros(200))
+        assert not (results.naturals & (results.cards_dealt > 4)).any()
+
+    def test_num_decks_honored(self):
+        results = BaccaratSimulator(num_decks=1, seed=2).simulate_shoes(50, cut_range=(10, 12))
+        assert results.num_decks == 1
+        first = results.offsets[:-1]
+        # La primera ronda sale de un zapato de 52 cartas
+        assert (results.cards_remaining[first] + results.cards_dealt[first] <= 52 - 2).all()
+        assert (np.diff(results.offsets) > 0).all()
+
+    def test_outcome_frequencies(self):
+        simulator = BaccaratSimulator(seed=3)
+        results = simulator.simulate_shoes(5000)
+        frequencies = np.bincount(results.codes, minlength=3) / len(results)
+        # Probabilidades exactas de Punto Banco con 8 mazos
+        assert np.allclose(frequencies, [0.4462, 0.4586, 0.0952], atol=0.004)
+        assert 75 <= len(results) / 5000 <= 85
+        assert sum(simulator.stats.values()) == len(results)
+
+    def test_batches_reproducible(self):
+        single = BaccaratSimulator(seed=4).simulate_shoes(30)
+        again = simular_zapatos(np.random.default_rng(4), 30)
+        assert np.array_equal(single.codes, again.codes)
+        batches = list(BaccaratSimulator(seed=4).simulate_shoe_batches(30, batch_size=8))
+        assert [b.num_shoes for b in batches] == [8, 8, 8, 6]
+        assert sum(len(b) for b in batches) > 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,63 @@
+# tests/test_simulator.py
+
+"""
+Tests para el modo vectorizado del simulador de Baccarat.
+"""
+
+import numpy as np
+import pytest
+from baccarat_bot.simulations.simulator import (
+    BANKER_PROB,
+    PLAYER_PROB,
+    TIE_PROB,
+    BaccaratSimulator,
+    decodificar_codigos,
+    generadores_independientes
+)
+
+
+class TestVectorizedSimulator:
+    """Tests para simulate_codes(), simulate_chunks() y spawn()"""
+
+    def test_codes_follow_probabilities(self):
+        simulator = BaccaratSimulator(seed=1)
+        codes = simulator.simulate_codes(1_000_000)
+        assert codes.dtype == np.int8 and codes.min() >= 0 and codes.max() <= 2
+        frequencies = np.bincount(codes, minlength=3) / len(codes)
+        expected = np.array([PLAYER_PROB, BANKER_PROB, TIE_PROB]) / 100
+        assert np.allclose(frequencies, expected, atol=0.002)
+        assert simulator.stats == {
+            'P': int((codes == 0).sum()), 'B': int((codes == 1).sum()), 'E': int((codes == 2).sum())
+        }
+
+    def test_seed_reproducible(self):
+        a = BaccaratSimulator(seed=5).simulate_codes(1000)
+        b = BaccaratSimulator(seed=5).simulate_codes(1000)
+        assert np.array_equal(a, b)
+        assert not np.array_equal(a, BaccaratSimulator(seed=6).simulate_codes(1000))
+
+    @pytest.mark.parametrize('chunk_size', [1000, 999, 1 << 20])
+    def test_chunks_match_single_call(self, chunk_size):
+        single = BaccaratSimulator(seed=3).simulate_codes(10_000)
+        simulator = BaccaratSimulator(seed=3)
+        chunks = list(simulator.simulate_chunks(10_000, chunk_size))
+        assert all(len(chunk) <= chunk_size for chunk in chunks)
+        assert np.array_equal(np.concatenate(chunks), single)
+        assert sum(simulator.stats.values()) == 10_000
+
+    def test_spawn_independent_streams(self):
+        simulators = BaccaratSimulator.spawn(4, seed=42)
+        streams = [s.simulate_codes(2000) for s in simulators]
+        again = [s.simulate_codes(2000) for s in BaccaratSimulator.spawn(4, seed=42)]
+        for i, stream in enumerate(streams):
+            assert np.array_equal(stream, again[i])
+            for other in streams[i + 1:]:
+                assert not np.array_equal(stream, other)
+        assert len(generadores_independientes(42, 3)) == 3
+
+    def test_decode(self):
+        assert decodificar_codigos(np.array([0, 1, 2, 1], dtype=np.int8)) == ['P', 'B', 'E', 'B']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
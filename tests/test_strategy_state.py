@@ -0,0 +1,140 @@
+# tests/test_strategy_state.py
+
+"""
+Tests para el estado incremental por mesa (TableState) y su equivalencia
+con el análisis sobre listas.
+"""
+
+import pytest
+from baccarat_bot.strategies.state import HistoryFeatures, TableState
+from baccarat_bot.strategies.advanced_strategies import StreakStrategy, StrategyManager
+from baccarat_bot.strategies.safe_strategies import (
+    ConservativeStreakStrategy,
+    ConfirmedPatternStrategy,
+    StatisticalEdgeStrategy,
+    ConsensusStrategy,
+    DominanceStrategy,
+    get_safest_signal
+)
+from tests.helpers import STRATEGIES, random_history
+
+
+class TestTableState:
+    """Tests para los agregados del estado incremental"""
+
+    def test_window_counts(self):
+        """Test: Los conteos por ventana siguen al historial"""
+        state = TableState(windows=(3, 5))
+        for result in ['B', 'B', 'P', 'E', 'B', 'P']:
+            state.push(result)
+        assert state.window_counts(3) == (1, 1, 1)
+        assert state.window_counts(5) == (2, 2, 1)
+
+    def test_streak_and_alternation(self):
+        """Test: Racha y alternancia se actualizan en cada resultado"""
+        state = TableState()
+        for result in ['E', 'B', 'P', 'B', 'P', 'P']:
+            state.push(result)
+        assert state.streak == ('P', 2)
+        assert state.alternation_length == 1
+        state.push('B')
+        assert state.alternation_length == 2
+        state.push('E')
+        assert state.alternation_length == 0
+        assert state.ties_total == 2
+
+    def test_invalid_result(self):
+        """Test: Rechaza resultados inválidos"""
+        state = TableState()
+        with pytest.raises(ValueError):
+            state.push('X')
+
+    def test_unregistered_window(self):
+        """Test: Las ventanas no registradas no se pueden consultar"""
+        state = TableState(windows=(5,))
+        with pytest.raises(KeyError):
+            state.window_counts(7)
+
+
+class TestStateEquivalence:
+    """Tests: evaluate_state coincide con analyze/get_confidence_level"""
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_strategies_match_list_analysis(self, seed):
+        weights = [(0.45, 0.45, 0.10), (0.7, 0.2, 0.1), (0.3, 0.3, 0.4)][seed % 3]
+        history = random_history(seed, 50, weights)
+        for strategy in STRATEGIES:
+            state = TableState(strategy.required_windows())
+            for i, result in enumerate(history):
+                state.push(result)
+                prefix = history[:i + 1]
+                assert strategy.evaluate_state(state) == (
+                    strategy.analyze(prefix),
+                    strategy.get_confidence_level(prefix)
+                ), f"{strategy.name} difiere en la ronda {i}"
+
+    def test_manager_table_analysis(self):
+        """Test: analyze_table coincide con analyze_all"""
+        manager = StrategyManager()
+        history = random_history(42, 200)
+        for i, result in enumerate(history):
+            manager.update_table('mesa', result)
+            prefix = history[:i + 1]
+            assert manager.analyze_table('mesa') == manager.analyze_all(prefix)
+            assert manager.get_table_consensus('mesa') == manager.get_consensus_signal(prefix)
+
+
+class TestFusedEvaluation:
+    """Tests para evaluate() con contexto de características compartido"""
+
+    @pytest.mark.parametrize('seed', range(3))
+    def test_evaluate_matches_list_analysis(self, seed):
+        history = random_history(seed, 120, [(0.45, 0.45, 0.10), (0.7, 0.2, 0.1), (0.3, 0.3, 0.4)][seed])
+        for end in range(0, len(history) + 1, 7):
+            prefix = history[:end]
+            features = HistoryFeatures(prefix)
+            for strategy in STRATEGIES:
+                signal, confidence, shared = strategy.evaluate(prefix, features)
+                assert shared is features
+                assert (signal, confidence) == (
+                    strategy.analyze(prefix),
+                    strategy.get_confidence_level(prefix)
+                ), f"{strategy.name} difiere con {end} resultados"
+
+    def test_features_are_memoized(self):
+        """Test: Cada estrategia se evalúa una sola vez por contexto"""
+        calls = []
+
+        class CountingStreak(StreakStrategy):
+            def evaluate_state(self, state):
+                calls.append(1)
+                return super().evaluate_state(state)
+
+        strategy = CountingStreak(3)
+        features = HistoryFeatures(['B', 'B', 'B'])
+        strategy.evaluate(features.history, features)
+        strategy.evaluate(features.history, features)
+        assert len(calls) == 1
+
+    @pytest.mark.parametrize('seed', range(3))
+    def test_safest_signal_matches_fresh_strategies(self, seed):
+        """Test: get_safest_signal coincide con la evaluación sin compartir"""
+        history = random_history(seed, 150, (0.55, 0.35, 0.10))
+        for end in range(20, len(history) + 1, 5):
+            prefix = history[:end]
+            expected = None
+            best = 0
+            for strategy in [ConservativeStreakStrategy(5), ConfirmedPatternStrategy(3),
+                             StatisticalEdgeStrategy(30), ConsensusStrategy(),
+                             DominanceStrategy(20, 0.70)]:
+                result = strategy.analyze(prefix)
+                if result:
+                    confidence = strategy.get_confidence_level(prefix)
+                    if confidence > best and confidence >= 80:
+                        expected = (result, strategy.name, confidence)
+                        best = confidence
+            assert get_safest_signal(prefix) == expected
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
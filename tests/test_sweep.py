@@ -0,0 +1,59 @@
+# tests/test_sweep.py
+
+"""
+Tests para el barrido paralelo de parámetros de estrategias.
+"""
+
+import json
+
+import pytest
+from baccarat_bot.simulations.sweep import (
+    expandir_grilla,
+    generar_corpus,
+    guardar_leaderboard,
+    run_sweep
+)
+
+
+GRID = {
+    'StreakStrategy': {'streak_length': [3, 4]},
+    'DominanceStrategy': {'window_size': [10, 20], 'dominance_threshold': [0.6, 0.7]},
+    'ConsensusStrategy': {'min_consensus': [2, 3]},
+}
+
+
+class TestSweep:
+    """Tests para la grilla, la evaluación y el leaderboard"""
+
+    def test_expand_grid(self):
+        """Test: Producto cartesiano de parámetros por estrategia"""
+        combinations = expandir_grilla(GRID)
+        assert len(combinations) == 2 + 4 + 2
+        assert ('DominanceStrategy', {'window_size': 20, 'dominance_threshold': 0.6}) in combinations
+
+    def test_unknown_strategy(self):
+        """Test: Rechaza estrategias sin versión vectorizada"""
+        with pytest.raises(ValueError):
+            expandir_grilla({'FibonacciStrategy': {}})
+
+    def test_pool_matches_single_process(self):
+        """Test: El pool con memoria compartida da los mismos resultados"""
+        corpus = [generar_corpus(5000, seed=1), generar_corpus(3000, seed=2)]
+        single = run_sweep(GRID, corpus, workers=1)
+        pooled = run_sweep(GRID, corpus, workers=2)
+        assert single == pooled
+        assert [row['rank'] for row in single] == list(range(1, len(single) + 1))
+        assert all(row['rounds'] == 4999 + 2999 for row in single)
+
+    def test_save_leaderboard(self, tmp_path):
+        """Test: Exporta el leaderboard a CSV y JSON"""
+        rows = run_sweep({'StreakStrategy': {'streak_length': [3]}}, [generar_corpus(1000)], workers=1)
+        csv_path, json_path = guardar_leaderboard(rows, str(tmp_path / 'leaderboard'))
+        with open(json_path, encoding='utf-8') as f:
+            assert json.load(f)[0]['params'] == {'streak_length': 3}
+        with open(csv_path, encoding='utf-8') as f:
+            assert f.readline().startswith('rank,strategy,params')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,103 @@
+# tests/test_vectorized.py
+
+"""
+Tests para la evaluación vectorizada de estrategias sobre todos los prefijos.
+"""
+
+import random
+
+import numpy as np
+import pytest
+from baccarat_bot.strategies.vectorized import (
+    SIN_SENAL,
+    decode_signals,
+    encode_history,
+    run_lengths,
+    alternation_lengths
+)
+from baccarat_bot.strategies.advanced_strategies import (
+    StreakStrategy,
+    ZigZagStrategy,
+    TrendAnalysisStrategy,
+    TieDetectionStrategy
+)
+from baccarat_bot.strategies.safe_strategies import (
+    ConservativeStreakStrategy,
+    ConfirmedPatternStrategy,
+    ConsensusStrategy,
+    StatisticalEdgeStrategy,
+    DominanceStrategy
+)
+
+
+VECTORIZED_STRATEGIES = [
+    StreakStrategy(3),
+    StreakStrategy(5),
+    ZigZagStrategy(4),
+    TieDetectionStrategy(5),
+    TieDetectionStrategy(3),
+    TrendAnalysisStrategy(5, 15),
+    TrendAnalysisStrategy(4, 20),
+    DominanceStrategy(20, 0.70),
+    DominanceStrategy(10, 0.60),
+    StatisticalEdgeStrategy(30, 0.15),
+    StatisticalEdgeStrategy(20, 0.05),
+    ConservativeStreakStrategy(5),
+    ConservativeStreakStrategy(3),
+    ConfirmedPatternStrategy(3),
+    ConfirmedPatternStrategy(2),
+    ConsensusStrategy(),
+    ConsensusStrategy([StreakStrategy(2), StreakStrategy(3), ZigZagStrategy(3),
+                       DominanceStrategy(10, 0.60)], min_consensus=2),
+]
+
+
+class TestEncoding:
+    """Tests para la codificación int8 del historial"""
+
+    def test_encode_history(self):
+        encoded = encode_history(['P', 'B', 'E', 'B'])
+        assert encoded.dtype == np.int8
+        assert encoded.tolist() == [0, 1, 2, 1]
+
+    def test_encode_invalid(self):
+        with pytest.raises(ValueError):
+            encode_history(['B', 'X'])
+        with pytest.raises(ValueError):
+            encode_history(['B', 'PB'])
+
+    def test_decode_signals(self):
+        assert decode_signals(np.array([SIN_SENAL, 0, 1, 2])) == [None, 'JUGADOR', 'BANCA', 'EMPATE']
+
+    def test_runs_and_alternation(self):
+        encoded = encode_history(['B', 'B', 'P', 'B', 'E', 'P', 'P'])
+        assert run_lengths(encoded).tolist() == [1, 2, 1, 1, 1, 1, 2]
+        assert alternation_lengths(encoded).tolist() == [1, 1, 2, 3, 0, 1, 1]
+
+
+class TestPrefixEquivalence:
+    """Tests: analyze_prefixes coincide con analyze/get_confidence_level"""
+
+    @pytest.mark.parametrize('weights', [(0.45, 0.45, 0.10), (0.7, 0.2, 0.1), (0.3, 0.3, 0.4)])
+    def test_matches_scalar(self, weights):
+        rng = random.Random(sum(weights) * 1000)
+        history = rng.choices(['B', 'P', 'E'], weights=weights, k=400)
+        encoded = encode_history(history)
+        for strategy in VECTORIZED_STRATEGIES:
+            signals, confidences = strategy.analyze_prefixes(encoded)
+            decoded = decode_signals(signals)
+            for i in range(len(history)):
+                prefix = history[:i + 1]
+                assert decoded[i] == strategy.analyze(prefix), f"{strategy.name} señal en {i}"
+                assert confidences[i] == strategy.get_confidence_level(prefix), \
+                    f"{strategy.name} confianza en {i}"
+
+    def test_empty_history(self):
+        encoded = encode_history([])
+        for strategy in VECTORIZED_STRATEGIES:
+            signals, confidences = strategy.analyze_prefixes(encoded)
+            assert len(signals) == 0 and len(confidences) == 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])